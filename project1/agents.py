@@ -1,8 +1,10 @@
 
+from __future__ import annotations
+import heapq
 import math
 import random
 import numpy as np
-import copy
+import networkx as nx
 
 
 
@@ -15,15 +17,32 @@ valid_states = {
     SUSCEPTIBLE, EXPOSED, INFECTED, RECOVERED
 }
 
-def sample_log_dist(mu, omega):
+# Array-backed engines store each agent's state as a small integer. The codes
+# follow the [S, E, I, R] order used by get_history_as_counts.
+STATE_ORDER = [SUSCEPTIBLE, EXPOSED, INFECTED, RECOVERED]
+S_CODE, E_CODE, I_CODE, R_CODE = range(len(STATE_ORDER))
+
+STATE_COLORS = {
+    SUSCEPTIBLE : "blue",
+    EXPOSED : "yellow",
+    INFECTED : "red",
+    RECOVERED : "green"
+}
+
+def sample_log_dist(mu, omega, rng=None):
     # log_normal_distribution()
     # ChatGPT gave this function to me and I modified it. 
-    return np.random.lognormal(mean=mu, sigma=omega)
+    # Pass a np.random.Generator to make runs reproducible; without one the
+    # global np.random state is used.
+    if rng is None:
+        return np.random.lognormal(mean=mu, sigma=omega)
+    return rng.lognormal(mean=mu, sigma=omega)
 
 class Agent:
-    def __init__(self, initial_state=SUSCEPTIBLE):
-        self.countdown_to_infectious = math.ceil(sample_log_dist(mu=1, omega=1))
-        self.countdown_to_recovered = math.ceil(sample_log_dist(mu=2.25, omega=.105))
+    def __init__(self, initial_state=SUSCEPTIBLE, rng=None):
+        self.rng = rng
+        self.countdown_to_infectious = math.ceil(sample_log_dist(mu=1, omega=1, rng=rng))
+        self.countdown_to_recovered = math.ceil(sample_log_dist(mu=2.25, omega=.105, rng=rng))
         self.days_spent_infectious = 0
         self.state = initial_state
 
@@ -44,33 +63,160 @@ class Agent:
         # do nothing if you are recovered
 
     def gets_disease(self, neighbors: list[Agent]):
-        for neighbor in neighbors:
-            if not neighbor.state == INFECTED:
-                continue 
-            
-            prob_infects = neighbor.get_infectious_level()
-            random_num = random.random() 
-            if random_num < prob_infects:
-                return True
+        # Trying each infected neighbor in turn gives the same chance of
+        # getting the disease as one draw against 1 - prod(1 - p_j)
+        infected_days = [
+            neighbor.days_spent_infectious
+            for neighbor in neighbors
+            if neighbor.state == INFECTED
+        ]
+        if not infected_days:
+            return False
 
-        return False
+        # plain Python on this per-agent path: NumPy calls on a handful of
+        # scalars cost more than the arithmetic
+        log_escape = log_escape_list(max(infected_days) + 1)
+        prob_infects = -math.expm1(sum(log_escape[days] for days in infected_days))
+        random_num = random.random() if self.rng is None else self.rng.random()
+        return random_num < prob_infects
 
     def get_infectious_level(self, p1c=0.038, B=-0.0050367):
         if self.state == INFECTED:
-            exp = math.exp(B*(self.days_spent_infectious ** 3  -1))
-            num = (p1c / (1-p1c)) * exp
-            den = (1 + (p1c / (1-p1c) - exp )) * exp
-            return num / den
+            table = infectiousness_table(self.days_spent_infectious + 1, p1c, B)
+            return float(table[self.days_spent_infectious])
         else:
             print(f"Not infectious level for state {self.state}")
              
 
+class StateHistory:
+    """
+    Compact record of agent states over a simulation.
+
+    Each recorded step is stored as one row of uint8 state codes (one byte per
+    agent) in a buffer that grows by doubling, instead of a deepcopy of every
+    Agent object. The S/E/I/R counts of the current state are kept up to date
+    as transitions are applied, so counting a step costs O(1) rather than a
+    scan of the whole population.
+
+    Behaves like a list of snapshots: len(history) is the number of recorded
+    steps and history[step] is the array of state codes at that step.
+    """
+
+    def __init__(self, initial_state, initial_capacity=16):
+        self.current = np.array(initial_state, dtype=np.uint8)
+        self.current_counts = np.bincount(self.current, minlength=len(STATE_ORDER))
+        self._snapshots = np.empty((initial_capacity, self.current.shape[0]), dtype=np.uint8)
+        self._counts = np.empty((initial_capacity, len(STATE_ORDER)), dtype=np.int64)
+        self.num_steps = 0
+
+    def record(self, repeat=1):
+        """Append the current state as the next `repeat` steps of the history."""
+        needed = self.num_steps + repeat
+        if needed > self._snapshots.shape[0]:
+            capacity = max(needed, 2 * self.num_steps)
+            self._snapshots = np.resize(self._snapshots, (capacity, self.current.shape[0]))
+            self._counts = np.resize(self._counts, (capacity, len(STATE_ORDER)))
+        self._snapshots[self.num_steps:needed] = self.current
+        self._counts[self.num_steps:needed] = self.current_counts
+        self.num_steps = needed
+
+    def apply_transitions(self, agent_ids, new_codes):
+        """Move the given agents to new state codes and update the counts."""
+        agent_ids = np.asarray(agent_ids, dtype=np.int64)
+        new_codes = np.asarray(new_codes, dtype=np.uint8)
+        self.current_counts -= np.bincount(self.current[agent_ids], minlength=len(STATE_ORDER))
+        self.current_counts += np.bincount(new_codes, minlength=len(STATE_ORDER))
+        self.current[agent_ids] = new_codes
+
+    def __len__(self):
+        return self.num_steps
+
+    def __getitem__(self, step_num):
+        return self._snapshots[:self.num_steps][step_num]
+
+    def counts(self):
+        """Array of shape (4, steps) holding the S, E, I, R counts of each step."""
+        return self._counts[:self.num_steps].T
+
+    def color_map(self, step_num):
+        colors = np.array([STATE_COLORS[state] for state in STATE_ORDER])
+        return colors[self[step_num]].tolist()
+
+
+class TransitionLogHistory(StateHistory):
+    """
+    StateHistory that keeps the transitions of each step instead of a
+    snapshot of every agent.
+
+    Recording a step only appends its S/E/I/R counts, so a step costs time
+    proportional to the number of agents that changed state rather than to
+    the population. history[step] rebuilds the snapshot by replaying the log,
+    starting from the last snapshot rebuilt when that is earlier, so walking
+    through the steps in order replays each transition once.
+    """
+
+    def __init__(self, initial_state, initial_capacity=16):
+        self.initial = np.array(initial_state, dtype=np.uint8)
+        self.initial.flags.writeable = False
+        self.current = self.initial.copy()
+        self.current_counts = np.bincount(self.current, minlength=len(STATE_ORDER))
+        self._counts = np.empty((initial_capacity, len(STATE_ORDER)), dtype=np.int64)
+        # _log_ends[step] is the number of logged transitions that happened
+        # before that step was recorded
+        self._log_ends = np.empty(initial_capacity, dtype=np.int64)
+        self._log_agents = np.empty(initial_capacity, dtype=np.int64)
+        self._log_codes = np.empty(initial_capacity, dtype=np.uint8)
+        self.log_size = 0
+        self.num_steps = 0
+        self._replayed = self.initial.copy()
+        self._replayed_end = 0
+
+    def record(self, repeat=1):
+        """Append the current counts as the next `repeat` steps of the history."""
+        needed = self.num_steps + repeat
+        if needed > self._counts.shape[0]:
+            capacity = max(needed, 2 * self.num_steps)
+            self._counts = np.resize(self._counts, (capacity, len(STATE_ORDER)))
+            self._log_ends = np.resize(self._log_ends, capacity)
+        self._counts[self.num_steps:needed] = self.current_counts
+        self._log_ends[self.num_steps:needed] = self.log_size
+        self.num_steps = needed
+
+    def apply_transitions(self, agent_ids, new_codes):
+        """Move the given agents to new state codes, update the counts and log the change."""
+        agent_ids = np.asarray(agent_ids, dtype=np.int64)
+        super().apply_transitions(agent_ids, new_codes)
+        needed = self.log_size + agent_ids.shape[0]
+        if needed > self._log_agents.shape[0]:
+            capacity = max(needed, 2 * self.log_size)
+            self._log_agents = np.resize(self._log_agents, capacity)
+            self._log_codes = np.resize(self._log_codes, capacity)
+        self._log_agents[self.log_size:needed] = agent_ids
+        self._log_codes[self.log_size:needed] = new_codes
+        self.log_size = needed
+
+    def __getitem__(self, step_num):
+        end = int(self._log_ends[:self.num_steps][step_num])
+        if end < self._replayed_end:
+            self._replayed = self.initial.copy()
+            self._replayed_end = 0
+        # codes only ever increase (S < E < I < R), so the latest state of an
+        # agent that changed more than once is the largest code logged for it
+        np.maximum.at(self._replayed, self._log_agents[self._replayed_end:end],
+                      self._log_codes[self._replayed_end:end])
+        self._replayed_end = end
+        return self._replayed.copy()
+
+
 class PopulationManager:
     
-    def __init__(self, graph, init_S=.9, init_I=.05, init_E=.05, init_random=False):
+    def __init__(self, graph, init_S=.9, init_I=.05, init_E=.05, init_random=False, seed=None):
         if not (init_S + init_E + init_I) == 1:
             print("Error....does not total to 1")
         
+        # every random draw of this run (initial states, countdowns,
+        # infections) comes from this generator
+        self.rng = np.random.default_rng(seed)
         population_size = graph.number_of_nodes()
         self.agents = {} # map id to the agent itself 
 
@@ -80,18 +226,20 @@ class PopulationManager:
             self.agents = self._init_agents_consistently(init_S, init_I, init_E, population_size)
 
         self.graph = graph
-        self.agent_history = []
+        self.agent_history = StateHistory(
+            [STATE_ORDER.index(self.agents[i].state) for i in range(population_size)]
+        )
 
 
     def _init_agents_consistently(self, init_S, init_I, init_E, population_size):
         agents = {}
         for i in range(population_size):
             if i < init_S * population_size:
-                agents[i] = Agent(initial_state=SUSCEPTIBLE)
+                agents[i] = Agent(initial_state=SUSCEPTIBLE, rng=self.rng)
             elif i < ((init_S + init_I) * population_size):
-                agents[i] = Agent(initial_state=INFECTED)
+                agents[i] = Agent(initial_state=INFECTED, rng=self.rng)
             else:
-                agents[i] = Agent(initial_state=EXPOSED)
+                agents[i] = Agent(initial_state=EXPOSED, rng=self.rng)
         return agents
 
     def _random_agents_init(self, init_S, init_I, init_E, num_nodes):
@@ -101,10 +249,10 @@ class PopulationManager:
 
         possible_nodes = {i for i in range(num_nodes)}
     
-        I_nodes = random.sample(list(possible_nodes), num_I)
+        I_nodes = self.rng.choice(sorted(possible_nodes), num_I, replace=False).tolist()
         possible_nodes = possible_nodes - set(I_nodes)
 
-        E_nodes = random.sample(list(possible_nodes), num_E)
+        E_nodes = self.rng.choice(sorted(possible_nodes), num_E, replace=False).tolist()
         possible_nodes = possible_nodes - set(E_nodes)
 
         S_nodes = possible_nodes
@@ -119,7 +267,7 @@ class PopulationManager:
                 state = EXPOSED
             else: 
                 state = SUSCEPTIBLE
-            agents[i] = Agent(initial_state=state)
+            agents[i] = Agent(initial_state=state, rng=self.rng)
 
         return agents
 
@@ -131,69 +279,376 @@ class PopulationManager:
 
 
     def step_all_agents(self):
-        last_step = copy.deepcopy(self.agents)
-        self.agent_history.append(last_step)
+        self.agent_history.record()
+
+        # Susceptible agents rely on the last set of neighbors. Decide who gets
+        # the disease before anyone changes state, so no copy of the agents is
+        # needed to see the last step.
+        newly_exposed = [
+            id for id, agent in self.agents.items()
+            if agent.state == SUSCEPTIBLE
+            and agent.gets_disease(self._get_agent_neighbors(id, self.graph, self.agents))
+        ]
 
+        changed = []
         for id, agent in self.agents.items():
-            # rely on the last set of neighbors and loop over them. 
-            curr_agent_neighbors = self._get_agent_neighbors(id, self.graph, last_step)
-            agent.step(curr_agent_neighbors) 
+            if agent.state == EXPOSED or agent.state == INFECTED:
+                last_state = agent.state
+                agent.step(neighbors=[])
+                if agent.state != last_state:
+                    changed.append(id)
+        for id in newly_exposed:
+            self.agents[id].state = EXPOSED
+        changed.extend(newly_exposed)
+
+        self.agent_history.apply_transitions(
+            changed, [STATE_ORDER.index(self.agents[id].state) for id in changed]
+        )
 
     def get_history(self):
         return self.agent_history
     
 
     def get_history_as_counts(self):
-        list1 = [sum(agent.state == SUSCEPTIBLE for agent_id, agent in snapshot.items()) 
-                    for snapshot in self.agent_history                
-                ]
-        list2 = [sum(agent.state == EXPOSED for agent_id, agent in snapshot.items()) 
-                    for snapshot in self.agent_history                
-                ]
-        list3 = [sum(agent.state == INFECTED for agent_id, agent in snapshot.items()) 
-                    for snapshot in self.agent_history                
-                ]
-        list4 = [sum(agent.state == RECOVERED for agent_id, agent in snapshot.items()) 
-                    for snapshot in self.agent_history                
-                ]       
-        return [list1, list2, list3, list4]
+        return self.agent_history.counts().tolist()
 
     def get_color_map(self, step_num):
-        colors = {
-            SUSCEPTIBLE : "blue",
-            EXPOSED : "yellow",
-            INFECTED : "red",
-            RECOVERED : "green"
-        }
-
-        return [
-            colors[agent.state]
-            for agent_id, agent in self.agent_history[step_num].items()
-        ]
+        return self.agent_history.color_map(step_num)
  
     def get_useful_metrics(self):
-        susceptible_history, exposed_history, infected_history, recovered_history = self.get_history_as_counts()
-        
-        def find_steady_time(lst):
-            index = len(lst) - 1  
-            for i in range(len(lst)-1, -1, -1):
-                if lst[i] == lst[-1]:
-                    index = i
-                else:
-                    break
+        return get_useful_metrics_from_counts(self.get_history_as_counts())
+
 
-            return index
+def get_useful_metrics_from_counts(history_counts):
+    susceptible_history, exposed_history, infected_history, recovered_history = history_counts
+    
+    def find_steady_time(lst):
+        index = len(lst) - 1  
+        for i in range(len(lst)-1, -1, -1):
+            if lst[i] == lst[-1]:
+                index = i
+            else:
+                break
 
-        return {
-            'time to peak infection': infected_history.index(max(infected_history)),
-            'peak infections': max(infected_history),
-            'time when steady state reached': max(find_steady_time(exposed_history), find_steady_time(infected_history)),
-            'number of uninfected individuals at the end of the experiment': susceptible_history[-1]
-        }
+        return index
 
+    return {
+        'time to peak infection': infected_history.index(max(infected_history)),
+        'peak infections': max(infected_history),
+        'time when steady state reached': max(find_steady_time(exposed_history), find_steady_time(infected_history)),
+        'number of uninfected individuals at the end of the experiment': susceptible_history[-1]
+    }
+
+
+def infectious_level(days_spent_infectious, p1c=0.038, B=-0.0050367):
+    """
+    Vectorized version of Agent.get_infectious_level. Takes an array of
+    days_spent_infectious and returns the infection probability for each.
+    """
+    exp = np.exp(B * (np.asarray(days_spent_infectious, dtype=np.float64) ** 3 - 1))
+    # odds * exp / ((1 + odds - exp) * exp) with exp cancelled, so that long
+    # infections, where exp underflows to 0, give p1c instead of 0 / 0
+    odds = p1c / (1-p1c)
+    return odds / (1 + (odds - exp))
+
+
+# infectious_level for 0, 1, 2, ... days, per (p1c, B). Shared by every run in
+# the process.
+_infectiousness_tables = {}
+
+
+def infectiousness_table(num_days, p1c=0.038, B=-0.0050367):
+    """
+    Lookup table of infectious_level indexed by days_spent_infectious.
+
+    The table for (p1c, B) is computed once and reused across agents and
+    runs; it is only rebuilt if a longer one is needed. The returned array
+    has at least num_days entries and is read-only.
+    """
+    table = _infectiousness_tables.get((p1c, B))
+    if table is None or table.shape[0] < num_days:
+        table = infectious_level(np.arange(max(num_days, 32)), p1c, B)
+        table.flags.writeable = False
+        _infectiousness_tables[(p1c, B)] = table
+    return table
+
+
+def log_escape_table(num_days, p1c=0.038, B=-0.0050367):
+    """
+    log(1 - p) for the infectiousness table, the per-neighbor term of the
+    log of the probability of not getting the disease. Levels above 1
+    (early in an infection) mean the neighbor always transmits, and give
+    log(0) = -inf.
+    """
+    with np.errstate(divide="ignore"):
+        return np.log1p(-np.minimum(infectiousness_table(num_days, p1c, B), 1.0))
+
+
+# log_escape_table as a Python list, per (p1c, B), for Agent.gets_disease
+_log_escape_lists = {}
+
+
+def log_escape_list(num_days, p1c=0.038, B=-0.0050367):
+    """log_escape_table as a list of floats with at least num_days entries."""
+    values = _log_escape_lists.get((p1c, B))
+    if values is None or len(values) < num_days:
+        values = log_escape_table(num_days, p1c, B).tolist()
+        _log_escape_lists[(p1c, B)] = values
+    return values
+
+
+def infection_probability(days_spent_infectious, p1c=0.038, B=-0.0050367):
+    """
+    Probability that a susceptible agent gets the disease from infected
+    neighbors with the given days_spent_infectious: 1 - prod_j (1 - p_j).
+    """
+    days = np.asarray(days_spent_infectious, dtype=np.int64)
+    log_escape = log_escape_table(int(days.max()) + 1, p1c, B)[days]
+    return float(-np.expm1(log_escape.sum()))
+
+
+class VectorizedPopulationManager:
+    """
+    Array-backed alternative to PopulationManager.
+
+    Agent i lives on node i of the graph (same convention as PopulationManager).
+    Instead of a dict of Agent objects, the state, countdowns and
+    days_spent_infectious of every agent are kept in NumPy arrays, and the
+    graph is converted once into a CSR adjacency matrix. Each step advances
+    all agents at once:
+
+    - exposed agents count down to infectious,
+    - infected agents count down to recovered,
+    - a susceptible agent with infected neighbors p_1, ..., p_k becomes
+      exposed with probability 1 - prod(1 - p_j). This is the same
+      probability as Agent.gets_disease, which tries each infected neighbor
+      in turn, so the statistics of the two engines match.
+
+    The history, count and metric methods return the same formats as
+    PopulationManager so existing notebooks keep working.
+    """
+
+    history_class = StateHistory
+
+    def __init__(self, graph, init_S=.9, init_I=.05, init_E=.05, init_random=False,
+                 p1c=0.038, B=-0.0050367, seed=None):
+        if not (init_S + init_E + init_I) == 1:
+            print("Error....does not total to 1")
+
+        self.graph = graph
+        self.p1c = p1c
+        self.B = B
+        self.rng = np.random.default_rng(seed)
+
+        population_size = graph.number_of_nodes()
+        # Row i holds the neighbors of agent i. Edge weights are ignored,
+        # every stored entry is 1.
+        self.adjacency = nx.to_scipy_sparse_array(
+            graph, nodelist=range(population_size), weight=None, format="csr"
+        )
+
+        if init_random:
+            self.state = self._random_states_init(init_I, init_E, population_size)
+        else:
+            self.state = self._init_states_consistently(init_S, init_I, population_size)
+
+        self.countdown_to_infectious = np.ceil(
+            self.rng.lognormal(mean=1, sigma=1, size=population_size)
+        ).astype(np.int64)
+        self.countdown_to_recovered = np.ceil(
+            self.rng.lognormal(mean=2.25, sigma=.105, size=population_size)
+        ).astype(np.int64)
+        self.days_spent_infectious = np.zeros(population_size, dtype=np.int64)
+        # days_spent_infectious never reaches countdown_to_recovered
+        self.log_escape = log_escape_table(int(self.countdown_to_recovered.max(initial=0)) + 1, p1c, B)
+
+        self.agent_history = self.history_class(self.state)
+        # the history owns the current state, transitions are applied through it
+        self.state = self.agent_history.current
+
+    def _init_states_consistently(self, init_S, init_I, population_size):
+        ids = np.arange(population_size)
+        state = np.full(population_size, E_CODE, dtype=np.uint8)
+        state[ids < (init_S + init_I) * population_size] = I_CODE
+        state[ids < init_S * population_size] = S_CODE
+        return state
+
+    def _random_states_init(self, init_I, init_E, num_nodes):
+        num_I = round(num_nodes * init_I)
+        num_E = round(num_nodes * init_E)
+
+        shuffled = self.rng.permutation(num_nodes)
+        state = np.full(num_nodes, S_CODE, dtype=np.uint8)
+        state[shuffled[:num_I]] = I_CODE
+        state[shuffled[num_I:num_I + num_E]] = E_CODE
+        return state
+
+    def _infection_probabilities(self, infected):
+        """
+        Probability that each agent is infected by at least one neighbor,
+        1 - prod_j (1 - p_j), computed as 1 - exp(A @ log(1 - p)).
+        """
+        log_escape = np.zeros(self.state.shape[0])
+        log_escape[infected] = self.log_escape[self.days_spent_infectious[infected]]
+        return -np.expm1(self.adjacency @ log_escape)
+
+    def step_all_agents(self):
+        last_state = self.state
+        self.agent_history.record()
+
+        susceptible = last_state == S_CODE
+        exposed = last_state == E_CODE
+        infected = last_state == I_CODE
+
+        # Susceptible agents rely on their neighbors' state from the last step.
+        # Only those with an infected neighbor are at risk; drawing for them
+        # alone, in id order, is also what EventDrivenPopulationManager does,
+        # so both engines follow the same trajectory for a seed.
+        prob_infects = self._infection_probabilities(infected)
+        at_risk = np.flatnonzero(susceptible & (prob_infects > 0))
+        newly_exposed = at_risk[self.rng.random(at_risk.shape[0]) < prob_infects[at_risk]]
+
+        self.countdown_to_infectious[exposed] -= 1
+        self.countdown_to_recovered[infected] -= 1
+        self.days_spent_infectious[infected] += 1
+
+        becomes_infected = np.flatnonzero(exposed & (self.countdown_to_infectious == 0))
+        becomes_recovered = np.flatnonzero(infected & (self.countdown_to_recovered == 0))
+        self.agent_history.apply_transitions(
+            np.concatenate([newly_exposed, becomes_infected, becomes_recovered]),
+            np.repeat([E_CODE, I_CODE, R_CODE],
+                      [newly_exposed.shape[0], becomes_infected.shape[0], becomes_recovered.shape[0]]),
+        )
+
+    def get_history(self):
+        return self.agent_history
+
+    def get_history_as_counts(self):
+        return self.agent_history.counts().tolist()
+
+    def get_color_map(self, step_num):
+        return self.agent_history.color_map(step_num)
+
+    def get_useful_metrics(self):
+        return get_useful_metrics_from_counts(self.get_history_as_counts())
+
+
+
+class EventDrivenPopulationManager(VectorizedPopulationManager):
+    """
+    Event-driven version of VectorizedPopulationManager for sparse outbreaks.
+
+    Only the active frontier is processed each step:
+
+    - E->I and I->R transitions are scheduled in a priority queue when an
+      agent enters E or I, using the countdowns drawn at the start, so
+      exposed and infected agents are not touched until their event is due;
+    - infection draws are made only for susceptible neighbors of infected
+      agents.
+
+    The history is a TransitionLogHistory, which keeps running S/E/I/R counts
+    and logs the transitions as events fire instead of copying every agent's
+    state each day. A step therefore costs time proportional to the number of
+    infected agents' edges rather than to the population. Once no agent is
+    exposed or infected the population can never change again; is_absorbed()
+    reports this and run() stops simulating.
+
+    In this mode the countdown arrays keep the durations drawn at the start
+    and are not decremented; days infectious are computed from the step at
+    which each agent became infected. The random draws are the same as
+    VectorizedPopulationManager's, so a seed gives the same trajectory in
+    both engines.
+    """
+
+    history_class = TransitionLogHistory
+
+    def __init__(self, graph, **kwargs):
+        super().__init__(graph, **kwargs)
+        # Agent i is infected by its neighbors, so the agents that infected
+        # agent j can reach are the rows of the transpose (the same matrix
+        # for undirected graphs).
+        self.reverse_adjacency = self.adjacency.T.tocsr()
+        self.time = 0
+        self.infected_since = np.zeros(self.state.shape[0], dtype=np.int64)
+        self.infected = set(np.flatnonzero(self.state == I_CODE).tolist())
+
+        # heap of (time, agent id, new state code); every exposed or infected
+        # agent has exactly one pending event
+        exposed_ids = np.flatnonzero(self.state == E_CODE)
+        infected_ids = np.flatnonzero(self.state == I_CODE)
+        self.events = (
+            list(zip(self.countdown_to_infectious[exposed_ids].tolist(), exposed_ids.tolist(),
+                     [I_CODE] * exposed_ids.shape[0]))
+            + list(zip(self.countdown_to_recovered[infected_ids].tolist(), infected_ids.tolist(),
+                       [R_CODE] * infected_ids.shape[0]))
+        )
+        heapq.heapify(self.events)
+
+    def is_absorbed(self):
+        return not self.events
+
+    def _infect_frontier(self, infected):
+        """Susceptible neighbors of the infected agents that get the disease this step."""
+        log_escape = self.log_escape[self.time - self.infected_since[infected]]
+
+        # gather the neighbor lists of all infected agents in one pass
+        indptr = self.reverse_adjacency.indptr
+        starts = indptr[infected]
+        lengths = indptr[infected + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        targets = self.reverse_adjacency.indices[positions]
+        log_escape = np.repeat(log_escape, lengths)
+
+        at_risk = self.state[targets] == S_CODE
+        candidates, inverse = np.unique(targets[at_risk], return_inverse=True)
+        prob_infects = -np.expm1(np.bincount(inverse, weights=log_escape[at_risk], minlength=candidates.shape[0]))
+        return candidates[self.rng.random(candidates.shape[0]) < prob_infects]
+
+    def step_all_agents(self):
+        self.agent_history.record()
+        if self.is_absorbed():
+            self.time += 1
+            return
+
+        infected = np.fromiter(self.infected, dtype=np.int64, count=len(self.infected))
+        newly_exposed = self._infect_frontier(infected)
+        self.time += 1
+
+        changed, new_codes = [], []
+        while self.events and self.events[0][0] <= self.time:
+            _, agent, code = heapq.heappop(self.events)
+            changed.append(agent)
+            new_codes.append(code)
+            if code == I_CODE:
+                self.infected.add(agent)
+                self.infected_since[agent] = self.time
+                heapq.heappush(self.events, (self.time + int(self.countdown_to_recovered[agent]), agent, R_CODE))
+            else:
+                self.infected.discard(agent)
+        for agent in newly_exposed.tolist():
+            heapq.heappush(self.events, (self.time + int(self.countdown_to_infectious[agent]), agent, I_CODE))
+
+        self.agent_history.apply_transitions(
+            np.concatenate([newly_exposed, np.array(changed, dtype=np.int64)]),
+            np.concatenate([np.full(newly_exposed.shape[0], E_CODE), np.array(new_codes, dtype=np.int64)]),
+        )
+
+    def run(self, num_steps):
+        """
+        Call step_all_agents up to num_steps times, stopping as soon as the
+        population is absorbed. The history is still filled out to num_steps
+        (the remaining steps repeat the final state), so counts and metrics
+        look the same as for a full run. Returns the number of steps simulated.
+        """
+        for step in range(num_steps):
+            if self.is_absorbed():
+                self.agent_history.record(repeat=num_steps - step)
+                self.time += num_steps - step
+                return step
+            self.step_all_agents()
+        return num_steps
 
 
-import networkx as nx
 def useful_graph_metrics(G):
 
     return {
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+from agents import VectorizedPopulationManager, get_useful_metrics_from_counts
+
+# Monte Carlo ensembles of SEIR runs.
+#
+# Every run gets its own np.random.Generator built from a child of one
+# SeedSequence, so an ensemble is reproducible from a single seed no matter
+# how many worker processes run it or in which order the runs finish.
+
+
+class EnsembleResult:
+    """
+    Count trajectories of an ensemble of runs.
+
+    counts has shape (runs, 4, steps) with the states in [S, E, I, R] order,
+    i.e. counts[run] is that run's get_history_as_counts(). This is the
+    data[simulation][state][time] layout that plot_seir_iqr expects.
+    """
+
+    def __init__(self, counts, seeds):
+        self.counts = counts
+        self.seeds = seeds
+
+    def percentile(self, q):
+        """Percentile(s) across runs, shape (4, steps) or (len(q), 4, steps)."""
+        return np.percentile(self.counts, q, axis=0)
+
+    def median(self):
+        return self.percentile(50)
+
+    def iqr(self):
+        """(25th percentile, median, 75th percentile), each of shape (4, steps)."""
+        q25, median, q75 = self.percentile([25, 50, 75])
+        return q25, median, q75
+
+    def get_useful_metrics(self):
+        """get_useful_metrics for every run, in run order."""
+        return [get_useful_metrics_from_counts(run_counts.tolist()) for run_counts in self.counts]
+
+
+# Each worker process receives the graph and the simulation settings once,
+# through the pool initializer, instead of with every task.
+_worker_settings = {}
+
+
+def _init_worker(graph, steps_per_sim, manager_class, manager_kwargs):
+    _worker_settings["graph"] = graph
+    _worker_settings["steps_per_sim"] = steps_per_sim
+    _worker_settings["manager_class"] = manager_class
+    _worker_settings["manager_kwargs"] = manager_kwargs
+
+
+def _run_one(seed):
+    manager = _worker_settings["manager_class"](
+        _worker_settings["graph"], seed=seed, **_worker_settings["manager_kwargs"]
+    )
+    for _ in range(_worker_settings["steps_per_sim"]):
+        manager.step_all_agents()
+    return np.asarray(manager.get_history_as_counts(), dtype=np.int64)
+
+
+def run_ensemble(graph, runs, steps_per_sim=150, seed=None, max_workers=None,
+                 manager_class=VectorizedPopulationManager, **manager_kwargs):
+    """
+    Run `runs` independent simulations of `graph` and collect their counts.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        Graph whose node i is agent i (see PopulationManager).
+    runs : int
+        Number of independent simulations.
+    steps_per_sim : int
+        Number of calls to step_all_agents per simulation.
+    seed : int or None
+        Seed of the whole ensemble. Run k always gets the same child seed,
+        so results do not depend on max_workers.
+    max_workers : int or None
+        Size of the process pool. None uses every core, 1 runs the
+        simulations in this process.
+    manager_class : type
+        PopulationManager or VectorizedPopulationManager.
+    **manager_kwargs
+        Passed to manager_class, e.g. init_S, init_I, init_E, init_random.
+
+    Returns
+    -------
+    EnsembleResult
+    """
+    seeds = np.random.SeedSequence(seed).spawn(runs)
+    counts = np.zeros((runs, 4, steps_per_sim), dtype=np.int64)
+
+    if max_workers == 1:
+        _init_worker(graph, steps_per_sim, manager_class, manager_kwargs)
+        for run, run_seed in enumerate(seeds):
+            counts[run] = _run_one(run_seed)
+        return EnsembleResult(counts, seeds)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(graph, steps_per_sim, manager_class, manager_kwargs),
+    ) as pool:
+        futures = {pool.submit(_run_one, run_seed): run for run, run_seed in enumerate(seeds)}
+        # write each run into its slot as soon as it finishes
+        for future in as_completed(futures):
+            counts[futures[future]] = future.result()
+
+    return EnsembleResult(counts, seeds)
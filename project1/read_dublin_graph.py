@@ -1,25 +1,178 @@
 import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+# src/graph_cache.py keeps a typed copy of the Matrix Market reader; project1
+# is run from its own directory and does not import from src.
+
 
 def _read_graph_from_file(filename):
-    fo = open(filename,'r')
-    line = fo.readline() # Read file header
-    line = fo.readline() # Number of vertices and edges
-    if not line:
-        print('error -- illegal format for input')
-        return
-    v = line.split(" ")
-    numVertices = int(v[0])
-    G = nx.Graph()
-    G.add_nodes_from(range(1,numVertices+1))
-    while True:
+    return read_matrix_market(filename)
+
+
+def _parse_numbers(text, num_columns, dtype, filename, first_line=1):
+    """
+    Parse whitespace separated numbers in one vectorized pass into rows of num_columns.
+
+    first_line is the line of the file that text starts on. If the text does
+    not parse, it is scanned line by line so that the error names the file
+    and the offending line.
+    """
+    try:
+        values = np.fromstring(text, dtype=dtype, sep=" ")
+    except ValueError:
+        values = None
+    if values is not None and values.shape[0] % num_columns == 0:
+        return values.reshape(-1, num_columns)
+
+    for number, line in enumerate(text.splitlines(), first_line):
+        tokens = line.split()
+        if not tokens:
+            continue
+        if len(tokens) != num_columns:
+            raise ValueError(f"{filename}, line {number}: expected {num_columns} values, got {len(tokens)}")
+        for token in tokens:
+            try:
+                dtype(token)
+            except ValueError:
+                raise ValueError(
+                    f"{filename}, line {number}: {token!r} is not a valid {np.dtype(dtype).name}"
+                ) from None
+    raise ValueError(f"{filename}: could not parse entries")
+
+
+def edges_to_csr(rows, cols, weights, num_nodes, symmetric):
+    """
+    CSR adjacency matrix of num_nodes nodes from edge index arrays.
+
+    With symmetric=True each off-diagonal edge is stored in both directions.
+    Repeated edges are summed.
+    """
+    if symmetric:
+        # only one triangle is stored; mirror the off-diagonal entries
+        off_diagonal = rows != cols
+        rows, cols = np.concatenate([rows, cols[off_diagonal]]), np.concatenate([cols, rows[off_diagonal]])
+        weights = np.concatenate([weights, weights[off_diagonal]])
+    matrix = sp.coo_array((weights, (rows, cols)), shape=(num_nodes, num_nodes)).tocsr()
+    matrix.sum_duplicates()
+    return matrix
+
+
+def _csr_to_graph(matrix, node_ids, directed, weighted):
+    G = nx.DiGraph() if directed else nx.Graph()
+    G.add_nodes_from(node_ids.tolist())
+    coo = matrix.tocoo()
+    if not directed:
+        # both directions are stored; networkx only needs one of them
+        upper = coo.row <= coo.col
+        coo = sp.coo_array((coo.data[upper], (coo.row[upper], coo.col[upper])), shape=coo.shape)
+    u, v = node_ids[coo.row].tolist(), node_ids[coo.col].tolist()
+    if weighted:
+        G.add_weighted_edges_from(zip(u, v, coo.data.tolist()))
+    else:
+        G.add_edges_from(zip(u, v))
+    return G
+
+
+def read_matrix_market_arrays(filename):
+    """
+    Read a Matrix Market coordinate file into arrays.
+
+    Returns (matrix, node_ids, directed, weighted) with matrix and node_ids
+    as for read_matrix_market(filename, as_csr=True); directed is True for
+    general storage and weighted is True for integer and real fields.
+    """
+    with open(filename, "r") as fo:
+        header = fo.readline().split()
+        line_number = 1
+        if len(header) < 5 or not header[0].lstrip("%").lower() == "matrixmarket":
+            raise ValueError(f"{filename}: missing MatrixMarket header")
+        layout, field, symmetry = header[2].lower(), header[3].lower(), header[4].lower()
+        if layout != "coordinate":
+            raise ValueError(f"{filename}: only coordinate files are supported, not {layout}")
+        if field not in ("pattern", "integer", "real"):
+            raise ValueError(f"{filename}: unsupported field {field}")
+        if symmetry not in ("general", "symmetric"):
+            raise ValueError(f"{filename}: unsupported symmetry {symmetry}")
+
         line = fo.readline()
-        if not line:
-            break
-        #print("Line{}: {}".format(count,line.strip()))
-        v = line.split(" ")
-        v1 = int(v[0])
-        v2 = int(v[1])
-        G.add_edge(v1,v2)
-        G.add_edge(v2,v1)
-    fo.close()
-    return G
\ No newline at end of file
+        line_number += 1
+        while line.startswith("%"):
+            line = fo.readline()
+            line_number += 1
+        size = line.split()
+        if len(size) != 3:
+            raise ValueError(f"{filename}: illegal size line {line!r}")
+        num_rows, num_cols, num_entries = (int(x) for x in size)
+        if num_rows != num_cols:
+            raise ValueError(f"{filename}: adjacency matrix must be square, got {num_rows}x{num_cols}")
+
+        text = fo.read()
+
+    weighted = field != "pattern"
+    entries = _parse_numbers(text, 3 if weighted else 2, np.float64 if weighted else np.int64,
+                             filename, line_number + 1)
+    if entries.shape[0] != num_entries:
+        raise ValueError(f"{filename}: header announces {num_entries} entries, found {entries.shape[0]}")
+
+    rows = entries[:, 0].astype(np.int64) - 1
+    cols = entries[:, 1].astype(np.int64) - 1
+    if num_entries and (min(rows.min(), cols.min()) < 0 or max(rows.max(), cols.max()) >= num_rows):
+        raise ValueError(f"{filename}: vertex index outside 1..{num_rows}")
+    weights = entries[:, 2] if weighted else np.ones(num_entries, dtype=np.int64)
+
+    matrix = edges_to_csr(rows, cols, weights, num_rows, symmetry == "symmetric")
+    if not weighted:
+        # repeated entries of a pattern file are still a single edge
+        matrix.data[:] = 1
+    return matrix, np.arange(1, num_rows + 1), symmetry == "general", weighted
+
+
+def read_matrix_market(filename, as_csr=False):
+    """
+    Read a Matrix Market coordinate file such as ia-infect-dublin.mtx.
+
+    Handles pattern, integer and real fields with general or symmetric
+    storage. The size line is checked against the entries: the matrix must be
+    square, there must be exactly the announced number of entries, and every
+    index must be in range. The entries are parsed with one vectorized NumPy
+    call instead of line by line.
+
+    Vertices keep their 1-based ids from the file. Symmetric files give an
+    nx.Graph and general files an nx.DiGraph; numeric fields become the
+    "weight" edge attribute.
+
+    With as_csr=True, returns (matrix, node_ids) instead, where matrix is a
+    SciPy CSR adjacency matrix (both directions stored for symmetric files)
+    and node_ids[i] is the file's id of row/column i.
+    """
+    matrix, node_ids, directed, weighted = read_matrix_market_arrays(filename)
+    if as_csr:
+        return matrix, node_ids
+    return _csr_to_graph(matrix, node_ids, directed=directed, weighted=weighted)
+
+
+def read_edge_list(filename, weighted=False, directed=False, comments="#", as_csr=False):
+    """
+    Read a plain edge list with one "u v" (or "u v weight") line per edge.
+
+    Vertex ids must be integers; lines starting with `comments` are skipped.
+    Returns an nx.Graph (nx.DiGraph if directed) or, with as_csr=True,
+    (matrix, node_ids) as in read_matrix_market, with node_ids sorted.
+    """
+    with open(filename, "r") as fo:
+        # comment lines are blanked rather than dropped so line numbers in errors stay right
+        text = "".join("\n" if line.startswith(comments) else line for line in fo)
+
+    entries = _parse_numbers(text, 3 if weighted else 2, np.float64 if weighted else np.int64, filename)
+    endpoints = entries[:, :2].astype(np.int64)
+    node_ids, index = np.unique(endpoints, return_inverse=True)
+    index = index.reshape(-1, 2)
+    weights = entries[:, 2] if weighted else np.ones(entries.shape[0], dtype=np.int64)
+
+    matrix = edges_to_csr(index[:, 0], index[:, 1], weights, node_ids.shape[0], not directed)
+    if not weighted:
+        matrix.data[:] = 1
+    if as_csr:
+        return matrix, node_ids
+    return _csr_to_graph(matrix, node_ids, directed=directed, weighted=weighted)
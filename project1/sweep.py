@@ -0,0 +1,165 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+import hashlib
+import json
+import os
+import networkx as nx
+import numpy as np
+
+from ensemble import EnsembleResult, run_ensemble
+
+# Parameter sweeps over SEIR ensembles.
+#
+# Each cell of a sweep (one graph plus one set of manager parameters) is an
+# ensemble of runs. Finished cells are saved to disk under a hash of the graph
+# structure, the parameters, the seed, and the run length, so re-running a
+# notebook only computes cells that have not been computed before.
+
+
+def parameter_grid(**values):
+    """
+    All combinations of the given parameter values, as a list of dicts.
+
+    >>> parameter_grid(init_I=[.05, .1], p1c=[.038])
+    [{'init_I': 0.05, 'p1c': 0.038}, {'init_I': 0.1, 'p1c': 0.038}]
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in product(*values.values())]
+
+
+def graph_fingerprint(graph):
+    """Hash of the graph structure (node i is agent i, as in PopulationManager)."""
+    adjacency = nx.to_scipy_sparse_array(
+        graph, nodelist=range(graph.number_of_nodes()), weight=None, format="csr"
+    )
+    adjacency.sort_indices()
+    digest = hashlib.sha256()
+    digest.update(b"directed" if graph.is_directed() else b"undirected")
+    digest.update(adjacency.indptr.astype(np.int64).tobytes())
+    digest.update(adjacency.indices.astype(np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class SweepCache:
+    """Finished sweep cells stored as one .npz file per cell in cache_dir."""
+
+    def __init__(self, cache_dir="sweep_cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, fingerprint, params, seed, runs, steps_per_sim):
+        description = json.dumps({
+            "graph": fingerprint,
+            "params": params,
+            "seed": seed,
+            "runs": runs,
+            "steps_per_sim": steps_per_sim,
+        }, sort_keys=True)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.npz"
+
+    def load(self, key):
+        """Cached counts for key, or None if the cell has not been computed."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return data["counts"]
+
+    def save(self, key, counts, params):
+        # write to a temporary file first so an interrupted sweep never
+        # leaves a half-written cell behind
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, counts=counts, params=json.dumps(params, sort_keys=True))
+        os.replace(tmp_path, path)
+
+
+def _run_cell(graph, runs, steps_per_sim, seed, manager_kwargs):
+    return run_ensemble(graph, runs, steps_per_sim=steps_per_sim, seed=seed,
+                        max_workers=1, **manager_kwargs).counts
+
+
+def run_sweep(graphs, grid, runs, steps_per_sim=150, seed=0, cache_dir="sweep_cache",
+              max_workers=None):
+    """
+    Run an ensemble for every cell of a parameter grid, reusing cached cells.
+
+    Parameters
+    ----------
+    graphs : dict[str, nx.Graph]
+        Graphs to sweep over, by name.
+    grid : list[dict]
+        Cells of the sweep, e.g. from parameter_grid. Each cell must have a
+        "graph" entry naming one of graphs; the other entries are passed to
+        VectorizedPopulationManager (init_S, init_I, init_E, init_random,
+        p1c, B).
+    runs : int
+        Number of runs per cell.
+    steps_per_sim : int
+        Number of steps per run.
+    seed : int or None
+        Ensemble seed used for every cell, so cells differ only by their
+        parameters. None draws a fresh seed for this sweep; the results are
+        then neither read from nor written to the cache, since a cached
+        unseeded run would be returned for every later one.
+    cache_dir : str or Path
+        Directory of the result cache.
+    max_workers : int or None
+        Size of the process pool that computes missing cells. None uses
+        every core, 1 computes them in this process.
+
+    Returns
+    -------
+    list[tuple[dict, EnsembleResult]]
+        (cell, result) pairs in grid order.
+    """
+    use_cache = seed is not None
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    cache = SweepCache(cache_dir)
+    fingerprints = {name: graph_fingerprint(graph) for name, graph in graphs.items()}
+    seeds = np.random.SeedSequence(seed).spawn(runs)
+
+    keys = []
+    results = {}
+    missing = {}  # cache key -> index of the first cell that needs it
+    for cell_index, cell in enumerate(grid):
+        manager_kwargs = {name: value for name, value in cell.items() if name != "graph"}
+        key = cache.key(fingerprints[cell["graph"]], manager_kwargs, seed, runs, steps_per_sim)
+        keys.append(key)
+        counts = cache.load(key) if use_cache else None
+        if counts is not None:
+            results[key] = counts
+        elif key not in missing:
+            missing[key] = cell_index
+
+    def _cell_args(cell_index):
+        cell = grid[cell_index]
+        manager_kwargs = {name: value for name, value in cell.items() if name != "graph"}
+        return graphs[cell["graph"]], runs, steps_per_sim, seed, manager_kwargs
+
+    if max_workers == 1:
+        for key, cell_index in missing.items():
+            results[key] = _run_cell(*_cell_args(cell_index))
+            if use_cache:
+                cache.save(key, results[key], grid[cell_index])
+    elif missing:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(_run_cell, *_cell_args(cell_index)): (key, cell_index)
+                for key, cell_index in missing.items()
+            }
+            # save each cell as soon as it finishes so an interrupted sweep
+            # keeps its progress
+            for future in as_completed(futures):
+                key, cell_index = futures[future]
+                results[key] = future.result()
+                if use_cache:
+                    cache.save(key, results[key], grid[cell_index])
+
+    return [(cell, EnsembleResult(results[key], seeds)) for cell, key in zip(grid, keys)]
@@ -1,5 +1,31 @@
-from typing import Tuple
+from typing import Callable, Tuple
 import matplotlib.pyplot as plt
+import numpy as np
+from numpy.typing import NDArray
+
+# Integration methods accepted by SIR_simulation
+INTEGRATION_METHODS: Tuple[str, ...] = ("euler", "midpoint", "rk4", "rk45")
+
+###########################################
+## Dormand-Prince 5(4) Butcher tableau   ##
+###########################################
+# Stage times, stage coefficients, 5th order weights (which are also the
+# last stage, so the last derivative is reused by the next step) and the
+# difference between the 5th and 4th order weights, used as error estimate
+_DP_C: NDArray[np.float64] = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+_DP_A: NDArray[np.float64] = np.array([
+    [0, 0, 0, 0, 0, 0, 0],
+    [1/5, 0, 0, 0, 0, 0, 0],
+    [3/40, 9/40, 0, 0, 0, 0, 0],
+    [44/45, -56/15, 32/9, 0, 0, 0, 0],
+    [19372/6561, -25360/2187, 64448/6561, -212/729, 0, 0, 0],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0, 0],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0],
+])
+_DP_E: NDArray[np.float64] = _DP_A[6] - np.array([5179/57600, 0, 7571/16695, 393/640,
+                                                   -92097/339200, 187/2100, 1/40])
+
+
 class SIR_simulation:
     def __init__(self, 
                  m: float,          # Probability of contact with another person
@@ -9,28 +35,70 @@ class SIR_simulation:
                  duration: int,     # Amount of time for simulation
                  s0: int,           # Number of people initially susceptible
                  i0: int,           # Number of people initially infectious
-                 r0: int            # Number of people initially recovered
+                 r0: int,           # Number of people initially recovered
+                 method: str = "euler",  # One of INTEGRATION_METHODS
+                 rtol: float = 1e-6,     # Relative error tolerance per step (rk45 only)
+                 atol: float = 1e-6      # Absolute error tolerance per step (rk45 only)
                  ) -> None:  
+        if method not in INTEGRATION_METHODS:
+            raise ValueError(f"method must be one of {INTEGRATION_METHODS}, got {method!r}")
+        if dt <= 0:
+            raise ValueError("dt must be positive")
         # Global SIR parameters
         self.N: int = s0 + i0 + r0  # Initial population size
         self.beta: float = m * p    # Beta parameter is rate at which susceptible people become infectious
         self.gamma: float = gamma
-        # List of population number per compartment in SIR model
-        self.S: list[float] = [s0]
-        self.I: list[float] = [i0]
-        self.R: list[float] = [r0]
+        # Population number per compartment in SIR model at each time in t.
+        # run_simulation replaces these with the whole history
+        self.S: NDArray[np.float64] = np.array([s0], dtype=np.float64)
+        self.I: NDArray[np.float64] = np.array([i0], dtype=np.float64)
+        self.R: NDArray[np.float64] = np.array([r0], dtype=np.float64)
         # Simulation parameters
-        self.t: list[float] = [0]
+        self.t: NDArray[np.float64] = np.zeros(1)
         self.dt: float = dt
         self.duration: int = duration
+        self.method: str = method
+        self.rtol: float = rtol
+        self.atol: float = atol
     
     def run_simulation(self) -> None:
-        while self.t[-1] < self.duration:
-            s_next, i_next, r_next = self.euler_integration(self.S[-1], self.I[-1], self.R[-1])
-            self.S.append(s_next)
-            self.I.append(i_next)
-            self.R.append(r_next)
-            self.t.append(self.t[-1] + self.dt)
+        """
+        Integrate the model from t = 0 to duration with self.method and
+        store the history in the arrays t, S, I and R.
+
+        The fixed step methods (euler, midpoint, rk4) take
+        ceil(duration / dt) steps of size dt. rk45 starts with a step of
+        dt and then picks each step so that the estimated local error
+        stays within atol + rtol * |value|, so t is not evenly spaced;
+        the last step ends exactly at duration.
+        """
+        s0, i0, r0 = float(self.S[0]), float(self.I[0]), float(self.R[0])
+        if self.method == "rk45":
+            self.t, Y = self._adaptive_integration(np.array([s0, i0, r0]))
+            self.S, self.I, self.R = Y[:, 0], Y[:, 1], Y[:, 2]
+            return
+
+        step: Callable[[float, float, float], Tuple[float, float, float]] = {
+            "euler": self.euler_integration,
+            "midpoint": self.midpoint_integration,
+            "rk4": self.rk4_integration,
+        }[self.method]
+        # The number of steps is known up front, so the arrays are
+        # allocated once instead of growing by one element per step.
+        # The rounding guards against duration / dt landing just above
+        # an integer (e.g. 140 / 0.1)
+        num_steps: int = max(int(np.ceil(round(self.duration / self.dt, 9))), 0)
+        S: NDArray[np.float64] = np.empty(num_steps + 1)
+        I: NDArray[np.float64] = np.empty(num_steps + 1)
+        R: NDArray[np.float64] = np.empty(num_steps + 1)
+        s, i, r = S[0], I[0], R[0] = s0, i0, r0
+        for k in range(1, num_steps + 1):
+            s, i, r = step(s, i, r)
+            S[k] = s
+            I[k] = i
+            R[k] = r
+        self.S, self.I, self.R = S, I, R
+        self.t = np.arange(num_steps + 1) * self.dt
     
     ###########################
     ## Integration functions ##
@@ -43,10 +111,9 @@ class SIR_simulation:
         #############################
         # Euler integration method ##
         #############################    
-        s_next: float = s + self.dt * self.f(s, i, r)
-        i_next: float = i + self.dt * self.g(s, i, r)
-        r_next: float = r + self.dt * self.h(s, i, r)
-        return (s_next, i_next, r_next)
+        dt: float = self.dt
+        ds, di, dr = self.derivatives(s, i, r)
+        return (s + dt * ds, i + dt * di, r + dt * dr)
     
     def midpoint_integration(self,
                              s: float,
@@ -55,11 +122,76 @@ class SIR_simulation:
                              ) -> Tuple[float, float, float]:
         ################################
         # Midpoint integration method ##
-        ################################                     
-        s_next: float = s + self.dt/2 * self.f(s,i,r)
-        i_next: float = i + self.dt/2 * self.h(s,i,r)
-        r_next: float = r + self.dt/2 * self.g(s,i,r)
-        return (s_next, i_next, r_next)
+        ################################
+        # Take half an Euler step, then a whole step with the rates
+        # at that midpoint
+        half: float = self.dt / 2
+        ds, di, dr = self.derivatives(s, i, r)
+        ds, di, dr = self.derivatives(s + half * ds, i + half * di, r + half * dr)
+        return (s + self.dt * ds, i + self.dt * di, r + self.dt * dr)
+
+    def rk4_integration(self,
+                        s: float,
+                        i: float,
+                        r: float
+                        ) -> Tuple[float, float, float]:
+        ##############################################
+        # Classical 4th order Runge-Kutta method    ##
+        ##############################################
+        dt: float = self.dt
+        half: float = dt / 2
+        ds1, di1, dr1 = self.derivatives(s, i, r)
+        ds2, di2, dr2 = self.derivatives(s + half * ds1, i + half * di1, r + half * dr1)
+        ds3, di3, dr3 = self.derivatives(s + half * ds2, i + half * di2, r + half * dr2)
+        ds4, di4, dr4 = self.derivatives(s + dt * ds3, i + dt * di3, r + dt * dr3)
+        sixth: float = dt / 6
+        return (s + sixth * (ds1 + 2 * ds2 + 2 * ds3 + ds4),
+                i + sixth * (di1 + 2 * di2 + 2 * di3 + di4),
+                r + sixth * (dr1 + 2 * dr2 + 2 * dr3 + dr4))
+
+    def _adaptive_integration(self, y0: NDArray[np.float64]
+                              ) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+        ################################################
+        # Dormand-Prince 5(4) with step size control  ##
+        ################################################
+        # Returns the accepted times and an array with one (s, i, r) row
+        # per time. The arrays start with room for as many points as a
+        # fixed step run with dt would need and double when full.
+        capacity: int = max(int(np.ceil(self.duration / self.dt)), 1) + 1
+        times: NDArray[np.float64] = np.empty(capacity)
+        Y: NDArray[np.float64] = np.empty((capacity, 3))
+        times[0], Y[0] = 0.0, y0
+        count: int = 1
+
+        t: float = 0.0
+        y: NDArray[np.float64] = y0
+        h: float = min(self.dt, self.duration)
+        K: NDArray[np.float64] = np.empty((7, 3))
+        K[0] = self.derivatives(*y)
+        while t < self.duration:
+            h = min(h, self.duration - t)
+            for stage in range(1, 7):
+                K[stage] = self.derivatives(*(y + h * (_DP_A[stage, :stage] @ K[:stage])))
+            y_next: NDArray[np.float64] = y + h * (_DP_A[6, :6] @ K[:6])
+            scale: NDArray[np.float64] = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_next))
+            error: float = float(np.max(np.abs(h * (_DP_E @ K)) / scale))
+            if error <= 1.0:
+                t = self.duration if h == self.duration - t else t + h
+                y = y_next
+                K[0] = K[6]
+                if count == capacity:
+                    capacity *= 2
+                    times = np.resize(times, capacity)
+                    Y = np.resize(Y, (capacity, 3))
+                times[count], Y[count] = t, y
+                count += 1
+            # Standard step size update for a 5th order method, with the
+            # change limited to a factor between 1/5 and 5 per step
+            factor: float = 5.0 if error == 0 else 0.9 * error ** -0.2
+            h *= min(5.0, max(0.2, factor))
+            if t + h == t:
+                raise RuntimeError(f"rk45 step size underflow at t = {t}")
+        return times[:count], Y[:count]
         
     #################################
     ## Functions used in SIR Model ##
@@ -73,6 +205,11 @@ class SIR_simulation:
     def h(self,s,i,r) -> float: 
         # From dR/dt equation
         return self.gamma*i
+    def derivatives(self, s: float, i: float, r: float) -> Tuple[float, float, float]:
+        # (f, g, h) at once, computing the infection rate only once
+        infections: float = self.beta * i * s / self.N
+        recoveries: float = self.gamma * i
+        return (-infections, infections - recoveries, recoveries)
     
     ## Plotting functions ##
     def show_plot(self, name) -> None:
@@ -80,7 +217,7 @@ class SIR_simulation:
                  self.t,self.I,'g--',
                  self.t,self.R,'b:')
         plt.legend(['S','I','R'])
-        title = 'SIR model via Euler: beta = ' \
+        title = 'SIR model via ' + self.method + ': beta = ' \
             + str(self.beta) \
             + ', gamma = ' + str(self.gamma) \
             + ', and R0 = ' + str(self.beta/self.gamma)
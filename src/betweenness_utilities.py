@@ -0,0 +1,253 @@
+"""Edge betweenness helpers shared by the Girvan-Newman dendrogram handlers."""
+
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+import os
+import pickle
+import networkx as nx  # type: ignore
+import numpy as np
+from numpy.typing import NDArray
+
+Edge = Tuple[Hashable, Hashable]
+
+
+def _shortest_path_dag(adj: Dict[Hashable, Dict[Hashable, Any]],
+                       s: Hashable) -> Tuple[List[Hashable], Dict[Hashable, List[Hashable]], Dict[Hashable, float]]:
+    """
+    BFS from s: the nodes in order of distance (S), the predecessors of each
+    node on shortest paths from s (P) and the number of those paths (sigma).
+    """
+    S: List[Hashable] = []
+    P: Dict[Hashable, List[Hashable]] = {s: []}
+    sigma: Dict[Hashable, float] = {s: 1.0}
+    D: Dict[Hashable, int] = {s: 0}
+    Q = deque([s])
+    while Q:
+        v = Q.popleft()
+        S.append(v)
+        Dv = D[v]
+        sigmav = sigma[v]
+        for w in adj[v]:
+            if w not in D:
+                Q.append(w)
+                D[w] = Dv + 1
+                sigma[w] = 0.0
+                P[w] = []
+            if D[w] == Dv + 1:
+                sigma[w] += sigmav
+                P[w].append(v)
+    return S, P, sigma
+
+
+def accumulate_edge_betweenness(graph: nx.Graph,
+                                sources: Iterable[Hashable],
+                                betweenness: Dict[Edge, float]) -> Dict[Edge, float]:
+    """
+    Add the unnormalized (Brandes) edge betweenness contributions of the
+    given sources to betweenness, which is keyed by the edges of graph in
+    graph.edges() orientation.
+
+    The arithmetic, and the order in which it is done, is the same as in
+    nx.edge_betweenness_centrality, so summing over the sources in graph
+    node order gives bit-for-bit the same scores. That matters because
+    Girvan-Newman removes the first edge whose score equals the maximum.
+    """
+    # the adjacency dict itself; graph[v] builds a view on every lookup
+    adj = graph._adj
+    for s in sources:
+        S, P, sigma = _shortest_path_dag(adj, s)
+
+        # accumulate dependencies back from the farthest nodes
+        delta: Dict[Hashable, float] = dict.fromkeys(S, 0)
+        while S:
+            w = S.pop()
+            coeff = (1 + delta[w]) / sigma[w]
+            for v in P[w]:
+                c = sigma[v] * coeff
+                if (v, w) not in betweenness:
+                    betweenness[(w, v)] += c
+                else:
+                    betweenness[(v, w)] += c
+                delta[v] += c
+    return betweenness
+
+
+def source_edge_contributions(graph: nx.Graph,
+                              sources: List[Hashable],
+                              edge_index: Dict[Edge, int]) -> Tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.float64]]:
+    """
+    The terms accumulate_edge_betweenness adds for each source, kept apart
+    per source in CSR layout: the terms of sources[r] are
+    terms[indptr[r]:indptr[r + 1]] and go to the edges with those
+    edge_index values in columns. edge_index must hold both orientations
+    of every edge of graph.
+
+    An edge gets at most one term per source, so adding each source's
+    terms to a vector of zeros in source order repeats the additions of
+    accumulate_edge_betweenness exactly.
+    """
+    adj = graph._adj
+    indptr: List[int] = [0]
+    columns: List[int] = []
+    terms: List[float] = []
+    for s in sources:
+        S, P, sigma = _shortest_path_dag(adj, s)
+        delta: Dict[Hashable, float] = dict.fromkeys(S, 0)
+        while S:
+            w = S.pop()
+            coeff = (1 + delta[w]) / sigma[w]
+            for v in P[w]:
+                c = sigma[v] * coeff
+                columns.append(edge_index[(v, w)])
+                terms.append(c)
+                delta[v] += c
+        indptr.append(len(columns))
+    return (np.array(indptr, dtype=np.int64), np.array(columns, dtype=np.int64),
+            np.array(terms, dtype=np.float64))
+
+
+def edge_betweenness_scale(n_nodes: int, normalized: bool) -> float:
+    """The factor nx.edge_betweenness_centrality applies to undirected raw scores."""
+    if n_nodes < 2:
+        return 1.0
+    if normalized:
+        return 1 / (n_nodes * (n_nodes - 1))
+    return n_nodes / (n_nodes * 2)
+
+
+def first_max_edge(betweenness: Dict[Edge, float]) -> Edge:
+    """The first edge (in dict order) whose score equals the maximum score."""
+    max_bw: float = max(betweenness.values())
+    return next(edge for edge, score in betweenness.items() if score == max_bw)
+
+
+##############################
+## Process pool computation ##
+##############################
+
+# Each worker process keeps its own copy of the original graph, unpickled
+# from a snapshot so that every neighbor dict keeps its order (G.copy() does
+# not keep it, and the order decides how the floating point sums round). The
+# parent writes the index (in G.edges() order) of every edge Girvan-Newman
+# removes to a log in shared memory, and each task only says how long the log
+# is, so a worker removes just the edges logged since its previous task.
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(snapshot: bytes, log_name: str) -> None:
+    G: nx.Graph = pickle.loads(snapshot)
+    edges: List[Edge] = list(G.edges())
+    block = shared_memory.SharedMemory(name=log_name)
+    _worker_state["block"] = block
+    _worker_state["log"] = np.ndarray((max(len(edges), 1),), dtype=np.int64, buffer=block.buf)
+    _worker_state["applied"] = 0
+    _worker_state["graph"] = G
+    _worker_state["edges"] = edges
+    _worker_state["edge_index"] = _both_orientations(edges)
+
+
+def _both_orientations(edges: List[Edge]) -> Dict[Edge, int]:
+    edge_index = {(v, u): i for i, (u, v) in enumerate(edges)}
+    edge_index.update((edge, i) for i, edge in enumerate(edges))
+    return edge_index
+
+
+def _worker_contributions(sources: List[Hashable], num_removed: int
+                          ) -> Tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.float64]]:
+    graph, edges = _worker_state["graph"], _worker_state["edges"]
+    for i in _worker_state["log"][_worker_state["applied"]:num_removed].tolist():
+        graph.remove_edge(*edges[i])
+    _worker_state["applied"] = num_removed
+    return source_edge_contributions(graph, sources, _worker_state["edge_index"])
+
+
+class ParallelEdgeBetweenness:
+    """
+    Edge betweenness for Girvan-Newman with the Brandes pass (one BFS and
+    accumulation per source) fanned out over a process pool.
+
+    The source list is cut into one contiguous slice per worker. Each worker
+    returns every source's terms separately (source_edge_contributions), and
+    they are added up here in the order the sources were given, which is
+    the order accumulate_edge_betweenness and nx.edge_betweenness_centrality
+    add them in. The scores, and therefore which edge is removed when
+    several tie, are bitwise identical to the serial computation for any
+    n_workers; n_workers=1 runs accumulate_edge_betweenness in this process.
+
+    G should be the graph Girvan-Newman will remove edges from, not just an
+    equal one: the workers follow its neighbor order, and a copy made with
+    G.copy() can order neighbors differently. The graphs passed to
+    raw_scores and scores must be G with some of its edges removed, and
+    every removal must be reported with edge_removed before the next call.
+    Use as a context manager (or call close()) to shut the pool down.
+    """
+
+    def __init__(self, G: nx.Graph, n_workers: int | None = None) -> None:
+        self.n_nodes: int = G.number_of_nodes()
+        self.edges: List[Edge] = list(G.edges())
+        self.n_workers: int = n_workers or os.cpu_count() or 1
+        self.pool: ProcessPoolExecutor | None = None
+        self.num_removed = 0
+        if self.n_workers == 1:
+            return
+        self.edge_index: Dict[Edge, int] = _both_orientations(self.edges)
+        self._block = shared_memory.SharedMemory(create=True, size=8 * max(len(self.edges), 1))
+        self._log: NDArray[np.int64] = np.ndarray((max(len(self.edges), 1),), dtype=np.int64, buffer=self._block.buf)
+        # workers start when the first task is submitted, possibly after
+        # edges have been removed, so they get G as it is now
+        self.pool = ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                        initargs=(pickle.dumps(G), self._block.name))
+
+    def __enter__(self) -> ParallelEdgeBetweenness:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            self._block.close()
+            self._block.unlink()
+
+    def edge_removed(self, u: Hashable, v: Hashable) -> None:
+        """Record that the edge (u, v) of G has been removed from the graph."""
+        if self.pool is not None:
+            self._log[self.num_removed] = self.edge_index[(u, v)]
+        self.num_removed += 1
+
+    def raw_scores(self, graph: nx.Graph, sources: Iterable[Hashable]) -> Dict[Edge, float]:
+        """
+        Unscaled edge betweenness of graph summed over the given sources,
+        in the given order. Edges that no source reaches are left out, and
+        keys follow G's edge orientation.
+        """
+        if self.pool is None:
+            total = accumulate_edge_betweenness(graph, sources, dict.fromkeys(graph.edges(), 0.0))
+            return {edge: score for edge, score in total.items() if score}
+
+        sources = list(sources)
+        num_tasks = min(self.n_workers, len(sources))
+        bounds = np.linspace(0, len(sources), num_tasks + 1).astype(int).tolist()
+        slices = [sources[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+        scores = np.zeros(len(self.edges))
+        # pool.map returns the slices in order; add their sources' terms one
+        # source at a time
+        for indptr, columns, terms in self.pool.map(_worker_contributions, slices,
+                                                    [self.num_removed] * len(slices)):
+            for a, b in zip(indptr[:-1].tolist(), indptr[1:].tolist()):
+                scores[columns[a:b]] += terms[a:b]
+        return {self.edges[i]: float(scores[i]) for i in np.flatnonzero(scores).tolist()}
+
+    def scores(self, graph: nx.Graph, normalized: bool = True) -> Dict[Edge, float]:
+        """
+        Edge betweenness of graph like nx.edge_betweenness_centrality: keyed
+        and ordered by graph.edges(), scaled by the number of nodes of G.
+        """
+        raw = self.raw_scores(graph, graph.nodes())
+        scale = edge_betweenness_scale(self.n_nodes, normalized)
+        return {(u, v): raw.get((u, v), raw.get((v, u), 0.0)) * scale for u, v in graph.edges()}
@@ -1,7 +1,58 @@
 import networkx as nx # type: ignore
 import numpy as np
 from numpy.typing import NDArray
-from typing import Tuple
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
+import scipy.sparse as sp  # type: ignore
+import scipy.sparse.linalg as spla  # type: ignore
+from graph_matrices import GraphMatrices, graph_matrices
+
+
+# Graphs with at most this many nodes use the dense eigensolver, which
+# returns every eigenpair; larger ones use ARPACK on the sparse adjacency.
+DENSE_MAX_NODES = 100
+
+
+def _principal_eigenpair(A: sp.sparray,
+                         which: Literal["LA", "LR", "LM"]) -> Tuple[float, NDArray[np.floating]]:
+    """
+    The eigenpair of the largest eigenvalue of the sparse matrix A.
+
+    "Largest" follows which: the largest algebraic eigenvalue of a symmetric
+    matrix ("LA"), or the largest real part ("LR") or magnitude ("LM") of a
+    general one. By the Perron-Frobenius theorem "LA" and "LR" give the
+    eigenvalue of largest magnitude for the adjacency matrix of a connected
+    (strongly connected) graph.
+
+    Small matrices get every eigenpair from a dense solver (eigh or eig)
+    and the pair is chosen by the same rule; larger ones get only that pair
+    from ARPACK (eigsh or eigs). Either way the eigenvalue and vector are
+    made real when their imaginary parts are negligible, and the vector is
+    scaled to unit norm with a nonnegative sum, so it is the Perron vector
+    with positive entries when there is one. Both paths give the same
+    result for the same graph.
+    """
+    n = A.shape[0]
+    if n <= DENSE_MAX_NODES:
+        if which == "LA":
+            eigenvalues, eigenvectors = np.linalg.eigh(A.toarray().astype(np.float64))
+            index = np.argmax(eigenvalues)
+        else:
+            eigenvalues, eigenvectors = np.linalg.eig(A.toarray().astype(np.float64))
+            index = np.argmax(np.real(eigenvalues) if which == "LR" else np.abs(eigenvalues))
+        eigenvalues, eigenvectors = eigenvalues[index:index + 1], eigenvectors[:, index:index + 1]
+    else:
+        # a positive start vector, so the result does not depend on a random one
+        v0 = np.full(n, 1 / np.sqrt(n))
+        A = A.astype(np.float64)
+        if which == "LA":
+            eigenvalues, eigenvectors = spla.eigsh(A, k=1, which="LA", v0=v0)
+        else:
+            eigenvalues, eigenvectors = spla.eigs(A, k=1, which=which, v0=v0)
+    principal_eigenvalue = np.real_if_close(eigenvalues[0])
+    principal_eigenvector = np.real_if_close(eigenvectors[:, 0])
+    if np.real(principal_eigenvector.sum()) < 0:
+        principal_eigenvector = -principal_eigenvector
+    return principal_eigenvalue, principal_eigenvector / np.linalg.norm(principal_eigenvector)
 
 
 def get_principal_eigenvector_undirected(G: nx.Graph) -> Tuple[float, NDArray[np.floating]]:
@@ -32,6 +83,13 @@ def get_principal_eigenvector_undirected(G: nx.Graph) -> Tuple[float, NDArray[np
     ValueError
         If the graph is not connected
         
+    Notes
+    -----
+    Graphs with more than DENSE_MAX_NODES nodes keep the adjacency matrix
+    sparse and compute only the principal eigenpair with ARPACK (eigsh),
+    so memory grows with the number of edges rather than n^2. The
+    eigenvector then has unit norm and a nonnegative sum.
+        
     Examples
     --------
     >>> G = nx.karate_club_graph()
@@ -45,25 +103,10 @@ def get_principal_eigenvector_undirected(G: nx.Graph) -> Tuple[float, NDArray[np
     if not nx.is_connected(G):
         raise ValueError("Undirected graph must be connected")
     
-    # Get the adjacency matrix with nodes in sorted order
-    A: NDArray[np.floating] = nx.adjacency_matrix(
-        G, 
-        nodelist=[node for node in sorted(G.nodes)]
-    ).toarray()
-    
-    # Compute the eigenvalues and eigenvectors
-    eigenvalues, eigenvectors = np.linalg.eig(A)
-    
-    # Find the index of the principal eigenvalue (the largest eigenvalue by magnitude)
-    principal_eigenvalue_index = np.argmax(np.abs(eigenvalues))
+    # Get the sparse adjacency matrix with nodes in sorted order
+    A: sp.csr_array = graph_matrices(G).adjacency()
     
-    # Get the principal eigenvalue
-    principal_eigenvalue = eigenvalues[principal_eigenvalue_index]
-    
-    # Get the principal eigenvector
-    principal_eigenvector = eigenvectors[:, principal_eigenvalue_index]
-    
-    return principal_eigenvalue, principal_eigenvector
+    return _principal_eigenpair(A, "LA")
 
 
 def get_principal_eigenvector_directed(G: nx.DiGraph) -> Tuple[float, NDArray[np.floating]]:
@@ -95,6 +138,11 @@ def get_principal_eigenvector_directed(G: nx.DiGraph) -> Tuple[float, NDArray[np
     ValueError
         If the graph is not strongly connected
         
+    Notes
+    -----
+    As in get_principal_eigenvector_undirected, graphs with more than
+    DENSE_MAX_NODES nodes use a sparse solver (ARPACK's eigs) instead.
+        
     Examples
     --------
     >>> G = nx.DiGraph()
@@ -109,25 +157,11 @@ def get_principal_eigenvector_directed(G: nx.DiGraph) -> Tuple[float, NDArray[np
     if not nx.is_strongly_connected(G):
         raise ValueError("Directed graph must be strongly connected")
     
-    # Get the adjacency matrix with nodes in sorted order
-    A: NDArray[np.floating] = nx.adjacency_matrix(
-        G, 
-        nodelist=[node for node in sorted(G.nodes)]
-    ).toarray()
+    # Get the transpose of the sparse adjacency matrix with nodes in sorted order
+    A_T: sp.csr_array = graph_matrices(G).transpose()
     
-    # Compute the eigenvalues and eigenvectors of the transpose
-    eigenvalues, eigenvectors = np.linalg.eig(A.T)
-    
-    # Find the index of the principal eigenvalue (the largest eigenvalue by magnitude)
-    principal_eigenvalue_index = np.argmax(np.abs(eigenvalues))
-    
-    # Get the principal eigenvalue
-    principal_eigenvalue = eigenvalues[principal_eigenvalue_index]
-    
-    # Get the principal eigenvector
-    principal_eigenvector = eigenvectors[:, principal_eigenvalue_index]
-    
-    return principal_eigenvalue, principal_eigenvector
+    # The principal eigenpair of the transpose
+    return _principal_eigenpair(A_T, "LR")
 
 
 def get_principal_eigenvector_directed_unchecked(G: nx.DiGraph) -> Tuple[float, NDArray[np.floating]]:
@@ -160,6 +194,12 @@ def get_principal_eigenvector_directed_unchecked(G: nx.DiGraph) -> Tuple[float,
     TypeError
         If G is not a directed graph (nx.DiGraph)
         
+    Notes
+    -----
+    Graphs with more than DENSE_MAX_NODES nodes use ARPACK's eigs on the
+    sparse matrix. It may not converge when several eigenvalues share the
+    largest magnitude, which can happen without strong connectivity.
+        
     Examples
     --------
     >>> G = nx.DiGraph()
@@ -170,22 +210,401 @@ def get_principal_eigenvector_directed_unchecked(G: nx.DiGraph) -> Tuple[float,
     if not isinstance(G, nx.DiGraph):
         raise TypeError("Graph must be a directed graph (nx.DiGraph)")
     
-    # Get the adjacency matrix with nodes in sorted order
-    A: NDArray[np.floating] = nx.adjacency_matrix(
-        G, 
-        nodelist=[node for node in sorted(G.nodes)]
-    ).toarray()
-    
-    # Compute the eigenvalues and eigenvectors of the transpose
-    eigenvalues, eigenvectors = np.linalg.eig(A.T)
-    
-    # Find the index of the principal eigenvalue (the largest eigenvalue by magnitude)
-    principal_eigenvalue_index = np.argmax(np.abs(eigenvalues))
+    # Get the transpose of the sparse adjacency matrix with nodes in sorted order
+    A_T: sp.csr_array = graph_matrices(G).transpose()
     
-    # Get the principal eigenvalue
-    principal_eigenvalue = eigenvalues[principal_eigenvalue_index]
-    
-    # Get the principal eigenvector
-    principal_eigenvector = eigenvectors[:, principal_eigenvalue_index]
-    
-    return principal_eigenvalue, principal_eigenvector
+    # The eigenpair of largest magnitude of the transpose; without strong
+    # connectivity it need not be the one of largest real part
+    return _principal_eigenpair(A_T, "LM")
+
+
+def get_principal_eigenvectors(graphs: List[nx.Graph],
+                               check_connected: bool = True) -> List[Tuple[float, NDArray[np.floating]]]:
+    """
+    Compute the principal eigenpair of many graphs at once.
+
+    Each graph is handled as by get_principal_eigenvector_undirected (nx.Graph)
+    or get_principal_eigenvector_directed (nx.DiGraph, using the transpose of
+    the adjacency matrix), with nodes in sorted order. Graphs with at most
+    DENSE_MAX_NODES nodes are grouped by number of nodes and directedness,
+    and each group's adjacency matrices are stacked into one 3-D array so a
+    single batched np.linalg.eigh (undirected) or np.linalg.eig (directed)
+    call solves the whole group. Larger graphs go through the sparse solver
+    one at a time.
+
+    Parameters
+    ----------
+    graphs : list[nx.Graph]
+        Undirected and/or directed graphs.
+    check_connected : bool, optional
+        Require undirected graphs to be connected and directed ones strongly
+        connected, as the single-graph functions do. Default is True.
+
+    Returns
+    -------
+    list[tuple[float, NDArray]]
+        (principal eigenvalue, principal eigenvector) of each graph, in
+        input order. Eigenvalues are real when their imaginary part is
+        negligible, and eigenvectors of the batched groups are scaled to a
+        nonnegative sum, so signs can differ from the single-graph functions.
+
+    Raises
+    ------
+    ValueError
+        If check_connected and a graph is not (strongly) connected.
+
+    Examples
+    --------
+    >>> pairs = get_principal_eigenvectors([nx.cycle_graph(4), nx.complete_graph(4), nx.path_graph(2)])
+    >>> [round(float(eigenvalue), 6) for eigenvalue, _ in pairs]
+    [2.0, 3.0, 1.0]
+    """
+    results: List[Any] = [None] * len(graphs)
+    groups: Dict[Tuple[int, bool], List[int]] = {}
+    for i, G in enumerate(graphs):
+        directed = G.is_directed()
+        if check_connected and G.number_of_nodes() > 0:
+            if directed and not nx.is_strongly_connected(G):
+                raise ValueError(f"Directed graph {i} must be strongly connected")
+            if not directed and not nx.is_connected(G):
+                raise ValueError(f"Undirected graph {i} must be connected")
+        n = G.number_of_nodes()
+        if n > DENSE_MAX_NODES:
+            matrices = graph_matrices(G)
+            results[i] = _principal_eigenpair(matrices.transpose(), "LR" if directed else "LA")
+        else:
+            groups.setdefault((n, directed), []).append(i)
+
+    for (n, directed), members in groups.items():
+        # one (graphs, n, n) stack of the (transposed) adjacency matrices per group
+        stack = np.empty((len(members), n, n))
+        for k, i in enumerate(members):
+            stack[k] = graph_matrices(graphs[i]).transpose().toarray()
+        if directed:
+            eigenvalues, eigenvectors = np.linalg.eig(stack)
+        else:
+            eigenvalues, eigenvectors = np.linalg.eigh(stack)
+
+        # the principal eigenvalue of each graph is the largest by magnitude;
+        # of several (bipartite graphs, directed cycles) take the one with
+        # the largest real part, which is the Perron root
+        magnitude = np.abs(eigenvalues)
+        largest = magnitude >= magnitude.max(axis=1, keepdims=True) * (1 - 1e-9)
+        principal = np.argmax(np.where(largest, eigenvalues.real, -np.inf), axis=1)
+        for k, i in enumerate(members):
+            eigenvalue = np.real_if_close(eigenvalues[k, principal[k]])
+            eigenvector = np.real_if_close(eigenvectors[k, :, principal[k]])
+            if np.real(eigenvector.sum()) < 0:
+                eigenvector = -eigenvector
+            results[i] = (eigenvalue, eigenvector)
+    return results
+
+
+class EigenvectorCentralityTracker:
+    """
+    Eigenvector centrality of a graph that changes by a few edges at a time.
+
+    The tracker holds the sparse adjacency matrix (nodes in sorted order) and
+    the current principal eigenpair. After each batch of edge insertions and
+    deletions the eigenvector is refined by power iteration started from the
+    previous one, which takes few iterations when the batch is small. The
+    iteration uses A + I (A^T + I for digraphs, as in
+    get_principal_eigenvector_directed), like nx.eigenvector_centrality, so
+    it also converges on bipartite graphs. It stops when the residual
+    ||A x - eigenvalue x|| is at most tol * max(eigenvalue, 1).
+
+    Attributes
+    ----------
+    nodes : list
+        The nodes, in the sorted order used by the eigenvector.
+    eigenvalue : float
+        Current principal eigenvalue (Rayleigh quotient of the eigenvector).
+    eigenvector : NDArray
+        Current principal eigenvector, with unit norm and a nonnegative sum.
+    iterations : int
+        Power iterations used by the last update.
+    residual : float
+        ||A x - eigenvalue x|| after the last update.
+
+    Examples
+    --------
+    >>> tracker = EigenvectorCentralityTracker(nx.cycle_graph(6))
+    >>> round(tracker.eigenvalue, 6)
+    2.0
+    >>> iterations = tracker.update(added=[(0, 3)])
+    >>> bool(tracker.eigenvector[0] > tracker.eigenvector[1])
+    True
+    """
+
+    def __init__(self,
+                 G: nx.Graph,
+                 weight: Optional[str] = "weight",
+                 tol: float = 1e-10,
+                 max_iter: int = 10000) -> None:
+        matrices = graph_matrices(G)
+        self.directed: bool = G.is_directed()
+        self.nodes: List[Any] = matrices.nodes
+        self.index: Dict[Any, int] = matrices.index
+        self.tol = tol
+        self.max_iter = max_iter
+        # updates replace this matrix rather than edit it, so it can be shared
+        self.A: sp.csr_array = matrices.adjacency(weight)
+        self.eigenvalue: float = 0.0
+        self.eigenvector: NDArray[np.floating] = np.zeros(len(self.nodes))
+        self.iterations = 0
+        self.residual = 0.0
+        if self.nodes:
+            # start from a direct solve, then refine to the tracker's tolerance
+            _, start = _principal_eigenpair(self._operator(), "LR" if self.directed else "LA")
+            start = np.abs(np.real(start))
+            self.eigenvector = start / np.linalg.norm(start)
+            self._refine()
+
+    def _operator(self) -> sp.csr_array:
+        return self.A.T.tocsr() if self.directed else self.A
+
+    def update(self,
+               added: Iterable[Tuple[Any, ...]] = (),
+               removed: Iterable[Tuple[Any, Any]] = ()) -> int:
+        """
+        Apply a batch of edge changes and refine the eigenpair.
+
+        Parameters
+        ----------
+        added : iterable of (u, v) or (u, v, weight)
+            Edges to insert (weight 1 by default); an existing edge gets the
+            new weight.
+        removed : iterable of (u, v)
+            Edges to delete.
+
+        Returns
+        -------
+        int
+            Number of power iterations the refinement took.
+
+        Raises
+        ------
+        KeyError
+            If an edge has a node that is not in the graph.
+        ValueError
+            If a removed edge is not in the graph.
+        """
+        # the new weight of every changed entry; the last change of an edge wins
+        targets: Dict[Tuple[int, int], float] = {}
+
+        def key(u: Any, v: Any) -> Tuple[int, int]:
+            i, j = self.index[u], self.index[v]
+            return (i, j) if self.directed else (min(i, j), max(i, j))
+
+        for u, v in removed:
+            if not self.A[key(u, v)]:
+                raise ValueError(f"Edge ({u!r}, {v!r}) is not in the graph")
+            targets[key(u, v)] = 0.0
+        for edge in added:
+            targets[key(edge[0], edge[1])] = float(edge[2]) if len(edge) > 2 else 1.0
+
+        rows: List[int] = []
+        cols: List[int] = []
+        deltas: List[float] = []
+        for (i, j), new_weight in targets.items():
+            delta = new_weight - self.A[i, j]
+            if not delta:
+                continue
+            for a, b in [(i, j)] if self.directed or i == j else [(i, j), (j, i)]:
+                rows.append(a)
+                cols.append(b)
+                deltas.append(delta)
+
+        if deltas:
+            n = len(self.nodes)
+            self.A = (self.A + sp.coo_array((deltas, (rows, cols)), shape=(n, n)).tocsr()).tocsr()
+            self.A.eliminate_zeros()
+        self._refine()
+        return self.iterations
+
+    def _refine(self) -> None:
+        M = self._operator()
+        x = self.eigenvector
+        for iteration in range(self.max_iter + 1):
+            Mx = M @ x
+            self.eigenvalue = float(x @ Mx)
+            self.residual = float(np.linalg.norm(Mx - self.eigenvalue * x))
+            if self.residual <= self.tol * max(abs(self.eigenvalue), 1.0):
+                self.iterations = iteration
+                self.eigenvector = x
+                return
+            x = Mx + x
+            x = x / np.linalg.norm(x)
+        raise nx.PowerIterationFailedConvergence(self.max_iter)
+
+
+def _spectral_radius(matrices: GraphMatrices, weight: Optional[str]) -> float:
+    """Largest eigenvalue magnitude of the adjacency matrix, cached with it."""
+    if ("spectral_radius", weight) not in matrices.derived:
+        A = matrices.adjacency(weight)
+        n = A.shape[0]
+        if n <= DENSE_MAX_NODES:
+            radius = float(np.max(np.abs(np.linalg.eigvals(A.toarray())), initial=0.0))
+        else:
+            v0 = np.full(n, 1 / np.sqrt(n))
+            solver = spla.eigs if matrices.directed else spla.eigsh
+            radius = float(np.abs(solver(A, k=1, which="LM", v0=v0, return_eigenvectors=False)[0]))
+        matrices.derived[("spectral_radius", weight)] = radius
+    return matrices.derived[("spectral_radius", weight)]
+
+
+#######################
+## Katz and PageRank ##
+#######################
+
+def get_katz_centrality(G: nx.Graph,
+                        alpha: float = 0.1,
+                        beta: float = 1.0,
+                        normalized: bool = True,
+                        weight: Optional[str] = None,
+                        x0: Optional[NDArray[np.floating]] = None,
+                        tol: float = 1e-10) -> NDArray[np.floating]:
+    """
+    Compute Katz centrality with a sparse iterative solver.
+
+    Solves (I - alpha A^T) x = beta 1, where A is the adjacency matrix with
+    nodes in sorted order, by conjugate gradients (undirected graphs, where
+    the matrix is symmetric positive definite) or BiCGSTAB (directed
+    graphs). This is the system nx.katz_centrality_numpy solves densely;
+    the results agree, in sorted node order.
+
+    Parameters
+    ----------
+    G : nx.Graph
+        An undirected or directed NetworkX graph.
+    alpha : float, optional
+        Attenuation factor; must be below 1 / (spectral radius of A) for the
+        Katz series to converge. Default is 0.1.
+    beta : float, optional
+        Weight attributed to every node. Default is 1.0.
+    normalized : bool, optional
+        Scale the result to unit norm with a positive sum. Default is True.
+    weight : str, optional
+        Edge attribute used as weight, or None for unweighted. Default is None.
+    x0 : NDArray, optional
+        A previous solution (for example for a slightly different alpha) to
+        start from. It is rescaled first, so a normalized one works too.
+    tol : float, optional
+        Relative residual tolerance. Default is 1e-10.
+
+    Returns
+    -------
+    NDArray
+        Katz centrality of each node, in sorted node order.
+
+    Raises
+    ------
+    ValueError
+        If alpha is not below 1 / (spectral radius of A).
+    nx.ExceededMaxIterations
+        If the iterative solver does not converge.
+
+    Examples
+    --------
+    >>> x = get_katz_centrality(nx.path_graph(3), alpha=0.1)
+    >>> bool(x[1] > x[0] == x[2])
+    True
+    """
+    matrices = graph_matrices(G)
+    n = len(matrices.nodes)
+    if n == 0:
+        return np.zeros(0)
+    radius = _spectral_radius(matrices, weight)
+    if alpha * radius >= 1:
+        raise ValueError(f"alpha must be below 1 / spectral radius = {1 / radius:.6g}, got {alpha}")
+
+    M = sp.identity(n, format="csr") - alpha * matrices.transpose(weight)
+    b = np.full(n, float(beta))
+    if x0 is not None:
+        # scale the start to the least-squares fit of M x = b along it
+        Mx0 = M @ x0
+        x0 = x0 * (Mx0 @ b) / (Mx0 @ Mx0) if Mx0 @ Mx0 > 0 else None
+    solver = spla.bicgstab if G.is_directed() else spla.cg
+    x, info = solver(M, b, x0=x0, rtol=tol, atol=0.0, maxiter=10 * n)
+    if info > 0:
+        raise nx.ExceededMaxIterations(f"Katz solver did not converge in {info} iterations")
+
+    if normalized:
+        x = x / (np.sign(x.sum()) * np.linalg.norm(x))
+    return x
+
+
+def get_pagerank(G: nx.Graph,
+                 alpha: float = 0.85,
+                 weight: Optional[str] = "weight",
+                 x0: Optional[NDArray[np.floating]] = None,
+                 tol: float = 1e-6,
+                 max_iter: int = 100) -> NDArray[np.floating]:
+    """
+    Compute PageRank by power iteration on the sparse transition matrix.
+
+    Each step follows an out-edge (chosen by weight) with probability alpha
+    and teleports to a uniformly random node otherwise. Dead ends (nodes
+    without out-edges) teleport with probability 1, so their rank is spread
+    over all nodes instead of leaking out, and the teleport term keeps
+    spider traps (groups without edges leaving them) from absorbing all the
+    rank: the graphs get_principal_eigenvector_directed_unchecked
+    illustrates have a well-defined PageRank. The iteration and stopping
+    rule are those of nx.pagerank, whose values this reproduces in sorted
+    node order.
+
+    Parameters
+    ----------
+    G : nx.Graph
+        An undirected or directed NetworkX graph.
+    alpha : float, optional
+        Damping factor. Default is 0.85.
+    weight : str, optional
+        Edge attribute used as weight, or None for unweighted. Default is
+        "weight".
+    x0 : NDArray, optional
+        Starting vector, for example the PageRank before a small change to
+        the graph; it is scaled to sum 1. Default is uniform.
+    tol : float, optional
+        Stop when the L1 change of an iteration is below n * tol. Default
+        is 1e-6.
+    max_iter : int, optional
+        Maximum number of iterations. Default is 100.
+
+    Returns
+    -------
+    NDArray
+        PageRank of each node in sorted node order, summing to 1.
+
+    Raises
+    ------
+    nx.PowerIterationFailedConvergence
+        If the iteration does not converge within max_iter iterations.
+
+    Examples
+    --------
+    >>> G = nx.DiGraph([(1, 2), (2, 3)])  # 3 is a dead end
+    >>> x = get_pagerank(G)
+    >>> bool(np.isclose(x.sum(), 1.0)) and bool(x[2] > x[1] > x[0])
+    True
+    """
+    matrices = graph_matrices(G)
+    A = matrices.adjacency(weight)
+    n = len(matrices.nodes)
+    if n == 0:
+        return np.zeros(0)
+    if ("transition", weight) not in matrices.derived:
+        out_weight = np.asarray(A.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        scale = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+        # transposed, so that one product moves rank along the out-edges
+        matrices.derived[("transition", weight)] = ((sp.diags_array(scale) @ A).T.tocsr(), dangling)
+    P_T, dangling = matrices.derived[("transition", weight)]
+
+    x = np.full(n, 1.0 / n) if x0 is None else np.asarray(x0, dtype=np.float64) / np.sum(x0)
+    for _ in range(max_iter):
+        x_last = x
+        x = alpha * (P_T @ x_last + x_last[dangling].sum() / n) + (1 - alpha) / n
+        if np.abs(x - x_last).sum() < n * tol:
+            return x
+    raise nx.PowerIterationFailedConvergence(max_iter)
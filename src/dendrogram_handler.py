@@ -14,7 +14,10 @@
 import networkx as nx # type: ignore
 import numpy as np
 from numpy.typing import NDArray
-from typing import Tuple, Hashable, Set, FrozenSet, List # Used for type hints
+from typing import Iterator, Tuple, Hashable, Set, FrozenSet, List # Used for type hints
+
+from betweenness_utilities import Edge, ParallelEdgeBetweenness, first_max_edge
+import graph_matrices
 
 # Networkx nodes have type Hashable. It's tedious to keep writing
 # Set[Hashable] so I created an alias. The code should work on any
@@ -22,7 +25,15 @@ from typing import Tuple, Hashable, Set, FrozenSet, List # Used for type hints
 Group = Set[Hashable]
 
 class DendrogramHandler:
-    def __init__(self,G: nx.Graph):
+    def __init__(self,G: nx.Graph, n_workers: int | None = None):
+        """
+            n_workers: if given, edge betweenness is computed by a pool
+            of this many processes (see ParallelEdgeBetweenness). The
+            scores are added up in the same order as networkx's serial
+            computation (the default, None), so the dendrogram does not
+            depend on n_workers.
+        """
+        self.n_workers = n_workers
         all_partitions = self.get_all_partitions(G)
         self.link_matrix, self.link_matrix_labels = self.partitions_to_linkage(all_partitions)
 
@@ -55,10 +66,69 @@ class DendrogramHandler:
             algorithm doesn't return the original set of nodes, but that
             is required for the merge algorithm (below) to work. This
             code includes the set of all nodes. 
+
+            With self.n_workers set, each step's edge betweenness is
+            spread over a process pool, and the edge removed is the
+            first one (in graph.edges() order) with the maximum score.
         """
         all_partitions:list[Tuple[Set[Hashable], ...]] = [(set(G.nodes()),)]
-        all_partitions.extend(list(nx.algorithms.community.centrality.girvan_newman(G)))
+        all_partitions.extend(self._girvan_newman(G))
         return all_partitions
+
+    def iter_partitions(self, G: nx.Graph, patience: int | None = None
+                        ) -> Iterator[Tuple[Tuple[Group, ...], float, float]]:
+        """
+            Lazy version of get_all_partitions that yields
+            (partition, height, modularity) triples, coarse to fine,
+            without storing the partitions.
+
+            The height is the number of splits made to reach the
+            partition (0.0 for the set of all nodes), and the modularity
+            is that of the partition on G (unweighted).
+
+            While iterating, self.best_partition and self.best_modularity
+            hold the highest-modularity partition seen so far. With
+            patience set, the iteration stops once that many partitions
+            in a row have not improved on the best modularity, so the
+            fine end of the dendrogram is never computed.
+        """
+        self.best_partition: Tuple[Group, ...] = (set(G.nodes()),)
+        self.best_modularity: float = 0.0
+        yield self.best_partition, 0.0, 0.0
+
+        levels_without_improvement = 0
+        for level, partition in enumerate(self._girvan_newman(G), start=1):
+            # modularity from G's cached adjacency matrix, built once for all levels
+            modularity: float = graph_matrices.modularity(G, partition, weight=None)
+            if modularity > self.best_modularity:
+                self.best_partition, self.best_modularity = partition, modularity
+                levels_without_improvement = 0
+            else:
+                levels_without_improvement += 1
+            yield partition, float(level), modularity
+            if patience is not None and levels_without_improvement >= patience:
+                return
+
+    def _girvan_newman(self, G: nx.Graph) -> Iterator[Tuple[Group, ...]]:
+        """
+            The partitions of networkx's girvan_newman generator, with
+            edge betweenness from a process pool if self.n_workers is set.
+        """
+        if self.n_workers is None:
+            yield from nx.algorithms.community.centrality.girvan_newman(G)
+            return
+
+        # the graph girvan_newman works on, with the same neighbor order
+        graph = G.copy().to_undirected()
+        graph.remove_edges_from(list(nx.selfloop_edges(graph)))
+        with ParallelEdgeBetweenness(graph, self.n_workers) as parallel:
+            def most_valuable_edge(graph: nx.Graph) -> Edge:
+                # girvan_newman removes the edge it is given
+                edge = first_max_edge(parallel.scores(graph))
+                parallel.edge_removed(*edge)
+                return edge
+            yield from nx.algorithms.community.centrality.girvan_newman(
+                G, most_valuable_edge=most_valuable_edge)
         
     def partitions_to_linkage(self,
                               all_partitions: List[Tuple[Group, ...]]
@@ -107,54 +177,61 @@ class DendrogramHandler:
         labels: list[str] = [str(list(leaf)[0]) for leaf in leaves]
         
         # The linkage matrix is formed by merging leaf nodes into larger
-        # and larger clusters. The clusters dictionary assigns node numbers
-        # to the groups of nodes in each cluster. We need the values of the
-        # the cluster dictionary to be hashable, so we represent them
-        # as frozensets.
+        # and larger clusters. The clusters dictionary maps the groups of
+        # nodes in each cluster to their node numbers in the dendrogram
+        # tree. Groups are used as dictionary keys, so we represent them
+        # as frozensets. Looking a group up is then a hash lookup instead
+        # of a scan over all clusters.
         # We assign the leaf sets to cluster ids 0, 1, ..., n-1.
-        clusters: dict[int, FrozenSet[Hashable]] = {i: frozenset([i]) for i in range(n)}
+        clusters: dict[FrozenSet[Hashable], int] = {frozenset(leaf): i for i, leaf in enumerate(leaves)}
         linkage: list[list[float]] = []
         
         # We will merge fine clusters to coarse structures. 
         # Reverse the partition list so that partitions[0] is the finest 
         # partition (the one with the leaf nodes each in their own group)
         # and partitions[-1] is the coarsest (set of all nodes).
-        partitions: list[Tuple[Group, ...]] = list(all_partitions)
-        partitions.reverse()
+        # Each group is converted to a frozenset once.
+        partitions: list[list[FrozenSet[Hashable]]] = [
+            [frozenset(group) for group in partition] for partition in reversed(all_partitions)
+        ]
         
         # For each merge step (from fine to coarse) we try to determine which sets to merge.
         # (This assumes that each step in the reversed sequence corresponds to one merge.)
         for i in range(len(partitions)-1):
-            fine: Tuple[Group, ...] = partitions[i]      # e.g. a partition with k groups
-            coarse: Tuple[Group, ...] = partitions[i+1]  # a partition with k-1 groups
-            # In the reverse view, two groups in the fine partition must be
-            # merged to form a larger group in the coarse partition
-            c1, c2 = self._find_merge(coarse, fine)
-            # Look up the node numbers for these two groups in the clusters dictionary
-            cid1, cid2 = self._get_ids(c1, c2, clusters)
-            if cid1 is None or cid2 is None:
-                raise ValueError("No index in cluster dictionary found")
-            
-            # Group c1 and c2 from the fine partition are merged in the
-            # coarse partition. Assign group formed by merging c1 and c2
-            # a new index in the clusters dictionary. This defines a new
-            # node with index n in the dendrogram tree
-            clusters[n] = c1 | c2  
-
-            # The distance column can be done in two ways:
-            # Use the number of nodes in the cluster as the distance
-            #distance: int = len(clusters[n]) 
-            # or use the number of merges performed as the distance
-            distance: int = i + 1
-
-            # Set the count column
-            count: int = len(clusters[n]) 
-
-            # Add the new row to the linkage matrix
-            linkage.append([cid1, cid2, distance, count])       
-            
-            # increment the counter that tracks the nodes in the dendrogram tree
-            n = n + 1
+            fine: list[FrozenSet[Hashable]] = partitions[i]      # e.g. a partition with k groups
+            coarse: list[FrozenSet[Hashable]] = partitions[i+1]  # a partition with k-1 groups
+            # In the reverse view, two (or, if the graph is disconnected,
+            # more) groups in the fine partition must be merged to form
+            # a larger group in the coarse partition
+            parts = self._find_merge(coarse, fine)
+
+            # Merge parts[0] and parts[1], then the result with parts[2], ...
+            merged: FrozenSet[Hashable] = parts[0]
+            for part in parts[1:]:
+                # Look up the node numbers for the two groups in the clusters dictionary
+                cid1, cid2 = clusters[merged], clusters[part]
+
+                # The two groups from the fine partition are merged in the
+                # coarse partition. Assign the group formed by merging them
+                # a new index in the clusters dictionary. This defines a new
+                # node with index n in the dendrogram tree
+                merged = merged | part
+                clusters[merged] = n
+
+                # The distance column can be done in two ways:
+                # Use the number of nodes in the cluster as the distance
+                #distance: int = len(merged) 
+                # or use the number of merges performed as the distance
+                distance: int = i + 1
+
+                # Set the count column
+                count: int = len(merged) 
+
+                # Add the new row to the linkage matrix
+                linkage.append([cid1, cid2, distance, count])       
+                
+                # increment the counter that tracks the nodes in the dendrogram tree
+                n = n + 1
 
         # The linkage list should have (n-1) rows for n leaves.
         Z = np.array(linkage, dtype=np.float64)
@@ -163,44 +240,30 @@ class DendrogramHandler:
     ######################
     ## Helper Functions ##
     ######################
-    def _find_merge(self, coarse: Tuple[Group, ...],
-                fine:  Tuple[Group, ...]
-                ) -> Tuple[FrozenSet[Hashable], FrozenSet[Hashable]]:
+    def _find_merge(self, coarse: list[FrozenSet[Hashable]],
+                fine: list[FrozenSet[Hashable]]
+                ) -> list[FrozenSet[Hashable]]:
         """
             Takes a fine partition and a coarse partition and returns the
-            two groups in the fine partition that must be merged to
-            create the new group in the coarse partition.
+            groups in the fine partition (in fine partition order) that
+            must be merged to create the new group in the coarse partition.
+
+            Only the groups that are not in both partitions are looked at,
+            so this takes time linear in the number of nodes instead of
+            testing every fine group against every coarse group.
 
             Assumptions:
             The difference between the fine partition and coarse partition
             is that one of the groups in the coarse partition can be divided
-            to form two of the groups in the fine partition. All other
-            groups in the two partitions are the same
+            to form two (or more) of the groups in the fine partition. All
+            other groups in the two partitions are the same
         """
+        fine_groups = set(fine)
+        coarse_groups = set(coarse)
         for group in coarse:
-            # Find all communities in the finer partition that are subsets of this community.
-            parts = [c for c in fine if c.issubset(group)]
-            # Assumes binary partition used in Girvan Newman
-            if len(parts) == 2 and parts[0] | parts[1] == group:
-                # These two communities (parts[0] and parts[1]) merged.
-                c1, c2 = frozenset(parts[0]), frozenset(parts[1])
-                break
-        return c1, c2
-    
-    def _get_ids(self,
-                c1: FrozenSet[Hashable], 
-                c2: FrozenSet[Hashable], 
-                clusters: dict[int, FrozenSet[Hashable]]
-                ) -> Tuple[int | None, int| None]:
-        """
-            Return the index in the clusters dictionary for two groups
-            in the values() of the dictionary
-        """
-        cid1: int | None = None
-        cid2: int | None = None
-        for cid, cl in clusters.items():
-            if cl == c1:
-                cid1 = cid
-            if cl == c2:
-                cid2 = cid
-        return cid1, cid2
+            if group in fine_groups:
+                continue
+            # The groups of the fine partition that disappeared are the parts
+            part_of = {node: j for j, part in enumerate(fine) if part not in coarse_groups for node in part}
+            return [fine[j] for j in sorted({part_of[node] for node in group})]
+        raise ValueError("No merge found between consecutive partitions")
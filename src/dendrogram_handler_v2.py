@@ -12,9 +12,15 @@
 
 
 from __future__ import annotations
+from collections import deque
+import heapq
+import random
 import networkx as nx  # type: ignore
 import numpy as np
-from typing import Hashable, FrozenSet, List, Set, Tuple, Dict, Literal
+from typing import Deque, Hashable, FrozenSet, Iterator, List, Set, Tuple, Dict, Literal
+
+from betweenness_utilities import (Edge, ParallelEdgeBetweenness, accumulate_edge_betweenness,
+                                   edge_betweenness_scale, first_max_edge)
 
 Group = Set[Hashable]
 Partition = Tuple[Group, ...]
@@ -23,7 +29,9 @@ HeightMetric = Literal["distance", "max_cluster"]
 
 
 class DendrogramHandler:
-    def __init__(self, G: nx.Graph, height_metric: HeightMetric = "distance"):
+    def __init__(self, G: nx.Graph, height_metric: HeightMetric = "distance",
+                 incremental: bool = False, n_workers: int | None = None,
+                 k: int | None = None, recompute_every: int | None = None, seed: int | None = None):
         """
         Build a linkage matrix and labels from G using Girvan-Newman splits.
         
@@ -34,10 +42,47 @@ class DendrogramHandler:
         height_metric : HeightMetric
             "distance" - uses reverse order of edge removal (default)
             "max_cluster" - uses size of largest cluster being merged
+        incremental : bool
+            If True, after each edge removal recompute edge betweenness only
+            inside the component(s) that contained the removed edge. The
+            partitions and linkage matrix are identical to the default.
+        n_workers : int | None
+            If given, compute edge betweenness with a ParallelEdgeBetweenness
+            pool of this many processes (1 runs the same chunked computation
+            in this process). Scores are added up in the same order as in
+            the serial computation, so the dendrogram is identical for every
+            n_workers, including the default None.
+        k : int | None
+            If given, use approximate Girvan-Newman for large graphs: edge
+            betweenness is estimated from k source nodes sampled uniformly
+            at random instead of from every node.
+        recompute_every : int | None
+            With k, the sampled edge betweenness is recomputed after every
+            recompute_every removals; in between, edges are removed in
+            decreasing order of the last estimate. The default, None, is
+            1% of the edges of G (at least 1), so a run makes at most about
+            100 estimates whatever the size of G.
+        seed : int | None
+            Seed of the source sampling, for reproducible dendrograms.
+
+        After construction, self.modularity[i] is the modularity of G (unweighted)
+        under the partition at level i (see get_all_partitions_with_heights).
         """
+        if k is not None and incremental:
+            raise ValueError("incremental updates need exact betweenness; use either k or incremental")
+        if recompute_every is None:
+            recompute_every = max(1, G.number_of_edges() // 100)
+        if recompute_every < 1:
+            raise ValueError(f"recompute_every must be at least 1, got {recompute_every}")
         self.height_metric = height_metric
-        all_partitions_with_heights: List[PartitionWithHeight] = self.get_all_partitions_with_heights(G)
-        self.link_matrix, self.link_matrix_labels = self.partitions_to_linkage(all_partitions_with_heights)
+        self.incremental = incremental
+        self.n_workers = n_workers
+        self.k = k
+        self.recompute_every = recompute_every
+        self.seed = seed
+        # the linkage only needs the split events, so the partitions are not kept
+        heights: List[float] = self._girvan_newman(G, True, None)
+        self.link_matrix, self.link_matrix_labels = self._linkage_from_splits(list(G.nodes()), heights)
 
     def get_all_partitions_with_heights(self, G: nx.Graph, normalized: bool = True) -> List[PartitionWithHeight]:
         """
@@ -48,61 +93,349 @@ class DendrogramHandler:
         where partition is a tuple of sets (communities) and height represents
         the reverse order of edge removal (first edge removed has highest height).
         The first element is the coarse partition (all nodes) with height 0.0.
-        """
-        graph = G.copy()
-        n_nodes: int = graph.number_of_nodes()
 
-        partitions_with_order: List[Tuple[Partition, int]] = []
-        # initial coarse partition (everything together)
-        partitions_with_order.append((tuple([set(graph.nodes())]), 0))
+        Removing an edge only changes shortest paths inside the component
+        that contained it. With self.incremental, edge betweenness is
+        computed once for the whole graph and afterwards recomputed only for
+        the edges of the component(s) holding the endpoints of the removed
+        edge; scores in every other component are kept.
 
-        # if there are no edges, we're already fully split into singletons
-        if graph.number_of_edges() == 0:
-            singletons: Partition = tuple({v} for v in graph.nodes())
-            partitions_with_order.append((singletons, 0))
-            # Convert to heights format
-            return [(partition, 0.0) for partition, _ in partitions_with_order]
+        With self.n_workers set, the per-source work is spread over a
+        process pool (see ParallelEdgeBetweenness). With self.k set, edges
+        are removed in the approximate order described in __init__.
 
-        # Continue removing max-betweenness edges until no edges remain
-        step = 1
-        while graph.number_of_edges() > 0:
-            # compute edge betweenness centrality
-            betw: Dict[Tuple[Hashable, Hashable], float] = nx.edge_betweenness_centrality(graph, normalized=normalized)
+        Every level that splits a group is also recorded in
+        self.split_events as (index of the finer partition, one node of
+        each part), which is all _linkage_from_splits needs, and the
+        modularity of every level is stored in self.modularity.
+        """
+        partitions: List[Partition] = []
+        heights = self._girvan_newman(G, normalized, partitions)
+        return list(zip(partitions, heights))
+
+    def iter_partitions(self,
+                        G: nx.Graph,
+                        patience: int | None = None,
+                        normalized: bool = True) -> Iterator[Tuple[Partition, float, float]]:
+        """
+        Lazily yield the Girvan-Newman levels of G as (partition, height,
+        modularity) triples, coarse -> fine, one for each level whose
+        partition differs from the one before.
 
-            if not betw:
-                break
+        Nothing but the current components is kept, so a caller that only
+        wants a good partition does not pay for the full list that
+        get_all_partitions_with_heights builds. Because a stream does not
+        know how many levels follow, height is the number of edges removed
+        to reach the level (0.0 for the first, all-nodes partition) rather
+        than the reverse order used by the linkage matrix.
 
-            # maximum betweenness at this step
-            max_bw: float = max(betw.values())
+        While iterating, self.best_partition and self.best_modularity hold
+        the highest-modularity partition seen so far.
 
-            # remove only one edge with maximum betweenness
-            edge_to_remove = next(edge for edge, score in betw.items() if score == max_bw)
-            graph.remove_edge(*edge_to_remove)
+        Parameters:
+        -----------
+        G : nx.Graph
+            The graph to partition
+        patience : int | None
+            If given, stop after this many levels in a row have not improved
+            on the best modularity. None runs down to singletons.
+        normalized : bool
+            Passed to the edge betweenness computation.
+        """
+        nodes: List[Hashable] = list(G.nodes())
+        self.best_partition: Partition = tuple([set(nodes)])
+        self.best_modularity: float = 0.0
+        yield self.best_partition, 0.0, 0.0
+
+        levels_without_improvement = 0
+        for step, changed, component in self._levels(G, normalized):
+            if not changed:
+                continue
+            partition = self._partition_from_components(nodes, component)
+            modularity = self.modularity[-1]
+            if modularity > self.best_modularity:
+                self.best_partition, self.best_modularity = partition, modularity
+                levels_without_improvement = 0
+            else:
+                levels_without_improvement += 1
+            yield partition, float(step), modularity
+            if patience is not None and levels_without_improvement >= patience:
+                return
+
+    def _girvan_newman(self, G: nx.Graph, normalized: bool, partitions: List[Partition] | None) -> List[float]:
+        """
+        Remove edges until every node is alone, recording self.split_events
+        and self.modularity. Returns the height of every level, and appends
+        the partition of every level to partitions unless it is None.
+        """
+        nodes: List[Hashable] = list(G.nodes())
+        # initial coarse partition (everything together)
+        if partitions is not None:
+            partitions.append(tuple([set(nodes)]))
+
+        step = 0
+        for step, _, component in self._levels(G, normalized):
+            if partitions is not None:
+                partitions.append(self._partition_from_components(nodes, component))
+
+        # if there are no edges, we're already fully split into singletons
+        if G.number_of_edges() == 0:
+            return [0.0, 0.0]
+        # Convert order to height (reverse order: first edge removed = highest height)
+        return [float(step - order) for order in range(step + 1)]
+
+    def _levels(self, G: nx.Graph, normalized: bool) -> Iterator[Tuple[int, bool, Dict[Hashable, int]]]:
+        """_track_components, with the process pool open while it runs if self.n_workers is set."""
+        if self.n_workers is None:
+            yield from self._track_components(G, normalized, None)
+            return
+        # the pool follows the neighbor order of the copy _track_components works on
+        with ParallelEdgeBetweenness(G.copy(), self.n_workers) as parallel:
+            yield from self._track_components(G, normalized, parallel)
+
+    @staticmethod
+    def _partition_from_components(nodes: List[Hashable], component: Dict[Hashable, int]) -> Partition:
+        """The groups of nodes by component id, in the order nx.connected_components would list them."""
+        groups: Dict[int, Group] = {}
+        for node in nodes:
+            groups.setdefault(component[node], set()).add(node)
+        return tuple(groups.values())
+
+    def _track_components(self,
+                          G: nx.Graph,
+                          normalized: bool,
+                          parallel: ParallelEdgeBetweenness | None) -> Iterator[Tuple[int, bool, Dict[Hashable, int]]]:
+        """
+        Follow the connected components while _edge_removals removes edges,
+        yielding (number of edges removed, whether the partition changed,
+        node -> component id) after every removal.
+
+        Components are kept in a node -> component id array. After an edge
+        is removed, a BFS from each endpoint, advanced in turns, either
+        meets the other (no split) or runs out first; the side that ran out
+        is the smaller new component and is the only one relabelled. The
+        modularity is updated from that side alone too, so following the
+        components costs far less than recomputing them at every level.
+        """
+        graph = G.copy()
+        nodes: List[Hashable] = list(graph.nodes())
+        n_nodes: int = len(nodes)
+        self.split_events: List[Tuple[int, List[Hashable]]] = []
+        self.modularity: List[float] = [0.0]
 
-            # connected components become the new partition
-            comps: Partition = tuple(set(c) for c in nx.connected_components(graph))
-            partitions_with_order.append((comps, step))
+        # if there are no edges, we're already fully split into singletons
+        if graph.number_of_edges() == 0:
+            if n_nodes > 1:
+                self.split_events.append((1, nodes))
+            self.modularity.append(0.0)
+            yield 1, True, {v: i for i, v in enumerate(nodes)}
+            return
+
+        # component ids, and per component id its number of internal edges
+        # and degree sum (so len(internal_edges) is the number of components)
+        component: Dict[Hashable, int] = {}
+        internal_edges: List[float] = []
+        degree_sum: List[float] = []
+        for cid, comp in enumerate(nx.connected_components(graph)):
+            component.update(dict.fromkeys(comp, cid))
+            internal_edges.append(float(graph.subgraph(comp).number_of_edges()))
+            degree_sum.append(float(sum(d for _, d in graph.degree(comp))))
+        n_edges: float = float(graph.number_of_edges())
+
+        def modularity_term(cid: int) -> float:
+            return internal_edges[cid] / n_edges - (degree_sum[cid] / (2 * n_edges)) ** 2
+
+        # modularity of the actual components; only the terms of the
+        # component that splits change afterwards
+        modularity: float = sum(modularity_term(cid) for cid in range(len(internal_edges)))
+
+        step = 0
+        for edge_to_remove in self._edge_removals(graph, normalized, parallel):
             step += 1
+            u, v = edge_to_remove
+            side = self._smaller_side_if_split(graph, u, v)
+            if side is not None:
+                old = component[u]
+                modularity -= modularity_term(old)
+                self._split_component(G, side, component, internal_edges, degree_sum)
+                modularity += modularity_term(old) + modularity_term(len(internal_edges) - 1)
+
+            changed = side is not None
+            if step == 1 and len(internal_edges) > 1:
+                # the coarse partition is one group even if G is disconnected
+                first_nodes = {cid: node for node, cid in reversed(component.items())}
+                self.split_events.append((step, list(first_nodes.values())))
+                changed = True
+            elif side is not None:
+                self.split_events.append((step, [u, v]))
+            self.modularity.append(modularity)
+            yield step, changed, component
 
             # stop if we've reached singletons
-            if len(comps) == n_nodes:
-                break
+            if len(internal_edges) == n_nodes:
+                return
 
-        # Convert order to height (reverse order: first edge removed = highest height)
-        max_step = len(partitions_with_order) - 1
-        partitions_with_heights: List[PartitionWithHeight] = [
-            (partition, float(max_step - order)) for partition, order in partitions_with_order
-        ]
-        
-        return partitions_with_heights
+    @staticmethod
+    def _smaller_side_if_split(graph: nx.Graph, u: Hashable, v: Hashable) -> Set[Hashable] | None:
+        """
+        After the edge (u, v) has been removed from graph, return the nodes
+        of the smaller of the components of u and v if they are no longer
+        connected, or None if they still are.
+        """
+        if u == v:
+            return None
+        seen: Tuple[Set[Hashable], Set[Hashable]] = ({u}, {v})
+        frontiers: Tuple[Deque[Hashable], Deque[Hashable]] = (deque([u]), deque([v]))
+        while True:
+            for side in (0, 1):
+                frontier = frontiers[side]
+                if not frontier:
+                    return seen[side]
+                node = frontier.popleft()
+                for w in graph[node]:
+                    if w in seen[1 - side]:
+                        return None
+                    if w not in seen[side]:
+                        seen[side].add(w)
+                        frontier.append(w)
+
+    @staticmethod
+    def _split_component(G: nx.Graph,
+                         side: Set[Hashable],
+                         component: Dict[Hashable, int],
+                         internal_edges: List[float],
+                         degree_sum: List[float]) -> None:
+        """
+        Give the nodes of side a new component id and split the internal
+        edge count (of G) and degree sum of their old component.
+        """
+        old = component[next(iter(side))]
+        new = len(internal_edges)
+        inside, loops, cut, degrees = 0, 0, 0, 0
+        for a in side:
+            degrees += G.degree(a)
+            for w in G[a]:
+                if w == a:
+                    loops += 1
+                elif w in side:
+                    inside += 1
+                elif component[w] == old:
+                    cut += 1
+        side_edges = inside / 2 + loops
+        internal_edges.append(side_edges)
+        internal_edges[old] -= side_edges + cut
+        degree_sum.append(float(degrees))
+        degree_sum[old] -= degrees
+        component.update(dict.fromkeys(side, new))
+
+    def _edge_removals(self,
+                       graph: nx.Graph,
+                       normalized: bool,
+                       parallel: ParallelEdgeBetweenness | None) -> Iterator[Edge]:
+        """
+        Remove the edges of graph one at a time, in Girvan-Newman order, and
+        yield each edge after it has been removed.
+        """
+        if self.k is not None:
+            yield from self._sampled_edge_removals(graph, parallel)
+            return
+
+        if self.incremental:
+            # raw (unscaled) scores of every edge, kept up to date below
+            scale: float = edge_betweenness_scale(graph.number_of_nodes(), normalized)
+            position: Dict[Hashable, int] = {v: i for i, v in enumerate(graph.nodes())}
+            raw_scores: Dict[Edge, float] = dict.fromkeys(graph.edges(), 0.0)
+            if parallel is None:
+                accumulate_edge_betweenness(graph, graph.nodes(), raw_scores)
+            else:
+                raw_scores.update(parallel.raw_scores(graph, graph.nodes()))
+
+        # Continue removing max-betweenness edges until no edges remain
+        while graph.number_of_edges() > 0:
+            # compute edge betweenness centrality
+            betw: Dict[Tuple[Hashable, Hashable], float]
+            if self.incremental:
+                betw = {edge: raw_scores[edge] * scale for edge in graph.edges()}
+            elif parallel is not None:
+                betw = parallel.scores(graph, normalized=normalized)
+            else:
+                betw = nx.edge_betweenness_centrality(graph, normalized=normalized)
+
+            # remove only one edge with maximum betweenness, the first in
+            # graph.edges() order if several tie
+            edge_to_remove = first_max_edge(betw)
+            graph.remove_edge(*edge_to_remove)
+            if parallel is not None:
+                parallel.edge_removed(*edge_to_remove)
+            if self.incremental:
+                del raw_scores[edge_to_remove]
+                self._update_component_scores(graph, edge_to_remove, raw_scores, position, parallel)
+            yield edge_to_remove
+
+    def _sampled_edge_removals(self,
+                               graph: nx.Graph,
+                               parallel: ParallelEdgeBetweenness | None) -> Iterator[Edge]:
+        """
+        Approximate Girvan-Newman removal order: estimate edge betweenness
+        from self.k sampled sources, remove the self.recompute_every edges
+        with the highest estimates, and repeat.
+        """
+        rng = random.Random(self.seed)
+        nodes: List[Hashable] = list(graph.nodes())
+        k: int = min(self.k or 0, len(nodes))
+        while graph.number_of_edges() > 0:
+            sources = rng.sample(nodes, k)
+            estimate: Dict[Edge, float] = dict.fromkeys(graph.edges(), 0.0)
+            if parallel is None:
+                accumulate_edge_betweenness(graph, sources, estimate)
+            else:
+                for (a, b), score in parallel.raw_scores(graph, sources).items():
+                    estimate[(a, b) if (a, b) in estimate else (b, a)] += score
+
+            # highest estimate first; ties keep graph.edges() order
+            ranked = heapq.nlargest(self.recompute_every, estimate, key=estimate.__getitem__)
+            for edge_to_remove in ranked:
+                graph.remove_edge(*edge_to_remove)
+                if parallel is not None:
+                    parallel.edge_removed(*edge_to_remove)
+                yield edge_to_remove
+
+    def _update_component_scores(self,
+                                 graph: nx.Graph,
+                                 removed_edge: Edge,
+                                 raw_scores: Dict[Edge, float],
+                                 position: Dict[Hashable, int],
+                                 parallel: ParallelEdgeBetweenness | None = None) -> None:
+        """
+        Recompute the raw edge betweenness of every edge in the component(s)
+        that held removed_edge, after it has been removed from graph.
+        """
+        u, v = removed_edge
+        affected: Set[Hashable] = nx.node_connected_component(graph, u)
+        if v not in affected:
+            affected = affected | nx.node_connected_component(graph, v)
+
+        for a in affected:
+            for b in graph[a]:
+                raw_scores[(a, b) if (a, b) in raw_scores else (b, a)] = 0.0
+        # sum over the sources in graph node order, as a full recomputation would
+        sources = sorted(affected, key=position.__getitem__)
+        if parallel is not None:
+            for edge, score in parallel.raw_scores(graph, sources).items():
+                raw_scores[edge if edge in raw_scores else (edge[1], edge[0])] += score
+            return
+        accumulate_edge_betweenness(graph, sources, raw_scores)
 
     def partitions_to_linkage(self, all_partitions_with_heights: List[PartitionWithHeight]) -> Tuple[np.ndarray, List[str]]:
         """
         Convert a list of (partition, height) pairs (coarse -> fine) into a SciPy-style linkage matrix.
         The code inverts the divisive sequence (works fine -> coarse) to construct merges.
 
-        Three alternative distance choices are shown; the BETW_HOST (betweenness) option
-        is the active one (uncommented). The other two are left as commented alternatives.
+        Groups are looked up through a frozenset -> cluster id index, and
+        only the groups that differ between two consecutive partitions are
+        examined, so each level costs time linear in the number of nodes.
+        The handler itself builds its linkage from the recorded split events
+        (see _linkage_from_splits), which avoids the partitions altogether.
 
         Returns:
             Z: np.ndarray shape (n-1, 4) linkage matrix
@@ -113,100 +446,104 @@ class DendrogramHandler:
         n_leaves: int = len(leaves_partition)
         labels: List[str] = [str(list(leaf)[0]) for leaf in leaves_partition]
 
-        # clusters maps dendrogram-cluster-index -> frozenset of original leaf ids
-        # Map each leaf cluster index to its actual node ID (not just the index)
-        clusters: Dict[int, FrozenSet[Hashable]] = {}
-        for i, leaf in enumerate(leaves_partition):
-            node_id = list(leaf)[0]
-            clusters[i] = frozenset([node_id])
-        
+        # cluster_ids maps frozenset of original leaf ids -> dendrogram-cluster-index
+        cluster_ids: Dict[FrozenSet[Hashable], int] = {
+            frozenset(leaf): i for i, leaf in enumerate(leaves_partition)
+        }
+        # counter for new cluster indices (SciPy-style: leaves are 0..n-1, new clusters n, n+1, ...)
+        next_cluster_idx: int = n_leaves
         linkage_rows: List[List[float]] = []
 
-        # ...existing code...
         # reverse partitions so we iterate from fine -> coarse
         partitions_with_heights_rev: List[PartitionWithHeight] = list(reversed(all_partitions_with_heights))
-
-        # We'll need a local helper to find all merges between fine and coarse partitions
-        def _find_all_merges(coarse: Partition, fine: Partition) -> List[Tuple[FrozenSet[Hashable], FrozenSet[Hashable]]]:
-            """
-            Given a coarse partition and the finer partition immediately before it (in the divisive order),
-            find all pairs of groups in 'fine' that combined to make groups in 'coarse'.
-            Multiple merges can happen at once if multiple edges with same betweenness are removed.
-            
-            For groups requiring multi-way merges (>2 parts), create binary merges sequentially.
-            """
-            merges = []
-            for group in coarse:
-                parts = [c for c in fine if c.issubset(group)]
-                if len(parts) == 1:
+        fine_keys: List[FrozenSet[Hashable]] = [frozenset(group) for group in partitions_with_heights_rev[0][0]]
+
+        for coarse_partition, coarse_height in partitions_with_heights_rev[1:]:
+            coarse_keys: List[FrozenSet[Hashable]] = [frozenset(group) for group in coarse_partition]
+            fine_set: Set[FrozenSet[Hashable]] = set(fine_keys)
+            coarse_set: Set[FrozenSet[Hashable]] = set(coarse_keys)
+
+            # fine groups that disappear, and which of them each node belongs to
+            part_of: Dict[Hashable, int] = {
+                node: j for j, part in enumerate(fine_keys) if part not in coarse_set for node in part
+            }
+            for group in coarse_keys:
+                if group in fine_set:
                     # No merge needed - group stayed the same
                     continue
-                elif len(parts) == 2:
-                    # Simple binary merge
-                    merges.append((frozenset(parts[0]), frozenset(parts[1])))
-                elif len(parts) > 2:
-                    # Multi-way merge - convert to sequence of binary merges
-                    # Merge parts[0] and parts[1], then merge result with parts[2], etc.
-                    for i in range(len(parts) - 1):
-                        if i == 0:
-                            merges.append((frozenset(parts[0]), frozenset(parts[1])))
-                        else:
-                            # Merge the accumulated set with the next part
-                            accumulated = frozenset().union(*parts[:i+1])
-                            merges.append((accumulated, frozenset(parts[i+1])))
-            return merges
-
-        def _get_ids(c1: FrozenSet[Hashable], c2: FrozenSet[Hashable], clusters_map: Dict[int, FrozenSet[Hashable]]) -> Tuple[int, int]:
-            cid1: int | None = None
-            cid2: int | None = None
-            for cid, cl in clusters_map.items():
-                if cl == c1:
-                    cid1 = cid
-                if cl == c2:
-                    cid2 = cid
-            if cid1 is None or cid2 is None:
-                raise ValueError("Cluster id for a merging cluster not found")
-            return cid1, cid2
-
-        # counter for new cluster indices (SciPy-style: leaves are 0..n-1, new clusters n, n+1, ...)
-        next_cluster_idx: int = n_leaves
+                # the parts of the group, in fine partition order
+                parts = [fine_keys[j] for j in sorted({part_of[node] for node in group})]
+
+                # a multi-way merge becomes a sequence of binary merges:
+                # parts[0] with parts[1], then the result with parts[2], etc.
+                merged: FrozenSet[Hashable] = parts[0]
+                for part in parts[1:]:
+                    # choose the distance for this merge based on height_metric
+                    if self.height_metric == "max_cluster":
+                        # Use size of largest cluster being merged
+                        distance = float(max(len(merged), len(part)))
+                    else:  # "distance" (default)
+                        # Use reverse order of edge removal
+                        distance = float(coarse_height)
+
+                    # add linkage row: [idx1, idx2, distance, count]
+                    linkage_rows.append([float(cluster_ids[merged]), float(cluster_ids[part]),
+                                         distance, float(len(merged) + len(part))])
+
+                    # register new cluster
+                    merged = merged | part
+                    cluster_ids[merged] = next_cluster_idx
+                    next_cluster_idx += 1
+            fine_keys = coarse_keys
 
-        # For each step in the reversed list, determine which fine groups merged to form coarser groups
-        for i in range(len(partitions_with_heights_rev) - 1):
-            fine_partition, fine_height = partitions_with_heights_rev[i]
-            coarse_partition, coarse_height = partitions_with_heights_rev[i + 1]
+        Z: np.ndarray = np.array(linkage_rows, dtype=np.float64)
+        return Z, labels
 
-            # find all pairs of groups in the fine partition that merged
-            merges = _find_all_merges(coarse_partition, fine_partition)
-            
-            # Skip if no merges occurred (partitions are the same)
-            if not merges:
-                continue
-            
-            # Process each merge
-            for c1, c2 in merges:
-                cid1, cid2 = _get_ids(c1, c2, clusters)
+    def _linkage_from_splits(self,
+                             nodes: List[Hashable],
+                             heights: List[float]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Build the same linkage matrix as partitions_to_linkage from
+        self.split_events, recorded while the edges were removed.
 
-                # choose the distance for this merge based on height_metric
+        The splits are undone in reverse with a union-find over node
+        positions whose roots are always the smallest position in their
+        cluster, so the parts of a merge come out in the same order as in
+        the partitions. This takes near-linear time in the number of nodes.
+        """
+        n: int = len(nodes)
+        position: Dict[Hashable, int] = {v: i for i, v in enumerate(nodes)}
+        # component id arrays, indexed by root position
+        parent: List[int] = list(range(n))
+        cluster_id: List[int] = list(range(n))
+        size: List[int] = [1] * n
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        next_cluster_idx: int = n
+        linkage_rows: List[List[float]] = []
+        for level, representatives in reversed(self.split_events):
+            coarse_height = heights[level - 1]
+            roots = sorted({find(position[v]) for v in representatives})
+            merged = roots[0]
+            for root in roots[1:]:
                 if self.height_metric == "max_cluster":
-                    # Use size of largest cluster being merged
-                    distance = float(max(len(c1), len(c2)))
+                    distance = float(max(size[merged], size[root]))
                 else:  # "distance" (default)
-                    # Use reverse order of edge removal
                     distance = float(coarse_height)
-
-                # count = size of the newly formed cluster (number of leaves)
-                count = float(len(c1 | c2))
-
-                # add linkage row: [idx1, idx2, distance, count]
-                linkage_rows.append([float(cid1), float(cid2), distance, count])
-
-                # register new cluster in clusters dict
-                clusters[next_cluster_idx] = frozenset(c1 | c2)
+                linkage_rows.append([float(cluster_id[merged]), float(cluster_id[root]),
+                                     distance, float(size[merged] + size[root])])
+                parent[root] = merged
+                size[merged] += size[root]
+                cluster_id[merged] = next_cluster_idx
                 next_cluster_idx += 1
 
         Z: np.ndarray = np.array(linkage_rows, dtype=np.float64)
-        return Z, labels
+        return Z, [str(v) for v in nodes]
 
     # (Optional) keep the original helper methods as public if you need to debug or extend:
     def debug_get_all_partitions(self, G: nx.Graph) -> List[PartitionWithHeight]:
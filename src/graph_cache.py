@@ -0,0 +1,442 @@
+"""Binary cache for graph files (GEXF and Matrix Market).
+
+Parsing a GEXF file is slow because it is XML: Hypertext2009_15min.gexf is
+2.5 MB of it. This module converts a graph file once into a directory of
+NumPy .npy files (the CSR adjacency arrays, the node ids and one column per
+node attribute) and loads those on later runs. The .npy files can be opened
+memory-mapped so that nothing is read until it is used.
+
+Cache entries are keyed by a SHA-256 of the source file's contents. An index
+remembers the size and modification time of every source file seen, so an
+unchanged file is not re-hashed on every load.
+"""
+
+from pathlib import Path
+from typing import Any, Union
+import hashlib
+import json
+import xml.etree.ElementTree as ET
+import networkx as nx  # type: ignore
+import numpy as np
+from numpy.typing import NDArray
+import scipy.sparse as sp  # type: ignore
+
+
+GEXF_TYPES: dict[str, Any] = {
+    "integer": np.int64,
+    "long": np.int64,
+    "float": np.float64,
+    "double": np.float64,
+    "boolean": np.bool_,
+}
+
+
+class CachedGraph:
+    """
+    Array form of a graph loaded through the cache.
+
+    Attributes
+    ----------
+    adjacency : sp.csr_array
+        Adjacency matrix; row and column i belong to node_ids[i]. Undirected
+        graphs store both directions. Entries are edge weights (1 when the
+        file has none) and parallel edges of weighted graphs are summed.
+    node_ids : NDArray
+        Node id of each row, as strings for GEXF files and 1-based integers
+        for Matrix Market files.
+    node_attributes : dict[str, NDArray]
+        One column per node attribute, aligned with node_ids.
+    directed : bool
+        Whether the source graph is directed.
+    weighted : bool
+        Whether the source file gives edge weights. Only weighted graphs get
+        a "weight" edge attribute in to_networkx.
+    """
+
+    def __init__(self,
+                 adjacency: sp.csr_array,
+                 node_ids: NDArray[Any],
+                 node_attributes: dict[str, NDArray[Any]],
+                 directed: bool,
+                 weighted: bool = True) -> None:
+        self.adjacency = adjacency
+        self.node_ids = node_ids
+        self.node_attributes = node_attributes
+        self.directed = directed
+        self.weighted = weighted
+
+    def to_networkx(self) -> nx.Graph:
+        """Build the networkx graph, with node attributes and, if weighted, edge weights."""
+        G: nx.Graph = nx.DiGraph() if self.directed else nx.Graph()
+        ids: list[Any] = self.node_ids.tolist()
+        columns = {name: column.tolist() for name, column in self.node_attributes.items()}
+        G.add_nodes_from(
+            (node, {name: column[i] for name, column in columns.items()})
+            for i, node in enumerate(ids)
+        )
+
+        coo = self.adjacency.tocoo()
+        rows, cols, weights = coo.row, coo.col, coo.data
+        if not self.directed:
+            # both directions are stored; networkx only needs one of them
+            upper = rows <= cols
+            rows, cols, weights = rows[upper], cols[upper], weights[upper]
+        u = [ids[i] for i in rows.tolist()]
+        v = [ids[j] for j in cols.tolist()]
+        if self.weighted:
+            G.add_weighted_edges_from(zip(u, v, weights.tolist()))
+        else:
+            G.add_edges_from(zip(u, v))
+        return G
+
+
+####################
+## Source readers ##
+####################
+
+def _strip_namespace(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def read_gexf_arrays(path: Union[str, Path]) -> CachedGraph:
+    """
+    Read the static part of a GEXF file directly into arrays.
+
+    Node ids, labels, static node attributes and edges (with their weight,
+    1 by default) are kept. The graph counts as weighted if any edge has a
+    weight. Dynamic attribute values and spells are
+    ignored, so dynamic files such as Hypertext2009_15min.gexf, which
+    nx.read_gexf rejects, load as their static graph.
+    """
+    attribute_titles: dict[str, str] = {}
+    attribute_types: dict[str, str] = {"label": "string"}
+    node_ids: list[str] = []
+    node_values: list[dict[str, str]] = []
+    sources: list[str] = []
+    targets: list[str] = []
+    weights: list[float] = []
+    directed = False
+    weighted = False
+    attributes_class: str | None = None
+
+    for event, element in ET.iterparse(str(path), events=("start", "end")):
+        tag = _strip_namespace(element.tag)
+        if event == "start":
+            if tag == "graph":
+                directed = element.get("defaultedgetype") == "directed"
+            elif tag == "attributes":
+                is_static = element.get("mode", "static") == "static"
+                attributes_class = element.get("class") if is_static else None
+            continue
+
+        if tag == "attributes":
+            attributes_class = None
+        elif tag == "attribute" and attributes_class == "node":
+            attribute_id = element.get("id", "")
+            title = element.get("title", attribute_id)
+            attribute_titles[attribute_id] = title
+            attribute_types[title] = element.get("type", "string")
+        elif tag == "node":
+            values = {"label": element.get("label", element.get("id", ""))}
+            for attvalue in element.iter():
+                # values with a start or end time are dynamic
+                if (_strip_namespace(attvalue.tag) == "attvalue"
+                        and attvalue.get("start") is None and attvalue.get("end") is None
+                        and attvalue.get("for") in attribute_titles):
+                    values[attribute_titles[attvalue.get("for", "")]] = attvalue.get("value", "")
+            node_ids.append(element.get("id", ""))
+            node_values.append(values)
+            element.clear()
+        elif tag == "edge":
+            sources.append(element.get("source", ""))
+            targets.append(element.get("target", ""))
+            weights.append(float(element.get("weight", 1.0)))
+            weighted = weighted or element.get("weight") is not None
+            if element.get("type") == "directed":
+                directed = True
+            element.clear()
+
+    index = {node: i for i, node in enumerate(node_ids)}
+    adjacency = edges_to_csr(
+        np.array([index[u] for u in sources], dtype=np.int64),
+        np.array([index[v] for v in targets], dtype=np.int64),
+        np.array(weights, dtype=np.float64),
+        len(node_ids),
+        not directed,
+    )
+
+    node_attributes: dict[str, NDArray[Any]] = {}
+    for title, gexf_type in attribute_types.items():
+        column = [values.get(title) for values in node_values]
+        node_attributes[title] = _attribute_column(column, gexf_type)
+
+    return CachedGraph(adjacency, np.array(node_ids, dtype=str), node_attributes, directed, weighted)
+
+
+def _attribute_column(values: list[str | None], gexf_type: str) -> NDArray[Any]:
+    """Typed column for a GEXF attribute; missing numbers become NaN."""
+    dtype = GEXF_TYPES.get(gexf_type)
+    present = [value for value in values if value is not None]
+    if dtype is None:
+        return np.array(["" if value is None else value for value in values], dtype=str)
+    if dtype is np.bool_:
+        return np.array([value == "true" for value in values], dtype=np.bool_)
+    if len(present) < len(values):
+        return np.array([np.nan if value is None else float(value) for value in values])
+    if dtype is np.int64:
+        return np.array([int(value) for value in present], dtype=np.int64)
+    return np.array([float(value) for value in present], dtype=dtype)
+
+
+def read_mtx_arrays(path: Union[str, Path]) -> CachedGraph:
+    """Read a Matrix Market file; node ids are the file's 1-based indices."""
+    matrix, node_ids, directed, weighted = read_matrix_market_arrays(path)
+    return CachedGraph(sp.csr_array(matrix, dtype=np.float64), node_ids, {}, directed, weighted)
+
+
+def _parse_numbers(text: str,
+                   num_columns: int,
+                   dtype: type[np.int64] | type[np.float64],
+                   filename: Union[str, Path],
+                   first_line: int = 1) -> NDArray[Any]:
+    """
+    Parse whitespace separated numbers in one vectorized pass into rows of num_columns.
+
+    first_line is the line of the file that text starts on. If the text does
+    not parse, it is scanned line by line so that the error names the file
+    and the offending line.
+    """
+    try:
+        values: NDArray[Any] | None = np.fromstring(text, dtype=dtype, sep=" ")
+    except ValueError:
+        values = None
+    if values is not None and values.shape[0] % num_columns == 0:
+        return values.reshape(-1, num_columns)
+
+    for number, line in enumerate(text.splitlines(), first_line):
+        tokens = line.split()
+        if not tokens:
+            continue
+        if len(tokens) != num_columns:
+            raise ValueError(f"{filename}, line {number}: expected {num_columns} values, got {len(tokens)}")
+        for token in tokens:
+            try:
+                dtype(token)
+            except ValueError:
+                raise ValueError(
+                    f"{filename}, line {number}: {token!r} is not a valid {np.dtype(dtype).name}"
+                ) from None
+    raise ValueError(f"{filename}: could not parse entries")
+
+
+def read_matrix_market_arrays(path: Union[str, Path]) -> tuple[sp.csr_array, NDArray[np.int64], bool, bool]:
+    """
+    Read a Matrix Market coordinate file into arrays.
+
+    Handles pattern, integer and real fields with general or symmetric
+    storage, and checks the size line against the entries. Returns
+    (matrix, node_ids, directed, weighted): the CSR adjacency matrix (both
+    directions stored for symmetric files), the 1-based node ids, whether
+    the storage is general, and whether the field is integer or real.
+    Repeated entries of a pattern file are a single edge.
+
+    Raises
+    ------
+    ValueError
+        If the header, the size line or an entry is malformed.
+    """
+    with open(path, "r") as fo:
+        header = fo.readline().split()
+        line_number = 1
+        if len(header) < 5 or not header[0].lstrip("%").lower() == "matrixmarket":
+            raise ValueError(f"{path}: missing MatrixMarket header")
+        layout, field, symmetry = header[2].lower(), header[3].lower(), header[4].lower()
+        if layout != "coordinate":
+            raise ValueError(f"{path}: only coordinate files are supported, not {layout}")
+        if field not in ("pattern", "integer", "real"):
+            raise ValueError(f"{path}: unsupported field {field}")
+        if symmetry not in ("general", "symmetric"):
+            raise ValueError(f"{path}: unsupported symmetry {symmetry}")
+
+        line = fo.readline()
+        line_number += 1
+        while line.startswith("%"):
+            line = fo.readline()
+            line_number += 1
+        size = line.split()
+        if len(size) != 3:
+            raise ValueError(f"{path}: illegal size line {line!r}")
+        num_rows, num_cols, num_entries = (int(x) for x in size)
+        if num_rows != num_cols:
+            raise ValueError(f"{path}: adjacency matrix must be square, got {num_rows}x{num_cols}")
+
+        text = fo.read()
+
+    weighted = field != "pattern"
+    entries = _parse_numbers(text, 3 if weighted else 2, np.float64 if weighted else np.int64,
+                             path, line_number + 1)
+    if entries.shape[0] != num_entries:
+        raise ValueError(f"{path}: header announces {num_entries} entries, found {entries.shape[0]}")
+
+    rows = entries[:, 0].astype(np.int64) - 1
+    cols = entries[:, 1].astype(np.int64) - 1
+    if num_entries and (min(rows.min(), cols.min()) < 0 or max(rows.max(), cols.max()) >= num_rows):
+        raise ValueError(f"{path}: vertex index outside 1..{num_rows}")
+    weights = entries[:, 2] if weighted else np.ones(num_entries, dtype=np.int64)
+
+    matrix = edges_to_csr(rows, cols, weights, num_rows, symmetry == "symmetric")
+    if not weighted:
+        matrix.data[:] = 1
+    return matrix, np.arange(1, num_rows + 1), symmetry == "general", weighted
+
+
+def edges_to_csr(rows: NDArray[np.int64],
+                 cols: NDArray[np.int64],
+                 weights: NDArray[Any],
+                 num_nodes: int,
+                 symmetric: bool) -> sp.csr_array:
+    """
+    CSR adjacency matrix of num_nodes nodes from edge index arrays.
+
+    With symmetric=True each off-diagonal edge is stored in both directions.
+    Repeated edges are summed.
+    """
+    if symmetric:
+        # only one triangle is stored; mirror the off-diagonal entries
+        off_diagonal = rows != cols
+        rows, cols = np.concatenate([rows, cols[off_diagonal]]), np.concatenate([cols, rows[off_diagonal]])
+        weights = np.concatenate([weights, weights[off_diagonal]])
+    matrix = sp.coo_array((weights, (rows, cols)), shape=(num_nodes, num_nodes)).tocsr()
+    matrix.sum_duplicates()
+    return matrix
+
+
+READERS = {
+    ".gexf": read_gexf_arrays,
+    ".mtx": read_mtx_arrays,
+}
+
+
+###########
+## Cache ##
+###########
+
+def _file_digest(path: Path, cache_dir: Path) -> str:
+    """
+    SHA-256 of the file's contents. The digest is remembered in an index
+    with the file's size and mtime, and only recomputed when either changes.
+    """
+    index_path = cache_dir / "index.json"
+    index: dict[str, dict[str, Any]] = {}
+    if index_path.exists():
+        index = json.loads(index_path.read_text())
+
+    stat = path.stat()
+    key = str(path.resolve())
+    entry = index.get(key)
+    if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return str(entry["sha256"])
+
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    index_path.write_text(json.dumps(index, indent=1))
+    return digest
+
+
+def _save_entry(graph: CachedGraph, entry_dir: Path, source: Path) -> None:
+    # write into a temporary directory and rename it, so an interrupted
+    # conversion never leaves a partial entry behind
+    tmp_dir = entry_dir.with_name(entry_dir.name + ".tmp")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    np.save(tmp_dir / "indptr.npy", graph.adjacency.indptr)
+    np.save(tmp_dir / "indices.npy", graph.adjacency.indices)
+    np.save(tmp_dir / "data.npy", graph.adjacency.data)
+    np.save(tmp_dir / "node_ids.npy", graph.node_ids)
+    attribute_files: dict[str, str] = {}
+    for i, (name, column) in enumerate(graph.node_attributes.items()):
+        attribute_files[name] = f"attribute_{i}.npy"
+        np.save(tmp_dir / attribute_files[name], column)
+    meta = {
+        "source": str(source),
+        "directed": graph.directed,
+        "weighted": graph.weighted,
+        "num_nodes": int(graph.adjacency.shape[0]),
+        "node_attributes": attribute_files,
+    }
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=1))
+    tmp_dir.replace(entry_dir)
+
+
+def _load_entry(entry_dir: Path, mmap: bool) -> CachedGraph:
+    mmap_mode = "r" if mmap else None
+    meta = json.loads((entry_dir / "meta.json").read_text())
+
+    def load(name: str) -> NDArray[Any]:
+        return np.load(entry_dir / name, mmap_mode=mmap_mode, allow_pickle=False)
+
+    num_nodes = meta["num_nodes"]
+    adjacency = sp.csr_array(
+        (load("data.npy"), load("indices.npy"), load("indptr.npy")),
+        shape=(num_nodes, num_nodes),
+        copy=False,
+    )
+    node_attributes = {name: load(filename) for name, filename in meta["node_attributes"].items()}
+    # entries written before the flag existed gave every edge a weight
+    weighted = bool(meta.get("weighted", True))
+    return CachedGraph(adjacency, load("node_ids.npy"), node_attributes, bool(meta["directed"]), weighted)
+
+
+def load_graph_arrays(path: Union[str, Path],
+                      cache_dir: Union[str, Path, None] = None,
+                      mmap: bool = False) -> CachedGraph:
+    """
+    Load a .gexf or .mtx file through the binary cache.
+
+    The first load of a file parses it and writes a cache entry; later loads
+    of the same contents read the entry instead.
+
+    Parameters
+    ----------
+    path : str or Path
+        The source graph file.
+    cache_dir : str or Path, optional
+        Where cache entries are kept. Default is a .graph_cache directory
+        next to the source file.
+    mmap : bool, optional
+        Open the cached arrays memory-mapped (read-only, zero-copy) instead
+        of reading them into memory. Default is False.
+
+    Returns
+    -------
+    CachedGraph
+        The adjacency matrix, node ids and node attribute columns.
+
+    Raises
+    ------
+    ValueError
+        If the file extension is not .gexf or .mtx.
+    """
+    source = Path(path)
+    reader = READERS.get(source.suffix.lower())
+    if reader is None:
+        raise ValueError(f"No reader for {source.suffix} files; expected one of {sorted(READERS)}")
+
+    cache_path = Path(cache_dir) if cache_dir is not None else source.parent / ".graph_cache"
+    cache_path.mkdir(parents=True, exist_ok=True)
+    entry_dir = cache_path / f"{source.stem}-{_file_digest(source, cache_path)[:16]}"
+
+    if not entry_dir.exists():
+        _save_entry(reader(source), entry_dir, source)
+    return _load_entry(entry_dir, mmap)
+
+
+def load_graph(path: Union[str, Path],
+               cache_dir: Union[str, Path, None] = None) -> nx.Graph:
+    """
+    Load a .gexf or .mtx file through the binary cache as a networkx graph.
+
+    See load_graph_arrays; the graph has the node attributes as node data
+    and, if the file is weighted, the edge weights as the "weight" edge
+    attribute.
+    """
+    return load_graph_arrays(path, cache_dir).to_networkx()
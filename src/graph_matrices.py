@@ -0,0 +1,230 @@
+"""Cached node order and sparse matrices of networkx graphs.
+
+Centrality, spectral and modularity routines all start by fixing an order of
+the nodes and building the adjacency matrix in that order, which for a large
+graph takes far longer than the linear algebra that follows. graph_matrices
+keeps that work per graph object, keyed by the graph's identity and a
+version that changes whenever the graph is mutated.
+
+networkx clears G.__networkx_cache__ in every method that changes a graph
+(add_edge, remove_node, add_weighted_edges_from, ...), so the version is kept
+there and checking it costs O(1); edges re-added with a new weight are seen
+as well. Graph views and graphs with that cache disabled are hashed instead
+(structural_version), which sees added and removed nodes and edges but not
+weights. Editing an attribute in place (G[u][v]["weight"] = w) bypasses both;
+call invalidate(G) after doing that.
+"""
+
+from itertools import count
+from numbers import Real
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+import weakref
+import networkx as nx  # type: ignore
+import numpy as np
+from numpy.typing import NDArray
+import scipy.sparse as sp  # type: ignore
+
+
+def node_order(G: nx.Graph) -> List[Hashable]:
+    """
+    The nodes of G in sorted order. Nodes that cannot all be compared with
+    each other (e.g. a mix of ints and strings) are grouped by type, with
+    all real numbers in one group, and the groups are put in order of type
+    name. Each group is sorted by value, or by repr if its members cannot
+    be compared either.
+
+    Examples
+    --------
+    >>> node_order(nx.Graph([(2, 1), ("b", "a")]))
+    [1, 2, 'a', 'b']
+    >>> node_order(nx.Graph([(2, 10), (10, "a"), (1.5, "b")]))
+    [1.5, 2, 10, 'a', 'b']
+    """
+    try:
+        return sorted(G.nodes)
+    except TypeError:
+        pass
+    groups: Dict[str, List[Hashable]] = {}
+    for node in G.nodes:
+        group = "number" if isinstance(node, Real) else type(node).__name__
+        groups.setdefault(group, []).append(node)
+    nodes: List[Hashable] = []
+    for group in sorted(groups):
+        try:
+            nodes.extend(sorted(groups[group]))
+        except TypeError:
+            nodes.extend(sorted(groups[group], key=repr))
+    return nodes
+
+
+def structural_version(G: nx.Graph) -> int:
+    """Hash of the nodes of G and of the neighbors of each node."""
+    return hash((tuple(G._adj), tuple(map(tuple, G._adj.values()))))
+
+
+# key of the version in G.__networkx_cache__, and the source of new versions
+_VERSION_KEY = "graph_matrices_version"
+_versions = count()
+
+
+def _mutation_tracked_cache(G: nx.Graph) -> Optional[Dict[str, Any]]:
+    """
+    G.__networkx_cache__ if networkx clears it whenever G changes, else None.
+    A view shares the structure of another graph whose changes do not clear
+    the view's cache, and views are frozen.
+    """
+    cache = getattr(G, "__networkx_cache__", None)
+    if cache is None or nx.is_frozen(G):
+        return None
+    return cache
+
+
+class GraphMatrices:
+    """
+    Node order and sparse matrices of one graph, built on first use.
+
+    Attributes
+    ----------
+    nodes : list
+        The nodes in node_order(G); row and column i of every matrix
+        belong to nodes[i].
+    index : dict
+        Position of each node in nodes.
+    directed : bool
+        Whether G is directed.
+    version : int
+        The version of G the entry was made for (see the module docstring).
+    derived : dict
+        Values computed from the matrices by other modules (a spectral
+        radius, a transition matrix, ...), keyed by the caller. They are
+        dropped together with the matrices.
+    """
+
+    def __init__(self, G: nx.Graph, version: int) -> None:
+        self._graph = weakref.ref(G)
+        self.version = version
+        self.directed: bool = G.is_directed()
+        self.nodes: List[Hashable] = node_order(G)
+        self.index: Dict[Hashable, int] = {node: i for i, node in enumerate(self.nodes)}
+        self.derived: Dict[Any, Any] = {}
+        self._adjacency: Dict[Optional[str], sp.csr_array] = {}
+        self._transpose: Dict[Optional[str], sp.csr_array] = {}
+
+    def adjacency(self, weight: Optional[str] = "weight") -> sp.csr_array:
+        """
+        CSR adjacency matrix (rows are sources) with the given edge attribute
+        as weight (1 where it is missing), or unweighted for weight=None.
+        """
+        if weight not in self._adjacency:
+            G = self._graph()
+            if G is None:
+                raise ReferenceError("The graph of these matrices no longer exists")
+            self._adjacency[weight] = nx.to_scipy_sparse_array(
+                G, nodelist=self.nodes, weight=weight, dtype=np.float64, format="csr"
+            )
+        return self._adjacency[weight]
+
+    def transpose(self, weight: Optional[str] = "weight") -> sp.csr_array:
+        """The transpose of adjacency(weight), in CSR form (rows are targets)."""
+        if weight not in self._transpose:
+            A = self.adjacency(weight)
+            self._transpose[weight] = A if not self.directed else A.T.tocsr()
+        return self._transpose[weight]
+
+
+_cache: Dict[int, Tuple[weakref.ref, GraphMatrices]] = {}
+
+
+def graph_matrices(G: nx.Graph) -> GraphMatrices:
+    """
+    The cached GraphMatrices of G, made anew if G has changed since they
+    were built. Entries are dropped when their graph is garbage collected.
+    """
+    key = id(G)
+    tracked = _mutation_tracked_cache(G)
+    entry = _cache.get(key)
+    if entry is not None and entry[0]() is G:
+        version = tracked.get(_VERSION_KEY) if tracked is not None else structural_version(G)
+        if entry[1].version == version:
+            return entry[1]
+
+    if tracked is not None:
+        version = next(_versions)
+        tracked[_VERSION_KEY] = version
+    else:
+        version = structural_version(G)
+
+    def forget(ref: weakref.ref) -> None:
+        if key in _cache and _cache[key][0] is ref:
+            del _cache[key]
+
+    matrices = GraphMatrices(G, version)
+    _cache[key] = (weakref.ref(G, forget), matrices)
+    return matrices
+
+
+def invalidate(G: nx.Graph) -> None:
+    """Drop the cached matrices of G, e.g. after editing edge weights in place."""
+    _cache.pop(id(G), None)
+
+
+def clear_graph_matrices() -> None:
+    """Drop all cached matrices."""
+    _cache.clear()
+
+
+def modularity(G: nx.Graph, partition: Iterable[Iterable[Hashable]], weight: Optional[str] = "weight") -> float:
+    """
+    Newman modularity of a partition of the nodes of G, as computed by
+    nx.community.modularity (resolution 1), from the cached adjacency matrix.
+
+    Parameters
+    ----------
+    G : nx.Graph
+        An undirected or directed graph.
+    partition : iterable of node sets
+        The communities; every node must be in exactly one of them.
+    weight : str, optional
+        Edge attribute used as weight, or None. Default is "weight".
+
+    Returns
+    -------
+    float
+        The modularity; 0.0 for a graph without edges.
+
+    Examples
+    --------
+    >>> G = nx.barbell_graph(3, 0)
+    >>> round(modularity(G, [{0, 1, 2}, {3, 4, 5}]), 6)
+    0.357143
+    """
+    matrices = graph_matrices(G)
+    A = matrices.adjacency(weight)
+    labels: NDArray[np.int64] = np.full(len(matrices.nodes), -1, dtype=np.int64)
+    num_communities = 0
+    for community in partition:
+        for node in community:
+            labels[matrices.index[node]] = num_communities
+        num_communities += 1
+    if (labels < 0).any():
+        raise nx.NetworkXError("partition is not a partition of the nodes of G")
+
+    coo = A.tocoo()
+    same = labels[coo.row] == labels[coo.col]
+    internal = np.bincount(labels[coo.row[same]], weights=coo.data[same], minlength=num_communities)
+    out_weight = np.bincount(labels, weights=np.asarray(A.sum(axis=1)).ravel(), minlength=num_communities)
+    in_weight = np.bincount(labels, weights=np.asarray(A.sum(axis=0)).ravel(), minlength=num_communities)
+    if matrices.directed:
+        m = A.sum()
+        if m == 0:
+            return 0.0
+        return float(np.sum(internal / m - out_weight * in_weight / m**2))
+
+    # networkx counts an undirected self-loop twice in the degree and once
+    # as an internal edge, while the matrix stores it once on the diagonal
+    loops = np.bincount(labels, weights=A.diagonal(), minlength=num_communities)
+    degree = out_weight + loops
+    m = degree.sum() / 2
+    if m == 0:
+        return 0.0
+    return float(np.sum((internal + loops) / 2 / m - (degree / (2 * m)) ** 2))
@@ -1,8 +1,15 @@
 """Utility functions for working with graphlets and graphlet visualization."""
 
-from typing import Union, Callable
-from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Union, Callable, Hashable, Iterator
+from functools import lru_cache
+from itertools import combinations, islice, permutations
 import numpy as np
+from numpy.typing import NDArray
+import scipy.sparse as sp  # type: ignore
 import networkx as nx # type: ignore
 import networkx.algorithms.isomorphism as iso
 import matplotlib.pyplot as plt
@@ -237,15 +244,114 @@ def show_graphs_in_a_set(
         axis.set_aspect("equal")
 
 
+def iter_connected_node_sets(
+    G: nx.Graph, size: int, vertex: Hashable
+) -> Iterator[tuple[Hashable, ...]]:
+    """
+    Lazily enumerate the node sets of all connected induced subgraphs of a
+    given size that contain a specific vertex.
+
+    The sets are grown outward from `vertex` with the extension step of the
+    ESU algorithm (Wernicke, 2006): a set is only ever extended by nodes
+    adjacent to it that were not already adjacent to the set it was grown
+    from, which produces every connected set containing `vertex` exactly
+    once. Only the (size-1)-hop neighborhood of `vertex` is visited, so the
+    cost depends on the number of such sets rather than on |V|.
+
+    Parameters
+    ----------
+    G : nx.Graph
+        The input graph.
+    size : int
+        The number of nodes in each set.
+    vertex : Hashable
+        The vertex that every set contains.
+
+    Yields
+    ------
+    tuple[Hashable, ...]
+        The nodes of one connected induced subgraph, starting with `vertex`
+        and in the order they were added. Nothing is yielded if `vertex` is
+        not in G or size < 1.
+
+    Examples
+    --------
+    >>> sorted(sorted(nodes) for nodes in iter_connected_node_sets(nx.path_graph(4), 2, 1))
+    [[0, 1], [1, 2]]
+    """
+    if vertex not in G or size < 1:
+        return
+    neighbors = [u for u in G.adj[vertex] if u != vertex]
+    yield from _extend_connected_set(G.adj, [vertex], size, {vertex, *neighbors}, neighbors, None)
+
+
+def iter_all_connected_node_sets(G: nx.Graph, size: int) -> Iterator[tuple[Hashable, ...]]:
+    """
+    Lazily enumerate the node sets of all connected induced subgraphs of G
+    with `size` nodes, each exactly once.
+
+    This is the ESU algorithm (Wernicke, 2006): the sets are grown as in
+    iter_connected_node_sets from each node v in turn, using only nodes
+    that come after v in G's node order.
+
+    Examples
+    --------
+    >>> len(list(iter_all_connected_node_sets(nx.cycle_graph(5), 3)))
+    5
+    """
+    if size < 1:
+        return
+    position = {node: i for i, node in enumerate(G.nodes())}
+    for vertex in G.nodes():
+        first = position[vertex]
+        later = [u for u in G.adj[vertex] if position[u] > first]
+        yield from _extend_connected_set(
+            G.adj, [vertex], size, {vertex, *G.adj[vertex]}, later,
+            lambda u: position[u] > first,
+        )
+
+
+def _extend_connected_set(adj: Any,
+                          subset: list[Hashable],
+                          size: int,
+                          neighborhood: set[Hashable],
+                          extension: list[Hashable],
+                          allowed: Callable[[Hashable], bool] | None) -> Iterator[tuple[Hashable, ...]]:
+    """
+    The ESU extension step. neighborhood is subset together with all of its
+    neighbors; a set is only extended by nodes that are adjacent to the
+    node just added but not to the set before it (and pass `allowed`).
+    """
+    if len(subset) == size:
+        yield tuple(subset)
+        return
+    if len(subset) == size - 1:
+        # any extension node completes a set; skip the recursion (same order)
+        for w in reversed(extension):
+            yield (*subset, w)
+        return
+    extension = list(extension)
+    while extension:
+        w = extension.pop()
+        new_nodes = [u for u in adj[w] if u not in neighborhood]
+        subset.append(w)
+        yield from _extend_connected_set(
+            adj, subset, size, neighborhood.union(new_nodes),
+            extension + [u for u in new_nodes if allowed is None or allowed(u)], allowed,
+        )
+        subset.pop()
+
+
 def find_subgraphs_containing_vertex(
     G: nx.Graph, size: int, vertex: Union[str, int]
 ) -> list[nx.Graph]:
     """
     Find all connected induced subgraphs of a given size containing a specific vertex.
 
-    This function generates all possible induced subgraphs of a graph `G` with a
-    specified number of nodes, filters for those that are connected and contain a
-    target vertex, and returns them.
+    This function enumerates the connected node sets of the specified size that
+    contain the target vertex (see iter_connected_node_sets) and returns the
+    induced subgraph of each. Use iter_connected_node_sets directly to get the
+    node sets lazily without building subgraph objects.
 
     Parameters
     ----------
@@ -260,7 +366,8 @@ def find_subgraphs_containing_vertex(
     -------
     list[nx.Graph]
         A list of networkx Graph objects representing all connected induced subgraphs
-        of the specified size that contain the target vertex.
+        of the specified size that contain the target vertex, in the order
+        itertools.combinations(G.nodes(), size) would list their node sets.
 
     Notes
     -----
@@ -269,25 +376,22 @@ def find_subgraphs_containing_vertex(
       the subset of nodes are included in the subgraph.
     - The function uses networkx's `G.subgraph()` method, which automatically
       returns induced subgraphs.
+    - Only the (size-1)-hop neighborhood of the vertex is explored, so this
+      works on graphs with thousands of nodes.
 
     Examples
     --------
     >>> G = nx.complete_graph(4)  # K4 graph
     >>> subgraphs = find_subgraphs_containing_vertex(G, 3, 0)
     >>> len(subgraphs)  # Should find all 3-node induced subgraphs containing node 0
-    4
+    3
     """
-    from itertools import combinations
-
-    subgraphs: list[nx.Graph] = []
-    for nodes in combinations(G.nodes(), size):
-        if vertex not in set(nodes):  # Skip subgraphs that don't contain the target vertex
-            continue
-        subgraph: nx.Graph = G.subgraph(nodes)
-        # Single nodes are trivially connected; multi-node subgraphs must be connected
-        if len(subgraph.nodes()) == 1 or nx.is_connected(subgraph):
-            subgraphs.append(subgraph)
-    return subgraphs
+    position = {node: i for i, node in enumerate(G.nodes())}
+    node_sets = [
+        sorted(nodes, key=position.__getitem__) for nodes in iter_connected_node_sets(G, size, vertex)
+    ]
+    node_sets.sort(key=lambda nodes: [position[node] for node in nodes])
+    return [G.subgraph(nodes) for nodes in node_sets]
 
 
 def rooted_is_isomorphic(G1: nx.Graph, G2: nx.Graph, root: Union[str, int]) -> bool:
@@ -348,6 +452,213 @@ def rooted_is_isomorphic(G1: nx.Graph, G2: nx.Graph, root: Union[str, int]) -> b
     return False
 
 
+@lru_cache(maxsize=None)
+def canonical_table(num_nodes: int, rooted: bool = True) -> NDArray[np.int64]:
+    """
+    Canonical form of every graph on nodes 0, 1, ..., num_nodes-1.
+
+    A graph is encoded as an edge bitmask: bit j is set when the j-th pair
+    of itertools.combinations(range(num_nodes), 2) is an edge. Its canonical
+    form is the smallest bitmask among all relabelings of its nodes (only
+    those that keep node 0, the root, in place if `rooted`), so two graphs
+    are (rooted) isomorphic exactly when their canonical forms are equal.
+
+    Tables for up to ATLAS_MAX_NODES nodes are read from the graphlet atlas
+    (see graphlet_atlas); larger ones are computed with one vectorized pass
+    over all bitmasks per node permutation. Either way a table is only
+    loaded or computed once per (num_nodes, rooted).
+
+    Parameters
+    ----------
+    num_nodes : int
+        Number of nodes. The table has 2^(num_nodes choose 2) entries, so
+        this is meant for graphlet sizes (up to about 6).
+    rooted : bool, optional
+        Whether node 0 must stay fixed. Default is True.
+
+    Returns
+    -------
+    NDArray[np.int64]
+        table[mask] is the canonical form of the graph with bitmask mask.
+
+    Examples
+    --------
+    >>> # on 3 nodes the root is an end of the path 0-1-2 but the middle of 1-0-2
+    >>> table = canonical_table(3)
+    >>> int(table[0b101]), int(table[0b011])
+    (5, 3)
+    >>> int(canonical_table(3, rooted=False)[0b101])
+    3
+    """
+    if num_nodes <= ATLAS_MAX_NODES:
+        return graphlet_atlas()[_atlas_key(num_nodes, rooted)].astype(np.int64)
+    return _compute_canonical_table(num_nodes, rooted)
+
+
+def _compute_canonical_table(num_nodes: int, rooted: bool) -> NDArray[np.int64]:
+    pairs = list(combinations(range(num_nodes), 2))
+    pair_index = {pair: j for j, pair in enumerate(pairs)}
+    masks = np.arange(1 << len(pairs), dtype=np.int64)
+    bits = [(masks >> j) & 1 for j in range(len(pairs))]
+
+    table = masks.copy()
+    first = 1 if rooted else 0
+    for perm in permutations(range(first, num_nodes)):
+        relabel = tuple(range(first)) + perm
+        permuted = np.zeros_like(masks)
+        for j, (u, v) in enumerate(pairs):
+            a, b = relabel[u], relabel[v]
+            permuted |= bits[j] << pair_index[(a, b) if a < b else (b, a)]
+        np.minimum(table, permuted, out=table)
+    return table
+
+
+###################
+## Graphlet atlas ##
+###################
+
+# The canonical tables (and the connected graphlets they contain) for up to
+# ATLAS_MAX_NODES nodes, stored as uint16 codes in a compressed .npz next to
+# this module. Six nodes take 2^15 codes per table, so every code fits.
+ATLAS_MAX_NODES = 6
+ATLAS_PATH = Path(__file__).with_name("graphlet_atlas.npz")
+_ATLAS_VERSION = 1
+
+
+def _atlas_key(num_nodes: int, rooted: bool, connected: bool = False) -> str:
+    return f"{'connected' if connected else 'table'}_{'rooted' if rooted else 'unrooted'}_{num_nodes}"
+
+
+def build_graphlet_atlas(path: Union[str, Path, None] = ATLAS_PATH) -> dict[str, NDArray[Any]]:
+    """
+    Compute the graphlet atlas for 1 to ATLAS_MAX_NODES nodes.
+
+    For every size and for rooted and unrooted isomorphism the atlas holds
+    the canonical table (see canonical_table) and the sorted canonical forms
+    of the connected graphlets, i.e. the catalog of graphlet classes.
+
+    Parameters
+    ----------
+    path : str, Path or None, optional
+        Where to save the atlas as a compressed .npz file. Default is
+        ATLAS_PATH, which graphlet_atlas reads; None does not save it.
+
+    Returns
+    -------
+    dict[str, NDArray]
+        The atlas arrays by name.
+    """
+    atlas: dict[str, NDArray[Any]] = {"version": np.array(_ATLAS_VERSION)}
+    for num_nodes in range(1, ATLAS_MAX_NODES + 1):
+        for rooted in (True, False):
+            table = _compute_canonical_table(num_nodes, rooted)
+            classes = np.unique(table).tolist()
+            connected = [code for code in classes if _mask_is_connected(code, num_nodes)]
+            atlas[_atlas_key(num_nodes, rooted)] = table.astype(np.uint16)
+            atlas[_atlas_key(num_nodes, rooted, connected=True)] = np.array(connected, dtype=np.uint16)
+    if path is not None:
+        _save_atlas(atlas, Path(path))
+    return atlas
+
+
+def _save_atlas(atlas: dict[str, NDArray[Any]], path: Path) -> None:
+    # write to a temporary file first so a reader never sees half an atlas
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **atlas)
+    tmp_path.replace(path)
+
+
+@lru_cache(maxsize=None)
+def graphlet_atlas() -> dict[str, NDArray[Any]]:
+    """
+    The graphlet atlas (see build_graphlet_atlas), read from ATLAS_PATH on
+    first use. If the file is missing or from another version the atlas is
+    rebuilt, and saved when ATLAS_PATH is writable.
+    """
+    try:
+        with np.load(ATLAS_PATH, allow_pickle=False) as data:
+            atlas = {name: data[name] for name in data.files}
+        if int(atlas["version"]) == _ATLAS_VERSION:
+            return atlas
+    except (OSError, KeyError, ValueError):
+        pass
+    atlas = build_graphlet_atlas(None)
+    try:
+        _save_atlas(atlas, ATLAS_PATH)
+    except OSError:
+        pass
+    return atlas
+
+
+def graphlet_catalog(num_nodes: int, rooted: bool = True) -> NDArray[np.int64]:
+    """
+    Canonical forms (see canonical_table) of all connected graphlets on
+    num_nodes nodes, sorted; num_nodes is at most ATLAS_MAX_NODES.
+
+    Examples
+    --------
+    >>> len(graphlet_catalog(4, rooted=False)), len(graphlet_catalog(4))
+    (6, 11)
+    """
+    if not 1 <= num_nodes <= ATLAS_MAX_NODES:
+        raise ValueError(f"num_nodes must be between 1 and {ATLAS_MAX_NODES}, got {num_nodes}")
+    return graphlet_atlas()[_atlas_key(num_nodes, rooted, connected=True)].astype(np.int64)
+
+
+def _edge_mask(G: nx.Graph, order: list[Hashable]) -> int:
+    """Bitmask of the edges of G with node order[i] as node i (see canonical_table)."""
+    mask = 0
+    for j, (u, v) in enumerate(combinations(range(len(order)), 2)):
+        if G.has_edge(order[u], order[v]):
+            mask |= 1 << j
+    return mask
+
+
+def rooted_canonical_form(G: nx.Graph, root: Hashable) -> int:
+    """
+    Canonical form of a small graph with a fixed root vertex.
+
+    Two graphs on the same number of nodes are rooted isomorphic (see
+    rooted_is_isomorphic) exactly when their rooted canonical forms are
+    equal. The form is looked up in canonical_table.
+
+    Examples
+    --------
+    >>> G1 = nx.Graph([('A','B'), ('B','C')])
+    >>> G2 = nx.Graph([('A','C'), ('C','B')])
+    >>> rooted_canonical_form(G1, 'A') == rooted_canonical_form(G2, 'A')
+    True
+    >>> rooted_canonical_form(G1, 'A') == rooted_canonical_form(G1, 'B')
+    False
+    """
+    order = [root] + [node for node in G.nodes() if node != root]
+    return int(canonical_table(len(order), rooted=True)[_edge_mask(G, order)])
+
+
+def canonical_form(G: nx.Graph) -> int:
+    """Canonical form of a small graph (see canonical_table); equal for isomorphic graphs."""
+    order = list(G.nodes())
+    return int(canonical_table(len(order), rooted=False)[_edge_mask(G, order)])
+
+
+def _mask_is_connected(mask: int, num_nodes: int) -> bool:
+    """Whether the graph with edge bitmask mask on num_nodes nodes is connected."""
+    neighbors = [0] * num_nodes
+    for j, (u, v) in enumerate(combinations(range(num_nodes), 2)):
+        if (mask >> j) & 1:
+            neighbors[u] |= 1 << v
+            neighbors[v] |= 1 << u
+    reached, frontier = 1, 1
+    while frontier:
+        node = (frontier & -frontier).bit_length() - 1
+        frontier &= frontier - 1
+        new = neighbors[node] & ~reached
+        reached |= new
+        frontier |= new
+    return reached == (1 << num_nodes) - 1
+
+
 def find_all_graphlets(nodes: list[Union[str, int]], root: Union[str, int]) -> list[nx.Graph]:
     """
     Find all non-isomorphic connected rooted graphs on a given set of nodes.
@@ -377,7 +688,12 @@ def find_all_graphlets(nodes: list[Union[str, int]], root: Union[str, int]) -> l
     - The function generates all possible subsets of edges, which is exponential
       in the number of edges (2^n_edges possibilities).
     - Only connected graphs are retained.
-    - Rooted isomorphism checking is performed to keep only one representative per class.
+    - Each candidate is classified by looking up its rooted canonical form
+      (see canonical_table), and the first candidate of each class is kept,
+      so deduplication is linear in the number of candidates. The kept
+      candidates only depend on the number of nodes and the position of the
+      root, so they are computed once for each; up to ATLAS_MAX_NODES nodes
+      the canonical forms come from the precomputed graphlet atlas.
     - The root vertex is fixed during isomorphism checking, meaning two rooted
       graphlets are considered isomorphic only if they map to each other while
       keeping the root vertex fixed.
@@ -385,25 +701,636 @@ def find_all_graphlets(nodes: list[Union[str, int]], root: Union[str, int]) -> l
     Examples
     --------
     >>> graphlets = find_all_graphlets(['A', 'B', 'C'], 'A')
-    >>> len(graphlets)  # Should be 4 rooted graphlets on 3 nodes with root A
-    4
+    >>> len(graphlets)  # 3 rooted graphlets on 3 nodes with root A
+    3
     """
-    all_graphs = []
-    # Generate all possible edges
+    # Candidate graph i has edge j when bit j of i is set
     possible_edges = list(combinations(nodes, 2))
-
-    # Generate all possible graphs
-    for i in range(2**len(possible_edges)):
-        edges = [possible_edges[j] for j in range(len(possible_edges)) if (i >> j) & 1]
+    unique_graphs = []
+    for i in _rooted_representatives(len(nodes), nodes.index(root)):
         G = nx.Graph()
         G.add_nodes_from(nodes)
-        G.add_edges_from(edges)
-        if nx.is_connected(G):
-            all_graphs.append(G)
-
-    # Only keep one graph from each rooted isomorphism class
-    unique_graphs = []
-    for G in all_graphs:
-        if not any(rooted_is_isomorphic(G, H, root) for H in unique_graphs):
-            unique_graphs.append(G)
+        G.add_edges_from(edge for j, edge in enumerate(possible_edges) if (i >> j) & 1)
+        unique_graphs.append(G)
     return unique_graphs
+
+
+@lru_cache(maxsize=None)
+def _rooted_representatives(num_nodes: int, root_index: int) -> tuple[int, ...]:
+    """
+    Edge bitmasks (over combinations of the node positions) of the first
+    candidate of each connected rooted graphlet class, with the root at
+    position root_index. This only depends on the two numbers, so
+    find_all_graphlets computes it once for each.
+    """
+    candidates = np.arange(1 << (num_nodes * (num_nodes - 1) // 2), dtype=np.int64)
+
+    # canonical_table numbers the nodes with the root first (so it stays
+    # fixed); move each candidate's bits to that numbering and look it up
+    order = [root_index] + [i for i in range(num_nodes) if i != root_index]
+    position = {node: i for i, node in enumerate(order)}
+    pair_index = {pair: j for j, pair in enumerate(combinations(range(num_nodes), 2))}
+    root_first = np.zeros_like(candidates)
+    for j, (u, v) in enumerate(combinations(range(num_nodes), 2)):
+        a, b = sorted((position[u], position[v]))
+        root_first |= ((candidates >> j) & 1) << pair_index[(a, b)]
+    classes = canonical_table(num_nodes, rooted=True)[root_first]
+
+    # The first candidate of each rooted isomorphism class
+    codes, first_candidates = np.unique(classes, return_index=True)
+
+    # Connectivity is the same for a whole class, so only check one graph per class
+    if num_nodes <= ATLAS_MAX_NODES:
+        connected = np.isin(codes, graphlet_catalog(num_nodes, rooted=True))
+    else:
+        connected = np.array([_mask_is_connected(int(code), num_nodes) for code in codes], dtype=bool)
+    return tuple(sorted(int(i) for i in first_candidates[connected]))
+
+
+# Orbits of the 2-4 node graphlets in the numbering of Przulj (2007), each
+# given by one graphlet (edges on nodes 0..k-1) and one node in the orbit.
+_SMALL_ORBITS: list[tuple[list[tuple[int, int]], int]] = [
+    ([(0, 1)], 0),                                  # 0: edge
+    ([(0, 1), (1, 2)], 0),                          # 1: end of 3-path
+    ([(0, 1), (1, 2)], 1),                          # 2: middle of 3-path
+    ([(0, 1), (1, 2), (0, 2)], 0),                  # 3: triangle
+    ([(0, 1), (1, 2), (2, 3)], 0),                  # 4: end of 4-path
+    ([(0, 1), (1, 2), (2, 3)], 1),                  # 5: inner node of 4-path
+    ([(0, 1), (0, 2), (0, 3)], 1),                  # 6: leaf of claw
+    ([(0, 1), (0, 2), (0, 3)], 0),                  # 7: center of claw
+    ([(0, 1), (1, 2), (2, 3), (0, 3)], 0),          # 8: 4-cycle
+    ([(0, 1), (1, 2), (0, 2), (2, 3)], 3),          # 9: tail of paw
+    ([(0, 1), (1, 2), (0, 2), (2, 3)], 0),          # 10: degree-2 node of paw
+    ([(0, 1), (1, 2), (0, 2), (2, 3)], 2),          # 11: degree-3 node of paw
+    ([(0, 1), (1, 2), (2, 3), (0, 3), (0, 2)], 1),  # 12: degree-2 node of diamond
+    ([(0, 1), (1, 2), (2, 3), (0, 3), (0, 2)], 0),  # 13: degree-3 node of diamond
+    (list(combinations(range(4), 2)), 0),           # 14: 4-clique
+]
+NUM_ORBITS: dict[int, int] = {2: 1, 3: 4, 4: 15, 5: 73}
+
+
+def _rooted_code(num_nodes: int, edges: list[tuple[int, int]], root: int) -> int:
+    G = nx.Graph(edges)
+    G.add_nodes_from(range(num_nodes))
+    return rooted_canonical_form(G, root)
+
+
+@lru_cache(maxsize=None)
+def _orbit_codes(num_nodes: int) -> dict[int, int]:
+    """
+    Orbit index of every rooted canonical form (see canonical_table) of a
+    connected graphlet with num_nodes nodes.
+
+    Orbits of 2-4 node graphlets follow _SMALL_ORBITS. The 58 orbits of the
+    5-node graphlets are numbered 15-72 by (number of edges, canonical form
+    of the graphlet, rooted canonical form), which is not the order of
+    Przulj (2007) for those orbits.
+    """
+    if num_nodes <= 4:
+        return {
+            _rooted_code(num_nodes, edges, root): orbit
+            for orbit, (edges, root) in enumerate(_SMALL_ORBITS)
+            if max(max(edge) for edge in edges) == num_nodes - 1
+        }
+
+    rooted = canonical_table(num_nodes, rooted=True)
+    unrooted = canonical_table(num_nodes, rooted=False)
+    keys = set()
+    for mask in np.unique(unrooted).tolist():
+        if not _mask_is_connected(mask, num_nodes):
+            continue
+        for root in range(num_nodes):
+            keys.add((bin(mask).count("1"), mask, int(rooted[_root_first(mask, num_nodes, root)])))
+    first = NUM_ORBITS[num_nodes - 1]
+    return {code: first + i for i, (_, _, code) in enumerate(sorted(keys))}
+
+
+def _root_first(mask: int, num_nodes: int, root: int) -> int:
+    """Bitmask of the same graph with root renumbered as node 0."""
+    order = [root] + [node for node in range(num_nodes) if node != root]
+    new_index = {node: i for i, node in enumerate(order)}
+    pairs = list(combinations(range(num_nodes), 2))
+    pair_index = {pair: j for j, pair in enumerate(pairs)}
+    relabeled = 0
+    for j, (u, v) in enumerate(pairs):
+        if (mask >> j) & 1:
+            a, b = sorted((new_index[u], new_index[v]))
+            relabeled |= 1 << pair_index[(a, b)]
+    return relabeled
+
+
+@lru_cache(maxsize=None)
+def _orbit_table(num_nodes: int) -> NDArray[np.int64]:
+    """
+    table[mask, i] is the orbit of node i in the graph with edge bitmask
+    mask on num_nodes nodes, or -1 if that graph is not connected.
+    """
+    codes = _orbit_codes(num_nodes)
+    rooted = canonical_table(num_nodes, rooted=True)
+    table = np.full((len(rooted), num_nodes), -1, dtype=np.int64)
+    for mask in range(len(rooted)):
+        if not _mask_is_connected(mask, num_nodes):
+            continue
+        for node in range(num_nodes):
+            table[mask, node] = codes[int(rooted[_root_first(mask, num_nodes, node)])]
+    return table
+
+
+@lru_cache(maxsize=None)
+def _noninduced_coefficients() -> NDArray[np.float64]:
+    """
+    coefficients[k, j]: how many copies of the orbit k pattern (its edges,
+    not necessarily induced) with the same node at the orbit k position a
+    graphlet contains when that node is in orbit j, for the 4-node orbits
+    (4-14). Non-induced counts are these coefficients times induced counts.
+    """
+    codes = _orbit_codes(4)
+    coefficients = np.zeros((11, 11))
+    for j, (edges, root) in enumerate(_SMALL_ORBITS[4:]):
+        for r in range(1, len(edges) + 1):
+            for subset in combinations(edges, r):
+                if len({node for edge in subset for node in edge}) < 4:
+                    continue
+                code = _rooted_code(4, list(subset), root)
+                if code in codes:
+                    coefficients[codes[code] - 4, j] += 1
+    return coefficients
+
+
+def graphlet_degree_vectors(G: nx.Graph, max_size: int = 4) -> NDArray[np.int64]:
+    """
+    Graphlet degree vectors: for every node, how many times it touches each
+    orbit of the connected graphlets with 2 to max_size nodes.
+
+    Orbits 0-14 (graphlets on 2-4 nodes) use the numbering of Przulj
+    (2007). They are computed for all nodes at once: closed-form counts of
+    the non-induced patterns from degrees, triangle counts and common
+    neighbor counts (sparse matrix products over the neighbor sets), which
+    are then turned into induced orbit counts by solving one small linear
+    system. With max_size=5 the 58 orbits of the 5-node graphlets (15-72,
+    ordered as described in _orbit_codes) are added by enumerating every
+    connected 5-node set with iter_all_connected_node_sets, which is much
+    slower on dense graphs.
+
+    Parameters
+    ----------
+    G : nx.Graph
+        An undirected graph; self-loops are ignored.
+    max_size : int, optional
+        Largest graphlet size, 2 to 5. Default is 4.
+
+    Returns
+    -------
+    NDArray[np.int64]
+        Array of shape (number of nodes, NUM_ORBITS[max_size]); row i is the
+        graphlet degree vector of the i-th node of G.nodes().
+
+    Raises
+    ------
+    ValueError
+        If max_size is not between 2 and 5.
+
+    Examples
+    --------
+    >>> graphlet_degree_vectors(nx.path_graph(3), max_size=3).tolist()
+    [[1, 1, 0, 0], [2, 0, 1, 0], [1, 1, 0, 0]]
+    """
+    if max_size not in NUM_ORBITS:
+        raise ValueError(f"max_size must be one of {sorted(NUM_ORBITS)}, got {max_size}")
+    nodes = list(G.nodes())
+    n = len(nodes)
+
+    A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=None, format="csr").astype(np.int64)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    A.data[:] = 1
+    d = np.asarray(A.sum(axis=1)).ravel()
+    A2 = A @ A
+    common = A.multiply(A2).tocsr()  # common neighbors of the endpoints of each edge
+    t = np.asarray(common.sum(axis=1)).ravel() // 2  # triangles at each node
+    s = A @ d - d  # paths x-y-z with z != x starting at each node x
+
+    orbits = np.zeros((n, 15), dtype=np.int64)
+    orbits[:, 0] = d
+    orbits[:, 1] = s - 2 * t
+    orbits[:, 2] = d * (d - 1) // 2 - t
+    orbits[:, 3] = t
+
+    if max_size >= 4:
+        # common neighbor counts of non-adjacent pairs as well, without x = z
+        A2_off = A2.tocsr()
+        A2_off.setdiag(0)
+        A2_off.eliminate_zeros()
+
+        def row_sums(M: Any) -> NDArray[np.int64]:
+            return np.asarray(M.sum(axis=1)).ravel()
+
+        def pairs_of(M: Any) -> Any:
+            M = M.copy()
+            M.data = M.data * (M.data - 1) // 2
+            return M
+
+        noninduced = np.zeros((n, 11), dtype=np.int64)
+        noninduced[:, 0] = A @ s - d * (d - 1) - 2 * t            # 4: x-y-z-w
+        noninduced[:, 1] = (d - 1) * s - 2 * t                    # 5: y-x-z-w
+        noninduced[:, 2] = A @ ((d - 1) * (d - 2) // 2)           # 6: leaf of a star
+        noninduced[:, 3] = d * (d - 1) * (d - 2) // 6             # 7: center of a star
+        noninduced[:, 4] = row_sums(pairs_of(A2_off))             # 8: 4-cycles
+        noninduced[:, 5] = A @ t - 2 * t                          # 9: edge to a triangle
+        noninduced[:, 6] = common @ (d - 2)                       # 10: triangle with a tail elsewhere
+        noninduced[:, 7] = t * (d - 2)                            # 11: triangle with a tail here
+        # 12: triangles x-c-e whose edge c-e has another common neighbor
+        noninduced[:, 8] = row_sums((A @ (common - A)).multiply(A)) // 2
+        noninduced[:, 9] = row_sums(pairs_of(common))             # 13: two triangles on an edge
+        noninduced[:, 10] = _four_cliques(A)                      # 14
+
+        induced = np.linalg.solve(_noninduced_coefficients(), noninduced.T.astype(np.float64))
+        orbits[:, 4:] = np.rint(induced.T).astype(np.int64)
+
+    vectors = orbits[:, :NUM_ORBITS[min(max_size, 4)]]
+    if max_size == 5:
+        vectors = np.hstack([vectors, _five_node_orbits(G, nodes)])
+    return vectors
+
+
+def _four_cliques(A: Any) -> NDArray[np.int64]:
+    """Number of 4-cliques at each node, from the neighbor sets of the rows of A."""
+    neighbors = [set(A.indices[A.indptr[i]:A.indptr[i + 1]].tolist()) for i in range(A.shape[0])]
+    counts = np.zeros(A.shape[0], dtype=np.int64)
+    # find each clique once, from its nodes in increasing order x < c < e < f
+    for x, x_neighbors in enumerate(neighbors):
+        for c in x_neighbors:
+            if c <= x:
+                continue
+            shared = x_neighbors & neighbors[c]
+            for e in shared:
+                if e <= c:
+                    continue
+                for f in shared & neighbors[e]:
+                    if f > e:
+                        counts[[x, c, e, f]] += 1
+    return counts
+
+
+def _five_node_orbits(G: nx.Graph, nodes: list[Hashable], chunk_size: int = 100_000) -> NDArray[np.int64]:
+    """Orbit counts of the 5-node graphlets (orbits 15-72) by enumeration."""
+    position = {node: i for i, node in enumerate(nodes)}
+    A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=None, format="csr")
+    table = _orbit_table(5)
+    counts = np.zeros((len(nodes), NUM_ORBITS[5]), dtype=np.int64)
+    node_sets = iter_all_connected_node_sets(G, 5)
+    while True:
+        # look the edge bitmasks and orbits up for a chunk of node sets at once
+        chunk = np.array(
+            [[position[node] for node in node_set] for node_set in islice(node_sets, chunk_size)],
+            dtype=np.int64,
+        ).reshape(-1, 5)
+        if not len(chunk):
+            break
+        np.add.at(counts, (chunk, table[_induced_masks(A, chunk)]), 1)
+    return counts[:, NUM_ORBITS[4]:]
+
+
+def _induced_masks(A: Any, node_sets: NDArray[np.int64]) -> NDArray[np.int64]:
+    """
+    Edge bitmasks (see canonical_table) of the subgraphs induced by the rows
+    of node_sets, which hold row indices of the adjacency matrix A.
+    """
+    masks = np.zeros(len(node_sets), dtype=np.int64)
+    if not len(node_sets):
+        return masks
+    for j, (u, v) in enumerate(combinations(range(node_sets.shape[1]), 2)):
+        masks |= (np.asarray(A[node_sets[:, u], node_sets[:, v]]).ravel() != 0).astype(np.int64) << j
+    return masks
+
+
+#######################
+## Parallel counting ##
+#######################
+
+# Worker processes attach to the parent's CSR arrays in shared memory when
+# the pool starts, so tasks only carry root indices.
+_worker_state: dict[str, Any] = {}
+
+
+def _share_array(array: NDArray[Any]) -> tuple[shared_memory.SharedMemory, tuple[str, tuple[int, ...], str]]:
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _init_worker(indptr: tuple[str, tuple[int, ...], str], indices: tuple[str, tuple[int, ...], str]) -> None:
+    arrays = []
+    for name, shape, dtype in (indptr, indices):
+        block = shared_memory.SharedMemory(name=name)
+        _worker_state.setdefault("blocks", []).append(block)
+        arrays.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+    _worker_state["adjacency"] = _RootCounter(*arrays)
+
+
+class _RootCounter:
+    """Rooted graphlet counts from the CSR arrays of a graph without self-loops."""
+
+    def __init__(self, indptr: NDArray[Any], indices: NDArray[Any]) -> None:
+        num_nodes = len(indptr) - 1
+        self.A = sp.csr_array((np.ones(len(indices), dtype=np.int8), indices, indptr),
+                              shape=(num_nodes, num_nodes), copy=False)
+        self.adj = [indices[indptr[i]:indptr[i + 1]].tolist() for i in range(num_nodes)]
+
+    def count(self, roots: list[int], size: int) -> NDArray[np.int64]:
+        catalog = graphlet_catalog(size, rooted=True)
+        table = canonical_table(size, rooted=True)
+        counts = np.zeros((len(roots), len(catalog)), dtype=np.int64)
+        for i, root in enumerate(roots):
+            neighbors = self.adj[root]
+            node_sets = np.array(
+                list(_extend_connected_set(self.adj, [root], size, {root, *neighbors}, neighbors, None)),
+                dtype=np.int64,
+            ).reshape(-1, size)
+            # the root is the first node of every set, as canonical_table expects
+            classes = np.searchsorted(catalog, table[_induced_masks(self.A, node_sets)])
+            counts[i] = np.bincount(classes, minlength=len(catalog))
+        return counts
+
+
+def _worker_count(roots: list[int], size: int) -> NDArray[np.int64]:
+    return _worker_state["adjacency"].count(roots, size)
+
+
+def count_rooted_graphlets(G: nx.Graph,
+                           roots: list[Hashable],
+                           size: int,
+                           n_workers: int | None = None,
+                           chunk_size: int = 64) -> NDArray[np.int64]:
+    """
+    Count, for each root, the connected induced subgraphs of G with `size`
+    nodes that contain it, by rooted graphlet class.
+
+    This is the batch form of find_subgraphs_containing_vertex followed by
+    classifying each subgraph with rooted_canonical_form. The roots are
+    split into chunks of chunk_size that are counted by a process pool. The
+    graph is handed to the workers once, as CSR adjacency arrays in shared
+    memory, so no networkx objects are pickled per task. The counts do not
+    depend on n_workers.
+
+    Parameters
+    ----------
+    G : nx.Graph
+        An undirected graph; self-loops are ignored.
+    roots : list[Hashable]
+        Nodes of G to count around.
+    size : int
+        Number of nodes of the subgraphs, 1 to ATLAS_MAX_NODES.
+    n_workers : int, optional
+        Number of worker processes. None uses every core; 1 counts in this
+        process without a pool.
+    chunk_size : int, optional
+        Number of roots per task. Default is 64.
+
+    Returns
+    -------
+    NDArray[np.int64]
+        Array of shape (len(roots), len(graphlet_catalog(size))); entry
+        [i, c] is how often roots[i] is the root of a subgraph whose rooted
+        canonical form is graphlet_catalog(size)[c].
+
+    Raises
+    ------
+    ValueError
+        If size is out of range.
+
+    Examples
+    --------
+    >>> counts = count_rooted_graphlets(nx.star_graph(3), [0, 1], 3, n_workers=1)
+    >>> # the classes on 3 nodes: root in the middle of a path, at its end, triangle
+    >>> counts.tolist()
+    [[3, 0, 0], [0, 2, 0]]
+    """
+    if not 1 <= size <= ATLAS_MAX_NODES:
+        raise ValueError(f"size must be between 1 and {ATLAS_MAX_NODES}, got {size}")
+    nodes = list(G.nodes())
+    position = {node: i for i, node in enumerate(nodes)}
+    A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=None, format="csr")
+    A.setdiag(0)
+    A.eliminate_zeros()
+    A.sort_indices()
+    indptr, indices = A.indptr.astype(np.int64), A.indices.astype(np.int64)
+
+    root_indices = [position[root] for root in roots]
+    chunks = [root_indices[i:i + chunk_size] for i in range(0, len(root_indices), chunk_size)]
+    num_classes = len(graphlet_catalog(size, rooted=True))
+    if not chunks:
+        return np.zeros((0, num_classes), dtype=np.int64)
+
+    if n_workers == 1:
+        counter = _RootCounter(indptr, indices)
+        return np.vstack([counter.count(chunk, size) for chunk in chunks])
+
+    blocks = []
+    try:
+        shared_indptr, shared_indices = _share_array(indptr), _share_array(indices)
+        blocks = [shared_indptr[0], shared_indices[0]]
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(shared_indptr[1], shared_indices[1])) as pool:
+            return np.vstack(list(pool.map(_worker_count, chunks, [size] * len(chunks))))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+##############
+## Sampling ##
+##############
+
+class GraphletEstimate:
+    """
+    Estimated graphlet statistics from estimate_graphlet_concentrations.
+
+    Attributes
+    ----------
+    codes : NDArray[np.int64]
+        Canonical forms (see canonical_table, unrooted) of the connected
+        graphlets, as in graphlet_catalog(size, rooted=False).
+    counts : NDArray[np.float64]
+        Estimated number of induced copies of each graphlet in the graph.
+    concentrations : NDArray[np.float64]
+        Estimated fraction of the connected induced subgraphs on `size`
+        nodes that are each graphlet.
+    lower, upper : NDArray[np.float64]
+        Bounds of the confidence intervals of the concentrations.
+    num_samples : int
+        Number of samples drawn.
+    """
+
+    def __init__(self,
+                 codes: NDArray[np.int64],
+                 counts: NDArray[np.float64],
+                 concentrations: NDArray[np.float64],
+                 lower: NDArray[np.float64],
+                 upper: NDArray[np.float64],
+                 num_samples: int) -> None:
+        self.codes = codes
+        self.counts = counts
+        self.concentrations = concentrations
+        self.lower = lower
+        self.upper = upper
+        self.num_samples = num_samples
+
+
+@lru_cache(maxsize=None)
+def _expansion_orders(mask: int, num_nodes: int) -> tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.int64]]:
+    """
+    The orders in which the graph with edge bitmask mask can be grown one
+    adjacent node at a time, as arrays of shape (orders, num_nodes) for the
+    nodes and (orders, num_nodes - 1) for, at each step, the number of edges
+    from the nodes so far to the next node and the number of edges among
+    the nodes so far.
+    """
+    adjacent = [[False] * num_nodes for _ in range(num_nodes)]
+    for j, (u, v) in enumerate(combinations(range(num_nodes), 2)):
+        if (mask >> j) & 1:
+            adjacent[u][v] = adjacent[v][u] = True
+    orders, links, inner = [], [], []
+    for order in permutations(range(num_nodes)):
+        step_links, step_inner, edges = [], [], 0
+        for i in range(1, num_nodes):
+            step_inner.append(edges)
+            step_links.append(sum(adjacent[order[i]][u] for u in order[:i]))
+            edges += step_links[-1]
+        if all(step_links):
+            orders.append(order)
+            links.append(step_links)
+            inner.append(step_inner)
+    return (np.array(orders, dtype=np.int64).reshape(-1, num_nodes),
+            np.array(links, dtype=np.int64).reshape(-1, num_nodes - 1),
+            np.array(inner, dtype=np.int64).reshape(-1, num_nodes - 1))
+
+
+def estimate_graphlet_concentrations(G: nx.Graph,
+                                     size: int,
+                                     num_samples: int = 10000,
+                                     confidence: float = 0.95,
+                                     seed: int | None = None) -> GraphletEstimate:
+    """
+    Estimate how often each connected graphlet on `size` nodes occurs as an
+    induced subgraph of G, from a fixed number of random samples.
+
+    Each sample starts at a uniformly random node and grows a connected set
+    by following a uniformly random edge leaving the set, until it has
+    `size` nodes. The probability that a sample ends in a given node set is
+    the sum, over the orders in which the set can be grown, of the product
+    of the step probabilities, which only needs the degrees of its nodes and
+    its induced subgraph. Weighting each sample by one over that probability
+    gives unbiased estimates of the graphlet counts (Horvitz-Thompson); the
+    concentrations are their ratios. Their confidence intervals are Wilson
+    score intervals on an effective number of samples from the delta-method
+    variance, so graphlets that no sample found still get an upper bound
+    above 0. The cost depends on num_samples and the degrees of
+    the sampled nodes, not on the size of G.
+
+    Parameters
+    ----------
+    G : nx.Graph
+        An undirected graph; self-loops are ignored.
+    size : int
+        Number of nodes of the graphlets, 3 to 5.
+    num_samples : int, optional
+        Number of samples. Default is 10000.
+    confidence : float, optional
+        Confidence level of the intervals. Default is 0.95.
+    seed : int, optional
+        Seed of the random number generator.
+
+    Returns
+    -------
+    GraphletEstimate
+        The estimated counts and concentrations of every graphlet in
+        graphlet_catalog(size, rooted=False), with confidence intervals.
+
+    Raises
+    ------
+    ValueError
+        If size is not between 3 and 5, num_samples < 2, or G has no nodes.
+
+    Examples
+    --------
+    >>> estimate = estimate_graphlet_concentrations(nx.complete_graph(6), 3, num_samples=50, seed=0)
+    >>> estimate.concentrations.tolist()  # the 3-path and the triangle
+    [0.0, 1.0]
+    """
+    if not 3 <= size <= 5:
+        raise ValueError(f"size must be between 3 and 5, got {size}")
+    if num_samples < 2:
+        raise ValueError(f"num_samples must be at least 2, got {num_samples}")
+    if G.number_of_nodes() == 0:
+        raise ValueError("G has no nodes")
+
+    A = nx.to_scipy_sparse_array(G, weight=None, format="csr")
+    A.setdiag(0)
+    A.eliminate_zeros()
+    neighbors = [A.indices[A.indptr[i]:A.indptr[i + 1]].tolist() for i in range(A.shape[0])]
+    neighbor_sets = [set(row) for row in neighbors]
+    degrees = np.diff(A.indptr)
+    num_nodes = len(neighbors)
+
+    catalog = graphlet_catalog(size, rooted=False)
+    table = canonical_table(size, rooted=False)
+    pairs = list(combinations(range(size), 2))
+    rng = np.random.default_rng(seed)
+    # weights[i, c] is 1/P(sample i) if sample i is graphlet c, else 0
+    weights = np.zeros((num_samples, len(catalog)))
+
+    for sample in range(num_samples):
+        nodes = [int(rng.integers(num_nodes))]
+        degree_sum, inner_edges = int(degrees[nodes[0]]), 0
+        while len(nodes) < size and degree_sum > 2 * inner_edges:
+            # a uniformly random edge leaving the set: pick an edge end in
+            # the set by degree and retry until the edge leaves the set
+            while True:
+                u = nodes[int(np.searchsorted(np.cumsum(degrees[nodes]), rng.integers(degree_sum), side="right"))]
+                w = neighbors[u][int(rng.integers(len(neighbors[u])))]
+                if w not in nodes:
+                    break
+            inner_edges += sum(w in neighbor_sets[v] for v in nodes)
+            nodes.append(w)
+            degree_sum += int(degrees[w])
+        if len(nodes) < size:
+            continue  # the start's component is too small; the sample finds nothing
+
+        mask = 0
+        for j, (a, b) in enumerate(pairs):
+            if nodes[b] in neighbor_sets[nodes[a]]:
+                mask |= 1 << j
+        orders, links, inner = _expansion_orders(mask, size)
+        degree_sums = np.cumsum(degrees[nodes][orders], axis=1)[:, :-1]
+        probability = np.prod(links / (degree_sums - 2 * inner), axis=1).sum() / num_nodes
+        weights[sample, np.searchsorted(catalog, table[mask])] = 1 / probability
+
+    counts = weights.mean(axis=0)
+    total = counts.sum()
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    if total == 0:
+        concentrations = np.zeros(len(catalog))
+        lower, upper = concentrations.copy(), concentrations.copy()
+    else:
+        concentrations = counts / total
+        # delta method for the ratio of the two sample means
+        residuals = (weights - np.outer(weights.sum(axis=1), concentrations)) / total
+        variance = residuals.var(axis=0, ddof=1) / num_samples
+        # Wilson score intervals with each class's effective number of
+        # samples, p (1 - p) / variance. A class seen in no sample (or in
+        # every one) has no variance estimate; it gets the number of samples
+        # that found a graphlet, so its interval still has a width.
+        found = int(np.count_nonzero(weights.any(axis=1)))
+        binomial = concentrations * (1 - concentrations)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            effective = np.where(variance > 0, binomial / variance, found)
+        effective = np.clip(effective, 1, found)
+        shrink = 1 + z**2 / effective
+        center = (concentrations + z**2 / (2 * effective)) / shrink
+        margin = z / shrink * np.sqrt(binomial / effective + z**2 / (4 * effective**2))
+        # the interval contains the estimate; keep rounding from moving it out
+        lower = np.clip(np.minimum(center - margin, concentrations), 0, 1)
+        upper = np.clip(np.maximum(center + margin, concentrations), 0, 1)
+    return GraphletEstimate(catalog, counts, concentrations, lower, upper, num_samples)
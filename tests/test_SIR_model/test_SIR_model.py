@@ -0,0 +1,84 @@
+"""Tests for the integration methods of SIR_simulation."""
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp  # type: ignore
+from src.SIR_model import INTEGRATION_METHODS, SIR_simulation
+
+
+def make_simulation(method: str, dt: float = 0.1, duration: int = 160, **kwargs) -> SIR_simulation:
+    return SIR_simulation(1, 0.3, 0.1, dt, duration, 999, 1, 0, method=method, **kwargs)
+
+
+def reference_solution(duration: int = 160) -> np.ndarray:
+    """Final (S, I, R) from scipy's high order solver at tight tolerances."""
+    def rates(t, y):
+        infections = 0.3 * y[1] * y[0] / 1000
+        return [-infections, infections - 0.1 * y[1], 0.1 * y[1]]
+    return solve_ivp(rates, (0, duration), [999, 1, 0], method="DOP853", rtol=1e-12, atol=1e-12).y[:, -1]
+
+
+def final_state(simulation: SIR_simulation) -> np.ndarray:
+    return np.array([simulation.S[-1], simulation.I[-1], simulation.R[-1]])
+
+
+class TestSIRIntegration:
+    """Test suite for SIR_simulation.run_simulation."""
+
+    @pytest.mark.parametrize("method", INTEGRATION_METHODS)
+    def test_population_is_conserved(self, method: str) -> None:
+        """Test that S + I + R stays equal to N at every time."""
+        simulation = make_simulation(method)
+        simulation.run_simulation()
+
+        assert np.allclose(simulation.S + simulation.I + simulation.R, simulation.N)
+        assert simulation.t[0] == 0 and simulation.t[-1] == pytest.approx(160)
+        assert len(simulation.t) == len(simulation.S) == len(simulation.I) == len(simulation.R)
+
+    def test_fixed_step_grid(self) -> None:
+        """Test that fixed step methods take ceil(duration / dt) steps of size dt."""
+        simulation = make_simulation("euler", dt=0.1, duration=140)
+        simulation.run_simulation()
+
+        assert len(simulation.t) == 1401
+        assert np.allclose(np.diff(simulation.t), 0.1)
+
+    def test_euler_matches_step_by_step(self) -> None:
+        """Test that the default method repeats euler_integration from the initial values."""
+        simulation = make_simulation("euler", dt=0.5, duration=10)
+        simulation.run_simulation()
+
+        s, i, r = 999.0, 1.0, 0.0
+        for k in range(1, 21):
+            s, i, r = simulation.euler_integration(s, i, r)
+            assert (simulation.S[k], simulation.I[k], simulation.R[k]) == (s, i, r)
+
+    def test_order_of_accuracy(self) -> None:
+        """Test that halving dt divides the error by about 2, 4 and 16."""
+        reference = reference_solution()
+        for method, order in [("euler", 1), ("midpoint", 2), ("rk4", 4)]:
+            errors = []
+            for dt in (0.2, 0.1):
+                simulation = make_simulation(method, dt=dt)
+                simulation.run_simulation()
+                errors.append(np.abs(final_state(simulation) - reference).max())
+
+            assert errors[0] / errors[1] == pytest.approx(2**order, rel=0.2)
+
+    def test_adaptive_uses_few_steps(self) -> None:
+        """Test that rk45 meets its tolerance with far fewer steps than rk4 with the same dt."""
+        reference = reference_solution()
+        adaptive = make_simulation("rk45", rtol=1e-8, atol=1e-8)
+        adaptive.run_simulation()
+
+        assert np.abs(final_state(adaptive) - reference).max() < 1e-4
+        assert len(adaptive.t) < 400
+        assert (np.diff(adaptive.t) > 0).all()
+        assert adaptive.t[-1] == 160
+
+    def test_invalid_arguments(self) -> None:
+        """Test that unknown methods and non-positive steps are rejected."""
+        with pytest.raises(ValueError):
+            make_simulation("leapfrog")
+        with pytest.raises(ValueError):
+            make_simulation("rk4", dt=0)
@@ -1,9 +1,15 @@
 import pytest
 import networkx as nx
 import numpy as np
+import centrality_utilities
+import graph_matrices
 from centrality_utilities import (
+    EigenvectorCentralityTracker,
+    get_katz_centrality,
+    get_pagerank,
     get_principal_eigenvector_undirected,
-    get_principal_eigenvector_directed
+    get_principal_eigenvector_directed,
+    get_principal_eigenvectors
 )
 
 
@@ -247,3 +253,267 @@ class TestEigenvalueComparison:
         max_magnitude = np.max(np.abs(all_eigenvalues))
         
         assert np.isclose(np.abs(eigenvalue), max_magnitude, atol=1e-10)
+
+
+class TestSparseEigenpair:
+    """Test that graphs above DENSE_MAX_NODES use the sparse path with the same results."""
+
+    def test_undirected_matches_dense(self) -> None:
+        """Test that the sparse eigenpair equals the dense one up to sign."""
+        G = nx.connected_watts_strogatz_graph(centrality_utilities.DENSE_MAX_NODES + 50, 6, 0.2, seed=1)
+        A = nx.adjacency_matrix(G, nodelist=sorted(G.nodes())).toarray()
+        eigenvalues, eigenvectors = np.linalg.eigh(A)
+
+        eigenvalue, eigenvector = get_principal_eigenvector_undirected(G)
+
+        assert np.isclose(eigenvalue, eigenvalues[-1], atol=1e-10)
+        assert np.allclose(eigenvector, np.abs(eigenvectors[:, -1]), atol=1e-8)
+
+    def test_directed_matches_dense(self) -> None:
+        """Test that the sparse eigenpair of a strongly connected digraph is the Perron pair."""
+        G = nx.gnp_random_graph(400, 0.03, seed=2, directed=True)
+        G = G.subgraph(max(nx.strongly_connected_components(G), key=len)).copy()
+        A = nx.adjacency_matrix(G, nodelist=sorted(G.nodes())).toarray()
+        spectral_radius = np.max(np.abs(np.linalg.eigvals(A)))
+
+        eigenvalue, eigenvector = get_principal_eigenvector_directed(G)
+
+        assert len(G) > centrality_utilities.DENSE_MAX_NODES
+        assert np.isclose(eigenvalue, spectral_radius, atol=1e-8)
+        assert (eigenvector > 0).all()
+        assert np.allclose(A.T @ eigenvector, eigenvalue * eigenvector, atol=1e-8)
+
+    def test_threshold_switches_solver(self, monkeypatch) -> None:
+        """Test that lowering DENSE_MAX_NODES sends small graphs through the sparse solver."""
+        G = nx.karate_club_graph()
+        dense_value, dense_vector = get_principal_eigenvector_undirected(G)
+        monkeypatch.setattr(centrality_utilities, "DENSE_MAX_NODES", 3)
+
+        sparse_value, sparse_vector = get_principal_eigenvector_undirected(G)
+
+        assert np.isclose(sparse_value, dense_value, atol=1e-10)
+        assert np.allclose(sparse_vector, dense_vector, atol=1e-8)
+
+    def test_threshold_does_not_change_directed_result(self, monkeypatch) -> None:
+        """Test that both solvers give the same real pair with a positive vector for a digraph."""
+        G = nx.gnp_random_graph(80, 0.08, seed=2, directed=True)
+        G = G.subgraph(max(nx.strongly_connected_components(G), key=len)).copy()
+        dense_value, dense_vector = get_principal_eigenvector_directed(G)
+        monkeypatch.setattr(centrality_utilities, "DENSE_MAX_NODES", 3)
+
+        sparse_value, sparse_vector = get_principal_eigenvector_directed(G)
+
+        assert np.isrealobj(dense_value) and np.isrealobj(dense_vector)
+        assert np.isclose(sparse_value, dense_value, atol=1e-10)
+        assert np.allclose(sparse_vector, dense_vector, atol=1e-8)
+        assert (dense_vector > 0).all()
+
+    @pytest.mark.parametrize("offset", [-96, 0, 1, 50])
+    def test_directed_cycle_on_both_sides_of_threshold(self, offset: int) -> None:
+        """Test that a directed cycle gets eigenvalue 1 and the uniform vector whichever solver runs."""
+        n = centrality_utilities.DENSE_MAX_NODES + offset
+        G = nx.cycle_graph(n, create_using=nx.DiGraph)
+
+        eigenvalue, eigenvector = get_principal_eigenvector_directed(G)
+
+        assert np.isrealobj(eigenvalue) and np.isrealobj(eigenvector)
+        assert np.isclose(eigenvalue, 1.0, atol=1e-10)
+        assert np.allclose(eigenvector, 1 / np.sqrt(n), atol=1e-8)
+
+
+class TestKatzCentrality:
+    """Test suite for get_katz_centrality."""
+
+    @pytest.mark.parametrize("directed", [False, True])
+    def test_matches_networkx(self, directed: bool) -> None:
+        """Test that the sparse solve agrees with nx.katz_centrality_numpy in sorted node order."""
+        G = nx.gnp_random_graph(60, 0.08, seed=3, directed=directed)
+        expected = nx.katz_centrality_numpy(G, alpha=0.08, beta=1.0)
+
+        katz = get_katz_centrality(G, alpha=0.08)
+
+        assert np.allclose(katz, [expected[node] for node in sorted(G.nodes)], atol=1e-9)
+
+    def test_rejects_alpha_beyond_spectral_radius(self) -> None:
+        """Test that alpha >= 1 / spectral radius raises ValueError."""
+        G = nx.complete_graph(5)  # spectral radius 4
+
+        with pytest.raises(ValueError, match="alpha must be below"):
+            get_katz_centrality(G, alpha=0.25)
+
+    def test_warm_start_gives_same_solution(self) -> None:
+        """Test that starting from a previous solution converges to the same result."""
+        G = nx.karate_club_graph()
+        previous = get_katz_centrality(G, alpha=0.1)
+
+        cold = get_katz_centrality(G, alpha=0.12)
+        warm = get_katz_centrality(G, alpha=0.12, x0=previous)
+
+        assert np.allclose(warm, cold, atol=1e-9)
+
+
+class TestPageRank:
+    """Test suite for get_pagerank."""
+
+    @pytest.mark.parametrize("directed", [False, True])
+    def test_matches_networkx(self, directed: bool) -> None:
+        """Test that the power iteration agrees with nx.pagerank in sorted node order."""
+        G = nx.gnp_random_graph(80, 0.05, seed=4, directed=directed)
+        expected = nx.pagerank(G, alpha=0.85)
+
+        pagerank = get_pagerank(G)
+
+        assert np.allclose(pagerank, [expected[node] for node in sorted(G.nodes)], atol=1e-12)
+
+    def test_dead_end_and_spider_trap(self) -> None:
+        """Test that dead ends and spider traps still give a distribution over all nodes."""
+        G = nx.DiGraph([(1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 5), (2, 7)])  # 7 is a dead end
+
+        pagerank = get_pagerank(G)
+
+        assert np.isclose(pagerank.sum(), 1.0)
+        assert (pagerank > 0).all()
+        # the trap {5, 6} collects most, but not all, of the rank
+        assert pagerank[4] + pagerank[5] > 0.5
+
+    def test_cache_follows_graph_changes(self) -> None:
+        """Test that adding an edge is seen, and a warm start reaches the new solution."""
+        G = nx.DiGraph([(1, 2), (2, 3), (3, 1)])
+        before = get_pagerank(G)
+        G.add_edge(1, 3)
+
+        after = get_pagerank(G, x0=before)
+
+        expected = nx.pagerank(G)
+        assert np.allclose(after, [expected[node] for node in sorted(G.nodes)], atol=1e-8)
+
+    def test_cache_follows_rewiring(self) -> None:
+        """Test that swapping one edge for another, keeping the counts, is seen."""
+        G = nx.DiGraph([(1, 2), (2, 3), (3, 1), (1, 3)])
+        get_pagerank(G)
+        G.remove_edge(1, 3)
+        G.add_edge(2, 1)
+
+        after = get_pagerank(G)
+
+        expected = nx.pagerank(G)
+        assert np.allclose(after, [expected[node] for node in sorted(G.nodes)], atol=1e-8)
+
+
+class TestBatchedEigenvectors:
+    """Test suite for get_principal_eigenvectors."""
+
+    def test_matches_single_graph_functions_in_input_order(self) -> None:
+        """Test that each batched eigenpair equals the single-graph one up to sign."""
+        graphs = [nx.connected_watts_strogatz_graph(10 + i % 3, 4, 0.3, seed=i) for i in range(12)]
+        graphs.insert(5, nx.DiGraph([(1, 2), (2, 3), (3, 1), (1, 3)]))
+
+        pairs = get_principal_eigenvectors(graphs)
+
+        for G, (eigenvalue, eigenvector) in zip(graphs, pairs):
+            single = get_principal_eigenvector_directed if G.is_directed() else get_principal_eigenvector_undirected
+            expected_value, expected_vector = single(G)
+            assert np.isclose(eigenvalue, expected_value, atol=1e-10)
+            assert np.allclose(np.abs(eigenvector), np.abs(expected_vector), atol=1e-10)
+
+    def test_ties_pick_the_perron_root(self) -> None:
+        """Test that bipartite graphs and directed cycles get the positive eigenvalue."""
+        cycle = nx.DiGraph([(1, 2), (2, 3), (3, 4), (4, 1)])
+
+        pairs = get_principal_eigenvectors([nx.complete_bipartite_graph(3, 3), cycle])
+
+        assert np.isclose(pairs[0][0], 3.0)
+        assert np.isclose(pairs[1][0], 1.0)
+        assert all((vector > 0).all() for _, vector in pairs)
+
+    def test_large_graphs_use_sparse_solver(self) -> None:
+        """Test that graphs above DENSE_MAX_NODES are solved alongside small ones."""
+        large = nx.connected_watts_strogatz_graph(centrality_utilities.DENSE_MAX_NODES + 20, 4, 0.2, seed=0)
+
+        pairs = get_principal_eigenvectors([large, nx.complete_graph(3)])
+
+        assert np.isclose(pairs[0][0], get_principal_eigenvector_undirected(large)[0])
+        assert np.isclose(pairs[1][0], 2.0)
+
+    def test_raises_for_disconnected_graph(self) -> None:
+        """Test that connectivity is checked unless disabled."""
+        disconnected = nx.Graph([(1, 2), (3, 4)])
+
+        with pytest.raises(ValueError, match="must be connected"):
+            get_principal_eigenvectors([nx.path_graph(3), disconnected])
+        assert len(get_principal_eigenvectors([disconnected], check_connected=False)) == 1
+
+
+class TestEigenvectorCentralityTracker:
+    """Test suite for EigenvectorCentralityTracker."""
+
+    @pytest.mark.parametrize("directed", [False, True])
+    def test_updates_match_recomputation(self, directed: bool) -> None:
+        """Test that the tracked eigenpair equals a fresh computation after each batch."""
+        G = nx.DiGraph(nx.cycle_graph(30)) if directed else nx.cycle_graph(30)
+        G.add_edges_from([(0, 10), (10, 20), (20, 0), (5, 15)])
+        tracker = EigenvectorCentralityTracker(G, weight=None)
+        batches = [([(1, 7), (7, 1)], []), ([(3, 17)], [(0, 10)]), ([], [(5, 15)])]
+
+        for added, removed in batches:
+            tracker.update(added=added, removed=removed)
+            G.add_edges_from(added)
+            G.remove_edges_from(removed)
+            single = get_principal_eigenvector_directed if directed else get_principal_eigenvector_undirected
+            eigenvalue, eigenvector = single(G)
+
+            assert np.isclose(tracker.eigenvalue, np.real(eigenvalue), atol=1e-8)
+            assert np.allclose(tracker.eigenvector, np.abs(eigenvector), atol=1e-7)
+            assert tracker.residual <= tracker.tol * max(tracker.eigenvalue, 1.0)
+
+    def test_warm_start_needs_fewer_iterations(self) -> None:
+        """Test that a small batch takes fewer iterations than starting from a uniform vector."""
+        G = nx.barabasi_albert_graph(300, 3, seed=2)
+        tracker = EigenvectorCentralityTracker(G)
+        cold = EigenvectorCentralityTracker(G)
+        cold.eigenvector = np.full(len(cold.nodes), 1 / np.sqrt(len(cold.nodes)))
+
+        tracker.update(added=[(10, 250)])
+        cold.update(added=[(10, 250)])
+
+        assert 0 < tracker.iterations < cold.iterations
+        assert np.allclose(tracker.eigenvector, cold.eigenvector, atol=1e-8)
+
+    def test_weights_and_errors(self) -> None:
+        """Test weighted insertions and the errors for unknown nodes or edges."""
+        tracker = EigenvectorCentralityTracker(nx.path_graph(3))
+
+        tracker.update(added=[(0, 1, 3.0)])
+        assert tracker.A[0, 1] == tracker.A[1, 0] == 3.0
+        with pytest.raises(ValueError, match="not in the graph"):
+            tracker.update(removed=[(0, 2)])
+        with pytest.raises(KeyError):
+            tracker.update(added=[(0, 99)])
+
+
+class TestSharedGraphMatrices:
+    """Test that centrality functions share one cached matrix per graph."""
+
+    def test_functions_reuse_and_refresh_the_cache(self) -> None:
+        """Test that the adjacency matrix is built once and rebuilt after an edge change."""
+        G = nx.karate_club_graph()
+        get_principal_eigenvector_undirected(G)
+        matrices = graph_matrices.graph_matrices(G)
+        A = matrices.adjacency()
+
+        get_pagerank(G)
+        assert graph_matrices.graph_matrices(G).adjacency() is A
+
+        G.remove_edge(0, 1)
+        eigenvalue, _ = get_principal_eigenvector_undirected(G)
+        expected = np.max(np.linalg.eigvalsh(nx.to_numpy_array(G, nodelist=sorted(G.nodes))))
+        assert np.isclose(eigenvalue, expected)
+
+    def test_mixed_node_types(self) -> None:
+        """Test that graphs whose nodes cannot be sorted are supported."""
+        G = nx.Graph([(1, "a"), ("a", 2), (2, 1), (2, "b")])
+
+        eigenvalue, eigenvector = get_principal_eigenvector_undirected(G)
+
+        assert eigenvalue > 0 and eigenvector.shape == (4,)
+        assert get_pagerank(G).sum() == pytest.approx(1.0)
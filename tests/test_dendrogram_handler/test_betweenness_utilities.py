@@ -0,0 +1,53 @@
+"""Tests for the shared edge betweenness helpers in betweenness_utilities."""
+
+import random
+
+import networkx as nx
+from src.betweenness_utilities import ParallelEdgeBetweenness, accumulate_edge_betweenness
+
+
+class TestParallelEdgeBetweenness:
+    """Test suite for ParallelEdgeBetweenness."""
+
+    def test_matches_networkx(self) -> None:
+        """Test that the scores equal nx.edge_betweenness_centrality bit for bit."""
+        G = nx.les_miserables_graph()
+        expected = nx.edge_betweenness_centrality(G)
+
+        with ParallelEdgeBetweenness(G, n_workers=2) as parallel:
+            actual = parallel.scores(G)
+
+        assert list(actual) == list(expected)
+        assert actual == expected
+
+    def test_identical_for_any_worker_count(self) -> None:
+        """Test that scores are bitwise identical for 1, 2 and 3 workers after edge removals."""
+        G = nx.karate_club_graph()
+        removals = [(0, 31), (2, 32), (0, 2), (32, 33)]
+
+        results = []
+        for n_workers in (1, 2, 3):
+            graph = G.copy()
+            with ParallelEdgeBetweenness(graph, n_workers=n_workers) as parallel:
+                parallel.scores(graph)
+                for edge in removals[:2]:
+                    graph.remove_edge(*edge)
+                    parallel.edge_removed(*edge)
+                parallel.scores(graph)
+                for edge in removals[2:]:
+                    graph.remove_edge(*edge)
+                    parallel.edge_removed(*edge)
+                results.append(parallel.scores(graph))
+
+        assert results[0] == results[1] == results[2] == nx.edge_betweenness_centrality(graph)
+
+    def test_sampled_sources_summed_in_given_order(self) -> None:
+        """Test that raw scores over unsorted sampled sources equal the serial sum in that order."""
+        G = nx.connected_caveman_graph(6, 5)
+        sources = random.Random(3).sample(list(G.nodes()), 7)
+        expected = accumulate_edge_betweenness(G, sources, dict.fromkeys(G.edges(), 0.0))
+
+        with ParallelEdgeBetweenness(G, n_workers=3) as parallel:
+            actual = parallel.raw_scores(G, sources)
+
+        assert actual == {edge: score for edge, score in expected.items() if score}
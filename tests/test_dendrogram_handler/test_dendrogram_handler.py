@@ -0,0 +1,84 @@
+"""Tests for the original DendrogramHandler in dendrogram_handler."""
+
+import networkx as nx
+import numpy as np
+import pytest
+from scipy.cluster.hierarchy import is_valid_linkage  # type: ignore
+from src.dendrogram_handler import DendrogramHandler
+
+
+class TestPartitionsToLinkage:
+    """Test suite for building the linkage matrix from partitions."""
+
+    def test_path_graph(self) -> None:
+        """Test the linkage matrix of the path graph example in get_all_partitions."""
+        G = nx.path_graph(5)
+        partitions = [({0, 1, 2, 3, 4},), ({0, 1}, {2, 3, 4}), ({0, 1}, {2}, {3, 4}),
+                      ({0}, {1}, {2}, {3, 4}), ({0}, {1}, {2}, {3}, {4})]
+        handler = DendrogramHandler(G)
+
+        Z, labels = handler.partitions_to_linkage(partitions)
+
+        expected = np.array([[3, 4, 1, 2], [0, 1, 2, 2], [2, 5, 3, 3], [6, 7, 4, 5]], dtype=np.float64)
+        assert np.array_equal(Z, expected)
+        assert labels == ["0", "1", "2", "3", "4"]
+
+    def test_disconnected_graph(self) -> None:
+        """Test that a first level with several components gives a valid linkage matrix."""
+        G = nx.disjoint_union_all([nx.cycle_graph(4), nx.path_graph(3), nx.complete_graph(3)])
+
+        handler = DendrogramHandler(G)
+
+        assert handler.link_matrix.shape == (G.number_of_nodes() - 1, 4)
+        assert is_valid_linkage(handler.link_matrix)
+        assert handler.link_matrix[-1, 3] == G.number_of_nodes()
+
+    def test_string_labels(self) -> None:
+        """Test that nodes that are not 0..n-1 get a valid linkage matrix and their labels."""
+        G = nx.relabel_nodes(nx.karate_club_graph(), lambda v: f"n{v}")
+
+        handler = DendrogramHandler(G)
+
+        assert is_valid_linkage(handler.link_matrix)
+        assert handler.link_matrix_labels == [f"n{v}" for v in range(34)]
+
+
+class TestIterPartitions:
+    """Test suite for the streaming iter_partitions API."""
+
+    def test_same_partitions_as_get_all_partitions(self) -> None:
+        """Test that the stream holds the same partitions, heights and modularities."""
+        G = nx.karate_club_graph()
+        handler = DendrogramHandler(G)
+
+        levels = list(handler.iter_partitions(G))
+
+        assert [partition for partition, _, _ in levels] == handler.get_all_partitions(G)
+        assert [height for _, height, _ in levels] == [float(i) for i in range(len(levels))]
+        for partition, _, modularity in levels[1:]:
+            assert modularity == pytest.approx(nx.community.modularity(G, partition, weight=None), abs=1e-12)
+
+    def test_patience_stops_early(self) -> None:
+        """Test that iteration stops after patience levels without improvement and keeps the best."""
+        G = nx.connected_caveman_graph(4, 5)
+        handler = DendrogramHandler(G)
+
+        levels = list(handler.iter_partitions(G, patience=3))
+
+        assert len(levels) < G.number_of_nodes()
+        best = max(levels, key=lambda level: level[2])
+        assert handler.best_partition == best[0]
+        assert len(handler.best_partition) == 4
+
+
+class TestDendrogramHandlerWorkers:
+    """Test suite for the n_workers option of the original DendrogramHandler."""
+
+    def test_same_partitions_as_girvan_newman(self) -> None:
+        """Test that the parallel partitions equal networkx's girvan_newman ones."""
+        G = nx.connected_caveman_graph(4, 5)
+
+        expected = DendrogramHandler(G).get_all_partitions(G)
+        actual = DendrogramHandler(G, n_workers=2).get_all_partitions(G)
+
+        assert actual == expected
@@ -0,0 +1,206 @@
+"""Tests for the Girvan-Newman options of DendrogramHandler in dendrogram_handler_v2."""
+
+import networkx as nx
+import numpy as np
+import pytest
+from scipy.cluster.hierarchy import is_valid_linkage  # type: ignore
+import src.dendrogram_handler_v2 as dendrogram_handler_v2
+from src.dendrogram_handler_v2 import DendrogramHandler
+
+
+GRAPHS = {
+    "karate": nx.karate_club_graph(),
+    "grid": nx.grid_2d_graph(5, 5),
+    "caveman": nx.connected_caveman_graph(4, 5),
+    "disconnected": nx.disjoint_union(nx.cycle_graph(6), nx.complete_graph(4)),
+}
+
+
+class TestIncrementalBetweenness:
+    """Test suite for the incremental edge betweenness mode."""
+
+    @pytest.mark.parametrize("name", GRAPHS)
+    @pytest.mark.parametrize("normalized", [True, False])
+    def test_same_partitions_as_full_recomputation(self, name: str, normalized: bool) -> None:
+        """Test that incremental mode yields the identical (partition, height) sequence."""
+        G = GRAPHS[name]
+
+        expected = DendrogramHandler(G).get_all_partitions_with_heights(G, normalized=normalized)
+        actual = DendrogramHandler(G, incremental=True).get_all_partitions_with_heights(G, normalized=normalized)
+
+        assert actual == expected
+
+    @pytest.mark.parametrize("name", GRAPHS)
+    def test_same_linkage_matrix(self, name: str) -> None:
+        """Test that incremental mode builds the identical linkage matrix and labels."""
+        G = GRAPHS[name]
+
+        expected = DendrogramHandler(G)
+        actual = DendrogramHandler(G, incremental=True)
+
+        assert np.array_equal(actual.link_matrix, expected.link_matrix)
+        assert actual.link_matrix_labels == expected.link_matrix_labels
+
+
+class TestParallelBetweenness:
+    """Test suite for computing edge betweenness over a process pool."""
+
+    @pytest.mark.parametrize("name", GRAPHS)
+    def test_same_partitions_for_any_worker_count(self, name: str) -> None:
+        """Test that the partition sequence does not depend on n_workers or incremental."""
+        G = GRAPHS[name]
+
+        expected = DendrogramHandler(G).get_all_partitions_with_heights(G)
+
+        assert DendrogramHandler(G, n_workers=1).get_all_partitions_with_heights(G) == expected
+
+        assert DendrogramHandler(G, n_workers=2).get_all_partitions_with_heights(G) == expected
+        assert DendrogramHandler(G, incremental=True, n_workers=2).get_all_partitions_with_heights(G) == expected
+
+    @pytest.mark.parametrize("name", GRAPHS)
+    def test_same_linkage_matrix_as_serial(self, name: str) -> None:
+        """Test that the parallel linkage matrix matches networkx's serial computation."""
+        G = GRAPHS[name]
+
+        expected = DendrogramHandler(G)
+        actual = DendrogramHandler(G, n_workers=2)
+
+        assert np.array_equal(actual.link_matrix, expected.link_matrix)
+        assert actual.link_matrix_labels == expected.link_matrix_labels
+
+
+class TestLinkageConstruction:
+    """Test suite for building the linkage matrix from partitions and from split events."""
+
+    @pytest.mark.parametrize("name", GRAPHS)
+    @pytest.mark.parametrize("height_metric", ["distance", "max_cluster"])
+    def test_split_events_match_partitions(self, name: str, height_metric: str) -> None:
+        """Test that the handler's split-event linkage equals partitions_to_linkage."""
+        G = GRAPHS[name]
+
+        handler = DendrogramHandler(G, height_metric=height_metric)
+        Z, labels = handler.partitions_to_linkage(handler.get_all_partitions_with_heights(G))
+
+        assert np.array_equal(handler.link_matrix, Z)
+        assert handler.link_matrix_labels == labels
+
+    def test_edgeless_graph(self) -> None:
+        """Test that a graph without edges merges all leaves at height 0."""
+        handler = DendrogramHandler(nx.empty_graph(3))
+
+        expected = np.array([[0, 1, 0, 2], [3, 2, 0, 3]], dtype=np.float64)
+        assert np.array_equal(handler.link_matrix, expected)
+        assert handler.link_matrix_labels == ["0", "1", "2"]
+
+
+class TestModularity:
+    """Test suite for the modularity reported for every level."""
+
+    @pytest.mark.parametrize("name", GRAPHS)
+    def test_matches_networkx(self, name: str) -> None:
+        """Test that each level's modularity equals nx.community.modularity of its partition."""
+        G = GRAPHS[name]
+        handler = DendrogramHandler(G)
+
+        partitions = handler.get_all_partitions_with_heights(G)
+
+        assert len(handler.modularity) == len(partitions)
+        for (partition, _), modularity in zip(partitions[1:], handler.modularity[1:]):
+            assert modularity == pytest.approx(nx.community.modularity(G, partition, weight=None))
+
+
+class TestSampledBetweenness:
+    """Test suite for the approximate mode with sampled betweenness sources."""
+
+    def test_reproducible_with_seed(self) -> None:
+        """Test that the same seed gives the same dendrogram."""
+        G = nx.les_miserables_graph()
+
+        first = DendrogramHandler(G, k=10, recompute_every=5, seed=7)
+        second = DendrogramHandler(G, k=10, recompute_every=5, seed=7)
+
+        assert np.array_equal(first.link_matrix, second.link_matrix)
+        assert first.modularity == second.modularity
+
+    @pytest.mark.parametrize("name", GRAPHS)
+    def test_valid_dendrogram(self, name: str) -> None:
+        """Test that the approximate mode gives a valid linkage matrix and finds the communities."""
+        G = GRAPHS[name]
+
+        handler = DendrogramHandler(G, k=8, recompute_every=3, seed=0)
+
+        assert is_valid_linkage(handler.link_matrix)
+        assert handler.link_matrix.shape == (G.number_of_nodes() - 1, 4)
+        assert max(handler.modularity) > 0.3
+
+    def test_default_recomputes_far_less_often(self, monkeypatch) -> None:
+        """Test that by default the estimate is recomputed about 100 times, not once per edge."""
+        G = nx.connected_caveman_graph(20, 8)
+        calls = []
+        accumulate = dendrogram_handler_v2.accumulate_edge_betweenness
+
+        def counting_accumulate(graph, sources, betweenness):
+            calls.append(len(sources))
+            return accumulate(graph, sources, betweenness)
+
+        monkeypatch.setattr(dendrogram_handler_v2, "accumulate_edge_betweenness", counting_accumulate)
+        DendrogramHandler(G, k=8, recompute_every=1, seed=0)
+        every_edge = len(calls)
+        calls.clear()
+        handler = DendrogramHandler(G, k=8, seed=0)
+
+        assert every_edge == G.number_of_edges() == 560
+        assert len(calls) == 560 // 5
+        assert is_valid_linkage(handler.link_matrix)
+        assert max(handler.modularity) > 0.5
+
+    def test_incremental_is_rejected(self) -> None:
+        """Test that sampling cannot be combined with incremental updates."""
+        with pytest.raises(ValueError):
+            DendrogramHandler(nx.karate_club_graph(), incremental=True, k=5)
+
+
+class TestIterPartitions:
+    """Test suite for the streaming iter_partitions API."""
+
+    @pytest.mark.parametrize("name", GRAPHS)
+    def test_yields_each_distinct_level(self, name: str) -> None:
+        """Test that the stream holds every level whose partition changes, with its modularity."""
+        G = GRAPHS[name]
+        handler = DendrogramHandler(G)
+        levels = handler.get_all_partitions_with_heights(G)
+        modularities = list(handler.modularity)
+        expected = [(levels[0][0], 0.0)] + [
+            (partition, modularity)
+            for (previous, _), (partition, _), modularity in zip(levels, levels[1:], modularities[1:])
+            if partition != previous
+        ]
+
+        streamed = [(partition, modularity) for partition, _, modularity in handler.iter_partitions(G)]
+
+        assert streamed == expected
+
+    def test_tracks_best_partition(self) -> None:
+        """Test that best_partition is the highest-modularity level."""
+        G = GRAPHS["caveman"]
+        handler = DendrogramHandler(G)
+
+        levels = list(handler.iter_partitions(G))
+
+        best = max(levels, key=lambda level: level[2])
+        assert handler.best_partition == best[0]
+        assert handler.best_modularity == best[2]
+
+    def test_patience_stops_early(self) -> None:
+        """Test that iteration stops after patience levels without improvement."""
+        G = GRAPHS["caveman"]
+        handler = DendrogramHandler(G)
+        full = list(handler.iter_partitions(G))
+
+        levels = list(handler.iter_partitions(G, patience=2))
+
+        assert len(levels) < len(full)
+        assert levels == full[:len(levels)]
+        best_index = max(range(len(levels)), key=lambda i: levels[i][2])
+        assert len(levels) == best_index + 3
+        assert handler.best_modularity == pytest.approx(max(level[2] for level in full))
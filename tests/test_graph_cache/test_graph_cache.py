@@ -0,0 +1,131 @@
+"""Tests for the binary graph cache in graph_cache."""
+
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+from src.graph_cache import load_graph, load_graph_arrays
+
+GEXF_DIR = Path(__file__).parent.parent.parent / "homework_8_gephi" / "gexf_files"
+
+
+class TestLoadGraph:
+    """Test suite for load_graph and load_graph_arrays."""
+
+    def test_matches_networkx_gexf_reader(self, tmp_path: Path) -> None:
+        """Test that a cached GEXF graph has the same nodes, edges and attributes as nx.read_gexf."""
+        source = GEXF_DIR / "NG-synthetic-partition-graph.gexf"
+        expected = nx.read_gexf(source)
+
+        G = load_graph(source, cache_dir=tmp_path)
+
+        assert set(G.nodes()) == set(expected.nodes())
+        assert {frozenset(e) for e in G.edges()} == {frozenset(e) for e in expected.edges()}
+        assert all(G.nodes[node] == expected.nodes[node] for node in expected.nodes())
+
+    def test_second_load_reads_cache_entry(self, tmp_path: Path) -> None:
+        """Test that the first load writes one cache entry and the second load reuses it."""
+        source = GEXF_DIR / "karate.gexf"
+
+        first = load_graph_arrays(source, cache_dir=tmp_path)
+        entries = [p for p in tmp_path.iterdir() if p.is_dir()]
+        second = load_graph_arrays(source, cache_dir=tmp_path)
+
+        assert len(entries) == 1
+        assert [p for p in tmp_path.iterdir() if p.is_dir()] == entries
+        assert (first.adjacency != second.adjacency).nnz == 0
+        assert np.array_equal(first.node_ids, second.node_ids)
+
+    def test_changed_source_gets_new_entry(self, tmp_path: Path) -> None:
+        """Test that editing the source file produces a new cache entry."""
+        source = tmp_path / "graph.mtx"
+        source.write_text("%%MatrixMarket matrix coordinate pattern symmetric\n3 3 1\n2 1\n")
+        cache_dir = tmp_path / "cache"
+
+        G1 = load_graph(source, cache_dir=cache_dir)
+        source.write_text("%%MatrixMarket matrix coordinate pattern symmetric\n3 3 2\n2 1\n3 2\n")
+        G2 = load_graph(source, cache_dir=cache_dir)
+
+        assert G1.number_of_edges() == 1
+        assert G2.number_of_edges() == 2
+        assert len([p for p in cache_dir.iterdir() if p.is_dir()]) == 2
+
+    def test_mmap_arrays_are_read_only(self, tmp_path: Path) -> None:
+        """Test that mmap=True returns read-only arrays backed by the cache files."""
+        source = GEXF_DIR / "karate.gexf"
+        load_graph_arrays(source, cache_dir=tmp_path)
+
+        cached = load_graph_arrays(source, cache_dir=tmp_path, mmap=True)
+
+        assert not cached.adjacency.data.flags.writeable
+        assert not cached.adjacency.indices.flags.writeable
+        assert cached.adjacency.shape == (34, 34)
+
+    def test_dynamic_gexf_loads_static_graph(self, tmp_path: Path) -> None:
+        """Test that a dynamic GEXF file rejected by nx.read_gexf loads with its static attributes."""
+        G = load_graph(GEXF_DIR / "Hypertext2009_15min.gexf", cache_dir=tmp_path)
+
+        assert G.number_of_nodes() == 113
+        assert G.number_of_edges() == 2163
+        assert set(G.nodes["1026"]) == {"label", "presence", "tot_degree", "tot_strength"}
+
+    def test_unweighted_mtx_has_no_weights(self, tmp_path: Path) -> None:
+        """Test that a pattern file gives edges without a weight attribute, like the project1 reader."""
+        source = tmp_path / "graph.mtx"
+        source.write_text("%%MatrixMarket matrix coordinate pattern symmetric\n3 3 2\n2 1\n3 2\n")
+
+        G = load_graph(source, cache_dir=tmp_path / "cache")
+
+        assert sorted(G.edges()) == [(1, 2), (2, 3)]
+        assert all(data == {} for _, _, data in G.edges(data=True))
+
+    def test_weighted_mtx_keeps_weights(self, tmp_path: Path) -> None:
+        """Test that a real file keeps its entries as edge weights after a round trip through the cache."""
+        source = tmp_path / "graph.mtx"
+        source.write_text("%%MatrixMarket matrix coordinate real general\n3 3 2\n1 2 0.5\n3 2 2.5\n")
+        cache_dir = tmp_path / "cache"
+        load_graph(source, cache_dir=cache_dir)
+
+        G = load_graph(source, cache_dir=cache_dir)
+
+        assert G.is_directed()
+        assert sorted(G.edges(data="weight")) == [(1, 2, 0.5), (3, 2, 2.5)]
+
+    def test_unweighted_gexf_has_no_weights(self, tmp_path: Path) -> None:
+        """Test that a GEXF file without edge weights loads without a weight attribute."""
+        source = tmp_path / "graph.gexf"
+        source.write_text(
+            '<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2"><graph defaultedgetype="undirected">'
+            '<nodes><node id="a"/><node id="b"/></nodes><edges><edge id="0" source="a" target="b"/></edges>'
+            '</graph></gexf>'
+        )
+
+        G = load_graph(source, cache_dir=tmp_path / "cache")
+
+        assert list(G.edges(data=True)) == [("a", "b", {})]
+
+    @pytest.mark.parametrize(
+        "text, message",
+        [
+            ("3 3 1\n2 1\n", "missing MatrixMarket header"),
+            ("%%MatrixMarket matrix coordinate pattern general\n3 4 1\n2 1\n", "must be square"),
+            ("%%MatrixMarket matrix coordinate pattern general\n3 3 2\n2 1\n", "announces 2 entries, found 1"),
+            ("%%MatrixMarket matrix coordinate pattern general\n% c\n3 3 2\n2 1\n3 x\n", "line 5: 'x'"),
+        ],
+    )
+    def test_malformed_mtx_raises(self, tmp_path: Path, text: str, message: str) -> None:
+        """Test that a malformed Matrix Market file raises ValueError naming the problem."""
+        source = tmp_path / "bad.mtx"
+        source.write_text(text)
+
+        with pytest.raises(ValueError, match=message):
+            load_graph(source, cache_dir=tmp_path / "cache")
+
+    def test_unknown_extension_raises(self, tmp_path: Path) -> None:
+        """Test that an unsupported file type raises ValueError."""
+        source = tmp_path / "graph.txt"
+        source.write_text("1 2\n")
+
+        with pytest.raises(ValueError):
+            load_graph(source, cache_dir=tmp_path)
@@ -0,0 +1,104 @@
+"""Tests for the per-graph matrix cache in graph_matrices."""
+
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+from src.graph_matrices import graph_matrices, invalidate, modularity, node_order
+
+
+class TestGraphMatrices:
+    """Test suite for graph_matrices."""
+
+    def test_reused_until_structure_changes(self) -> None:
+        """Test that the entry is reused and rebuilt after adding, removing or rewiring edges."""
+        G = nx.cycle_graph(6)
+        first = graph_matrices(G)
+        A = first.adjacency()
+
+        assert graph_matrices(G) is first
+        assert first.adjacency() is A
+
+        G.add_edge(0, 3)
+        second = graph_matrices(G)
+        assert second is not first
+        assert second.adjacency()[0, 3] == 1
+
+        # a degree-preserving rewiring keeps the edge and node counts
+        G.remove_edges_from([(0, 1), (3, 4)])
+        G.add_edges_from([(0, 4), (1, 3)])
+        third = graph_matrices(G)
+        assert third is not second
+        assert third.adjacency()[0, 4] == 1 and third.adjacency()[0, 1] == 0
+
+    def test_weight_changes(self) -> None:
+        """Test that re-adding an edge with a new weight is seen, and invalidate picks up in-place edits."""
+        G = nx.Graph([(1, 2, {"weight": 2.0})])
+        assert graph_matrices(G).adjacency()[0, 1] == 2.0
+
+        G.add_edge(1, 2, weight=3.0)
+        assert graph_matrices(G).adjacency()[0, 1] == 3.0
+
+        G[1][2]["weight"] = 5.0
+        invalidate(G)
+        assert graph_matrices(G).adjacency()[0, 1] == 5.0
+
+    def test_views_follow_their_graph(self) -> None:
+        """Test that a subgraph view is rebuilt when the graph under it changes."""
+        G = nx.path_graph(4)
+        view = G.subgraph([0, 1, 2])
+        assert graph_matrices(view).adjacency(weight=None).sum() == 4
+
+        G.add_edge(0, 2)
+
+        assert graph_matrices(view).adjacency(weight=None).sum() == 6
+
+    def test_mixed_node_types_and_transpose(self) -> None:
+        """Test that mixed node types get an order and digraphs a transposed matrix."""
+        G = nx.DiGraph([("a", 1), (1, 2)])
+
+        matrices = graph_matrices(G)
+
+        assert matrices.nodes == node_order(G) == [1, 2, "a"]
+        assert matrices.transpose(weight=None).toarray().tolist() == matrices.adjacency(weight=None).T.toarray().tolist()
+        assert matrices.transpose(weight=None)[0, 2] == 1
+
+    def test_mixed_node_types_sort_numbers_by_value(self) -> None:
+        """Test that numbers in a mixed graph are ordered by value, not as text."""
+        G = nx.Graph([(2, 10), (10, "a"), (1, "b"), ((0, 1), 2.5)])
+
+        assert node_order(G) == [1, 2, 2.5, 10, "a", "b", (0, 1)]
+
+
+class TestModularity:
+    """Test suite for modularity."""
+
+    @pytest.mark.parametrize("directed", [False, True])
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    def test_matches_networkx(self, directed: bool, weight: str | None) -> None:
+        """Test agreement with nx.community.modularity, self-loops and weights included."""
+        rng = random.Random(1)
+        G = nx.gnp_random_graph(40, 0.1, seed=1, directed=directed)
+        G.add_edges_from([(0, 0), (5, 5)])
+        for u, v in G.edges():
+            G[u][v]["weight"] = rng.uniform(0.5, 3.0)
+        nodes = list(G.nodes())
+        rng.shuffle(nodes)
+        partition = [set(nodes[i::4]) for i in range(4)]
+
+        expected = nx.community.modularity(G, partition, weight=weight)
+
+        assert modularity(G, partition, weight=weight) == pytest.approx(expected, abs=1e-12)
+
+    def test_rejects_incomplete_partition(self) -> None:
+        """Test that a partition missing nodes raises NetworkXError."""
+        with pytest.raises(nx.NetworkXError):
+            modularity(nx.path_graph(4), [{0, 1}, {2}])
+
+    def test_edgeless_graph(self) -> None:
+        """Test that a graph without edges has modularity 0."""
+        G = nx.empty_graph(3)
+
+        assert modularity(G, [{0}, {1, 2}]) == 0.0
+        assert np.isfinite(modularity(G, [{0, 1, 2}]))
@@ -0,0 +1,85 @@
+"""Tests for the canonical-form graphlet classification in graphlet_utilities."""
+
+import random
+import pytest
+import networkx as nx
+import src.graphlet_utilities as graphlet_utilities
+from src.graphlet_utilities import (ATLAS_MAX_NODES, _compute_canonical_table, canonical_form,
+                                    canonical_table, find_all_graphlets, graphlet_catalog,
+                                    rooted_canonical_form, rooted_is_isomorphic)
+
+
+def random_relabeling(G: nx.Graph, rng: random.Random) -> nx.Graph:
+    nodes = list(G.nodes())
+    shuffled = nodes[:]
+    rng.shuffle(shuffled)
+    return nx.relabel_nodes(G, dict(zip(nodes, shuffled)))
+
+
+class TestCanonicalForm:
+    """Test suite for rooted_canonical_form and canonical_form."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_rooted_agrees_with_rooted_is_isomorphic(self, seed: int) -> None:
+        """Test that equal rooted canonical forms mean rooted isomorphism."""
+        rng = random.Random(seed)
+        G1 = nx.gnp_random_graph(5, 0.5, seed=seed)
+        G2 = nx.gnp_random_graph(5, 0.5, seed=seed + 100) if seed % 2 else random_relabeling(G1, rng)
+
+        same_form = rooted_canonical_form(G1, 0) == rooted_canonical_form(G2, 0)
+
+        assert same_form == rooted_is_isomorphic(G1, G2, 0)
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_unrooted_agrees_with_is_isomorphic(self, seed: int) -> None:
+        """Test that equal canonical forms mean isomorphism."""
+        rng = random.Random(seed)
+        G1 = nx.gnp_random_graph(6, 0.4, seed=seed)
+        G2 = nx.gnp_random_graph(6, 0.4, seed=seed + 100) if seed % 2 else random_relabeling(G1, rng)
+
+        assert (canonical_form(G1) == canonical_form(G2)) == nx.is_isomorphic(G1, G2)
+
+
+class TestFindAllGraphlets:
+    """Test suite for find_all_graphlets."""
+
+    @pytest.mark.parametrize("size, expected", [(1, 1), (2, 1), (3, 3), (4, 11), (5, 58), (6, 407)])
+    def test_number_of_rooted_graphlets(self, size: int, expected: int) -> None:
+        """Test the number of connected rooted graphs on each number of nodes."""
+        assert len(find_all_graphlets(list(range(size)), 0)) == expected
+
+    def test_representatives_are_connected_and_distinct(self) -> None:
+        """Test that the graphlets are connected and pairwise not rooted isomorphic."""
+        graphlets = find_all_graphlets(["a", "root", "b", "c"], "root")
+
+        assert all(nx.is_connected(G) for G in graphlets)
+        for i, G in enumerate(graphlets):
+            assert not any(rooted_is_isomorphic(G, H, "root") for H in graphlets[:i])
+
+
+class TestGraphletAtlas:
+    """Test suite for the precomputed graphlet atlas."""
+
+    @pytest.mark.parametrize("size", range(1, ATLAS_MAX_NODES + 1))
+    def test_atlas_matches_computed_tables(self, size: int) -> None:
+        """Test that the stored tables equal freshly computed ones."""
+        for rooted in (True, False):
+            assert (canonical_table(size, rooted) == _compute_canonical_table(size, rooted)).all()
+
+    def test_catalog_sizes(self) -> None:
+        """Test the number of connected graphs and rooted graphs on 1-6 nodes."""
+        assert [len(graphlet_catalog(k, rooted=False)) for k in range(1, 7)] == [1, 1, 2, 6, 21, 112]
+        assert [len(graphlet_catalog(k)) for k in range(1, 7)] == [1, 1, 3, 11, 58, 407]
+
+    def test_missing_atlas_is_rebuilt(self, tmp_path, monkeypatch) -> None:
+        """Test that a missing atlas file is rebuilt and saved."""
+        path = tmp_path / "graphlet_atlas.npz"
+        monkeypatch.setattr(graphlet_utilities, "ATLAS_PATH", path)
+        graphlet_utilities.graphlet_atlas.cache_clear()
+        try:
+            atlas = graphlet_utilities.graphlet_atlas()
+        finally:
+            graphlet_utilities.graphlet_atlas.cache_clear()
+
+        assert path.exists()
+        assert len(atlas["connected_rooted_6"]) == 407
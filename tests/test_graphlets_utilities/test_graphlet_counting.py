@@ -0,0 +1,54 @@
+"""Tests for count_rooted_graphlets in graphlet_utilities."""
+
+import numpy as np
+import pytest
+import networkx as nx
+from src.graphlet_utilities import (count_rooted_graphlets, find_subgraphs_containing_vertex,
+                                    graphlet_catalog, rooted_canonical_form)
+
+
+def serial_counts(G: nx.Graph, roots: list, size: int) -> np.ndarray:
+    """Per-root class counts from find_subgraphs_containing_vertex and rooted_canonical_form."""
+    catalog = graphlet_catalog(size).tolist()
+    counts = np.zeros((len(roots), len(catalog)), dtype=np.int64)
+    for i, root in enumerate(roots):
+        for subgraph in find_subgraphs_containing_vertex(G, size, root):
+            counts[i, catalog.index(rooted_canonical_form(subgraph, root))] += 1
+    return counts
+
+
+class TestCountRootedGraphlets:
+    """Test suite for count_rooted_graphlets."""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 4])
+    def test_matches_serial_classification(self, size: int) -> None:
+        """Test that the counts agree with classifying each subgraph one by one."""
+        G = nx.relabel_nodes(nx.gnp_random_graph(14, 0.3, seed=size), lambda v: f"v{v}")
+        G.add_edge("v0", "v0")
+        roots = list(G.nodes())[::-1]
+
+        counts = count_rooted_graphlets(G, roots, size, n_workers=1, chunk_size=4)
+
+        assert counts.tolist() == serial_counts(G, roots, size).tolist()
+
+    def test_pool_matches_in_process(self) -> None:
+        """Test that counting in worker processes gives the same counts."""
+        G = nx.gnp_random_graph(30, 0.2, seed=7)
+
+        in_process = count_rooted_graphlets(G, list(G.nodes()), 4, n_workers=1)
+        pooled = count_rooted_graphlets(G, list(G.nodes()), 4, n_workers=2, chunk_size=8)
+
+        assert pooled.tolist() == in_process.tolist()
+
+    def test_no_roots_and_isolated_root(self) -> None:
+        """Test the shape with no roots and the counts of an isolated root."""
+        G = nx.Graph([(0, 1)])
+        G.add_node(2)
+
+        assert count_rooted_graphlets(G, [], 3, n_workers=1).shape == (0, 3)
+        assert count_rooted_graphlets(G, [2], 2, n_workers=1).tolist() == [[0]]
+
+    def test_invalid_size(self) -> None:
+        """Test that sizes outside the graphlet atlas are rejected."""
+        with pytest.raises(ValueError):
+            count_rooted_graphlets(nx.path_graph(3), [0], 7)
@@ -0,0 +1,84 @@
+"""Tests for graphlet_degree_vectors in graphlet_utilities."""
+
+from itertools import combinations
+import numpy as np
+import pytest
+import networkx as nx
+from src.graphlet_utilities import NUM_ORBITS, _SMALL_ORBITS, graphlet_degree_vectors
+
+
+def brute_force_orbits(G: nx.Graph) -> np.ndarray:
+    """Orbit 0-14 counts by checking every induced subgraph against each orbit's graphlet."""
+    patterns = []
+    for edges, root in _SMALL_ORBITS:
+        H = nx.Graph(edges)
+        nx.set_node_attributes(H, {node: node == root for node in H}, "root")
+        patterns.append(H)
+
+    nodes = list(G.nodes())
+    counts = np.zeros((len(nodes), 15), dtype=np.int64)
+    for size in (2, 3, 4):
+        for node_set in combinations(nodes, size):
+            S = G.subgraph(node_set)
+            if not nx.is_connected(S):
+                continue
+            for i, node in enumerate(nodes):
+                if node not in S:
+                    continue
+                rooted = nx.Graph(S)
+                nx.set_node_attributes(rooted, {v: v == node for v in rooted}, "root")
+                matches = [
+                    orbit for orbit, H in enumerate(patterns)
+                    if nx.is_isomorphic(rooted, H, node_match=lambda a, b: a["root"] == b["root"])
+                ]
+                assert len(matches) == 1
+                counts[i, matches[0]] += 1
+    return counts
+
+
+class TestGraphletDegreeVectors:
+    """Test suite for graphlet_degree_vectors."""
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_matches_brute_force(self, seed: int) -> None:
+        """Test that the counting formulas agree with enumerating every induced subgraph."""
+        G = nx.gnp_random_graph(9, 0.25 + 0.08 * seed, seed=seed)
+
+        assert graphlet_degree_vectors(G).tolist() == brute_force_orbits(G).tolist()
+
+    def test_known_graphs(self) -> None:
+        """Test the vectors of a 4-path and a 4-clique."""
+        path = graphlet_degree_vectors(nx.path_graph(4))
+        clique = graphlet_degree_vectors(nx.complete_graph(4))
+
+        assert path[0].tolist() == [1, 1, 0, 0, 1] + [0] * 10
+        assert path[1].tolist() == [2, 1, 1, 0, 0, 1] + [0] * 9
+        assert clique.tolist() == [[3, 0, 0, 3] + [0] * 10 + [1]] * 4
+
+    def test_rows_follow_node_order_and_ignore_self_loops(self) -> None:
+        """Test that rows follow G.nodes() and self-loops do not count."""
+        G = nx.Graph([("c", "b"), ("b", "a"), ("a", "a")])
+
+        vectors = graphlet_degree_vectors(G, max_size=3)
+
+        assert vectors.tolist() == [[1, 1, 0, 0], [2, 0, 1, 0], [1, 1, 0, 0]]
+
+    def test_five_node_orbits(self) -> None:
+        """Test that the 5-node orbits count every connected 5-node set once per node."""
+        G = nx.gnp_random_graph(10, 0.4, seed=3)
+
+        vectors = graphlet_degree_vectors(G, max_size=5)
+        connected_sets = sum(
+            nx.is_connected(G.subgraph(node_set)) for node_set in combinations(G.nodes(), 5)
+        )
+
+        assert vectors.shape == (10, NUM_ORBITS[5])
+        assert vectors[:, :15].tolist() == graphlet_degree_vectors(G).tolist()
+        assert vectors[:, 15:].sum() == 5 * connected_sets
+        # a 5-clique puts each of its nodes in a single orbit
+        assert (graphlet_degree_vectors(nx.complete_graph(5), max_size=5)[:, 15:] > 0).sum(axis=1).tolist() == [1] * 5
+
+    def test_invalid_size(self) -> None:
+        """Test that sizes outside 2-5 are rejected."""
+        with pytest.raises(ValueError):
+            graphlet_degree_vectors(nx.path_graph(3), max_size=6)
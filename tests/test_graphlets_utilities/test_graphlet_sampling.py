@@ -0,0 +1,84 @@
+"""Tests for estimate_graphlet_concentrations in graphlet_utilities."""
+
+import numpy as np
+import pytest
+import networkx as nx
+from src.graphlet_utilities import (canonical_form, estimate_graphlet_concentrations, graphlet_catalog,
+                                    iter_all_connected_node_sets)
+
+
+def exact_counts(G: nx.Graph, size: int) -> np.ndarray:
+    catalog = graphlet_catalog(size, rooted=False).tolist()
+    counts = np.zeros(len(catalog))
+    for node_set in iter_all_connected_node_sets(G, size):
+        counts[catalog.index(canonical_form(G.subgraph(node_set)))] += 1
+    return counts
+
+
+class TestEstimateGraphletConcentrations:
+    """Test suite for estimate_graphlet_concentrations."""
+
+    @pytest.mark.parametrize("size", [3, 4, 5])
+    def test_close_to_exact_counts(self, size: int) -> None:
+        """Test that the estimates are near the exact counts and concentrations."""
+        G = nx.karate_club_graph()
+        exact = exact_counts(G, size)
+
+        estimate = estimate_graphlet_concentrations(G, size, num_samples=4000, seed=1)
+
+        assert estimate.counts.sum() == pytest.approx(exact.sum(), rel=0.05)
+        assert np.abs(estimate.concentrations - exact / exact.sum()).max() < 0.03
+        assert (estimate.lower <= estimate.concentrations).all()
+        assert (estimate.concentrations <= estimate.upper).all()
+
+    def test_single_graphlet_is_exact(self) -> None:
+        """Test that a graph with one graphlet class gets it with certainty."""
+        estimate = estimate_graphlet_concentrations(nx.cycle_graph(12), 4, num_samples=100, seed=0)
+        path = graphlet_catalog(4, rooted=False).tolist().index(canonical_form(nx.path_graph(4)))
+
+        assert estimate.concentrations[path] == 1.0
+        assert estimate.counts[path] == pytest.approx(12)
+        assert estimate.upper[path] == 1.0
+        assert 0.9 < estimate.lower[path] < 1.0
+
+    def test_unseen_graphlets_have_nonzero_upper_bound(self) -> None:
+        """Test that a graphlet no sample found gets an interval [0, u] with u > 0."""
+        estimate = estimate_graphlet_concentrations(nx.karate_club_graph(), 5, num_samples=50, seed=0)
+        unseen = estimate.counts == 0
+
+        assert unseen.any()
+        assert (estimate.lower[unseen] == 0).all()
+        assert (estimate.upper[unseen] > 0).all()
+
+    def test_interval_coverage(self) -> None:
+        """Test that the 95% intervals contain the exact concentrations in about 95% of runs."""
+        G = nx.karate_club_graph()
+        exact = exact_counts(G, 4)
+        truth = exact / exact.sum()
+
+        covered = np.array([
+            (estimate.lower <= truth) & (truth <= estimate.upper)
+            for estimate in (estimate_graphlet_concentrations(G, 4, num_samples=100, seed=seed)
+                             for seed in range(100))
+        ])
+
+        # the rare classes are often unseen with 100 samples; they must be covered too
+        assert covered.mean() > 0.93
+        assert covered.mean(axis=0).min() > 0.88
+
+    def test_seed_and_small_components(self) -> None:
+        """Test reproducibility and that components smaller than size are ignored."""
+        G = nx.disjoint_union(nx.path_graph(2), nx.complete_graph(5))
+        G.add_edge(3, 3)
+
+        first = estimate_graphlet_concentrations(G, 3, num_samples=200, seed=5)
+        second = estimate_graphlet_concentrations(G, 3, num_samples=200, seed=5)
+
+        assert first.counts.tolist() == second.counts.tolist()
+        assert first.counts.sum() == pytest.approx(10, rel=0.3)
+
+    @pytest.mark.parametrize("size, num_samples", [(2, 10), (6, 10), (3, 1)])
+    def test_invalid_arguments(self, size: int, num_samples: int) -> None:
+        """Test that unsupported sizes and sample budgets are rejected."""
+        with pytest.raises(ValueError):
+            estimate_graphlet_concentrations(nx.path_graph(5), size, num_samples=num_samples)
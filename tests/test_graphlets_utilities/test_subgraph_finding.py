@@ -1,8 +1,10 @@
 """Tests for find_subgraphs_containing_vertex function in graphlet_utilities."""
 
 import pytest
+from itertools import combinations
+from types import GeneratorType
 import networkx as nx
-from src.graphlet_utilities import find_subgraphs_containing_vertex
+from src.graphlet_utilities import find_subgraphs_containing_vertex, iter_connected_node_sets
 
 
 class TestFindSubgraphsContainingVertex:
@@ -164,3 +166,51 @@ class TestFindSubgraphsContainingVertex:
         
         assert all(vertex in sg.nodes() for sg in subgraphs)
         assert len(subgraphs) == 6  # C(4,2) = 6 three-node subgraphs containing node 2
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("size", [1, 2, 3, 4])
+    def test_same_node_sets_as_all_combinations(self, seed: int, size: int) -> None:
+        """Test against checking every combination of nodes, including the order."""
+        G = nx.gnp_random_graph(10, 0.3, seed=seed)
+        expected = [
+            set(nodes) for nodes in combinations(G.nodes(), size)
+            if 0 in nodes and nx.is_connected(G.subgraph(nodes))
+        ]
+
+        subgraphs = find_subgraphs_containing_vertex(G, size, 0)
+
+        assert [set(sg.nodes()) for sg in subgraphs] == expected
+
+
+class TestIterConnectedNodeSets:
+    """Test suite for the lazy iter_connected_node_sets enumerator."""
+
+    def test_is_lazy(self) -> None:
+        """Test that node sets are produced by a generator."""
+        G = nx.complete_graph(4)
+        node_sets = iter_connected_node_sets(G, 3, 0)
+
+        assert isinstance(node_sets, GeneratorType)
+        assert next(node_sets)[0] == 0
+
+    def test_each_set_once(self) -> None:
+        """Test that no node set is produced twice, with self-loops present."""
+        G = nx.complete_graph(6)
+        G.add_edge(0, 0)
+
+        node_sets = list(iter_connected_node_sets(G, 3, 0))
+
+        assert len(node_sets) == 10
+        assert len({frozenset(nodes) for nodes in node_sets}) == 10
+
+    def test_large_sparse_graph(self) -> None:
+        """Test that only the vertex's neighborhood matters on a large graph."""
+        G = nx.disjoint_union(nx.cycle_graph(5), nx.path_graph(5000))
+
+        node_sets = list(iter_connected_node_sets(G, 3, 0))
+
+        assert sorted(sorted(nodes) for nodes in node_sets) == [[0, 1, 2], [0, 1, 4], [0, 3, 4]]
+
+    def test_missing_vertex(self) -> None:
+        """Test that a vertex not in the graph gives no node sets."""
+        assert list(iter_connected_node_sets(nx.path_graph(3), 2, "x")) == []
@@ -0,0 +1,358 @@
+"""Tests for the SEIR agent engines in project1/agents.py."""
+
+import math
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# Add project1/ to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "project1"))
+
+from agents import (
+    E_CODE,
+    I_CODE,
+    INFECTED,
+    R_CODE,
+    S_CODE,
+    EventDrivenPopulationManager,
+    PopulationManager,
+    StateHistory,
+    Agent,
+    TransitionLogHistory,
+    VectorizedPopulationManager,
+    get_useful_metrics_from_counts,
+    infection_probability,
+    infectiousness_table,
+    log_escape_list,
+    log_escape_table,
+)
+
+
+def run_counts(manager_class, graph, steps, **kwargs):
+    manager = manager_class(graph, **kwargs)
+    for _ in range(steps):
+        manager.step_all_agents()
+    return manager.get_history_as_counts()
+
+
+class TestVectorizedPopulationManager:
+    """Test suite for VectorizedPopulationManager."""
+
+    def test_count_format(self) -> None:
+        """Test that the counts are four lists, S, E, I, R, with one entry per step."""
+        counts = run_counts(VectorizedPopulationManager, nx.cycle_graph(20), 15, seed=1)
+
+        assert len(counts) == 4
+        assert all(isinstance(row, list) and len(row) == 15 for row in counts)
+        assert all(isinstance(value, int) for row in counts for value in row)
+
+    def test_initial_counts(self) -> None:
+        """Test that the first step holds the initial S, I and E fractions."""
+        counts = run_counts(VectorizedPopulationManager, nx.cycle_graph(20), 1,
+                            init_S=.8, init_I=.15, init_E=.05, seed=1)
+
+        assert [row[0] for row in counts] == [16, 1, 3, 0]
+
+    def test_totals_are_population_size(self) -> None:
+        """Test that S + E + I + R is the number of agents on every day."""
+        G = nx.barabasi_albert_graph(60, 2, seed=3)
+
+        counts = np.array(run_counts(VectorizedPopulationManager, G, 40, init_random=True, seed=2))
+
+        assert np.all(counts.sum(axis=0) == 60)
+
+    def test_states_only_move_forward(self) -> None:
+        """Test that R never decreases and S never increases."""
+        counts = np.array(run_counts(VectorizedPopulationManager, nx.cycle_graph(30), 40, seed=5))
+
+        assert np.all(np.diff(counts[0]) <= 0)
+        assert np.all(np.diff(counts[3]) >= 0)
+
+    def test_agrees_with_population_manager(self) -> None:
+        """Test that the mean final S and mean peak I match the Agent-based engine over seeded runs."""
+        G = nx.cycle_graph(40)
+        runs, steps = 300, 30
+
+        def summary(manager_class):
+            counts = np.array([run_counts(manager_class, G, steps, seed=seed) for seed in range(runs)])
+            final_S, peak_I = counts[:, 0, -1], counts[:, 2].max(axis=1)
+            return final_S.mean(), final_S.var(), peak_I.mean(), peak_I.var()
+
+        S_agents, S_var_agents, I_agents, I_var_agents = summary(PopulationManager)
+        S_arrays, S_var_arrays, I_arrays, I_var_arrays = summary(VectorizedPopulationManager)
+
+        # within four standard errors of the difference of the means
+        assert abs(S_agents - S_arrays) < 4 * np.sqrt((S_var_agents + S_var_arrays) / runs)
+        assert abs(I_agents - I_arrays) < 4 * np.sqrt((I_var_agents + I_var_arrays) / runs)
+
+
+class TestGetUsefulMetricsFromCounts:
+    """Test suite for get_useful_metrics_from_counts."""
+
+    def test_metrics(self) -> None:
+        """Test the peak, its time, the steady-state time and the final S of a known trajectory."""
+        counts = [
+            [9, 8, 6, 5, 5, 5],
+            [0, 1, 1, 1, 0, 0],
+            [1, 1, 3, 2, 1, 0],
+            [0, 0, 0, 2, 4, 5],
+        ]
+
+        metrics = get_useful_metrics_from_counts(counts)
+
+        assert metrics == {
+            "time to peak infection": 2,
+            "peak infections": 3,
+            "time when steady state reached": 5,
+            "number of uninfected individuals at the end of the experiment": 5,
+        }
+
+    def test_steady_state_is_first_step_of_final_run(self) -> None:
+        """Test that the steady-state time is where E and I stop changing."""
+        counts = [[3, 2, 2, 2], [0, 0, 0, 0], [1, 1, 0, 0], [0, 1, 2, 2]]
+
+        metrics = get_useful_metrics_from_counts(counts)
+
+        assert metrics["time when steady state reached"] == 2
+        assert metrics["time to peak infection"] == 0
+
+
+class TestSeeding:
+    """Test that a seed makes every engine reproducible."""
+
+    def test_same_seed_same_history(self) -> None:
+        """Test that two runs with the same seed record identical snapshots and counts."""
+        G = nx.barabasi_albert_graph(50, 2, seed=0)
+        for manager_class in (PopulationManager, VectorizedPopulationManager):
+            first = manager_class(G, init_random=True, seed=11)
+            second = manager_class(G, init_random=True, seed=11)
+            for _ in range(25):
+                first.step_all_agents()
+                second.step_all_agents()
+
+            assert first.get_history_as_counts() == second.get_history_as_counts()
+            assert all(np.array_equal(first.get_history()[i], second.get_history()[i]) for i in range(25))
+
+    def test_different_seeds_differ(self) -> None:
+        """Test that different seeds give different runs."""
+        G = nx.barabasi_albert_graph(50, 2, seed=0)
+
+        first = run_counts(PopulationManager, G, 25, init_random=True, seed=1)
+        second = run_counts(PopulationManager, G, 25, init_random=True, seed=2)
+
+        assert first != second
+
+
+class TestStateHistory:
+    """Test suite for StateHistory."""
+
+    def test_counts_follow_transitions(self) -> None:
+        """Test that counts() has one [S, E, I, R] column per recorded step."""
+        history = StateHistory([S_CODE, S_CODE, E_CODE, I_CODE])
+        history.record()
+        history.apply_transitions([0, 2, 3], [E_CODE, I_CODE, R_CODE])
+        history.record(repeat=2)
+
+        assert len(history) == 3
+        assert history.counts().tolist() == [[2, 1, 1], [1, 1, 1], [1, 1, 1], [0, 1, 1]]
+        assert history[0].tolist() == [S_CODE, S_CODE, E_CODE, I_CODE]
+        assert history[-1].tolist() == [E_CODE, S_CODE, I_CODE, R_CODE]
+
+    def test_grows_past_initial_capacity(self) -> None:
+        """Test that recording more steps than the initial capacity keeps every step."""
+        history = StateHistory([S_CODE, I_CODE], initial_capacity=2)
+        for step in range(5):
+            history.record()
+            if step == 2:
+                history.apply_transitions([1], [R_CODE])
+
+        assert history.counts().tolist() == [[1] * 5, [0] * 5, [1, 1, 1, 0, 0], [0, 0, 0, 1, 1]]
+
+    def test_color_map(self) -> None:
+        """Test that color_map gives each agent the color of its state at that step."""
+        history = StateHistory([S_CODE, E_CODE, I_CODE, R_CODE])
+        history.record()
+        history.apply_transitions([0], [E_CODE])
+        history.record()
+
+        assert history.color_map(0) == ["blue", "yellow", "red", "green"]
+        assert history.color_map(1) == ["yellow", "yellow", "red", "green"]
+
+    def test_manager_color_map_matches_states(self) -> None:
+        """Test that a manager's color map agrees with the Agent states it recorded."""
+        manager = PopulationManager(nx.cycle_graph(10), seed=4)
+        states = [manager.agents[i].state for i in range(10)]
+        manager.step_all_agents()
+
+        colors = {"S": "blue", "E": "yellow", "I": "red", "R": "green"}
+        assert manager.get_color_map(0) == [colors[state] for state in states]
+
+
+class TestEventDrivenPopulationManager:
+    """Test suite for EventDrivenPopulationManager."""
+
+    def test_same_trajectory_as_vectorized(self) -> None:
+        """Test that a seed gives the same snapshots and counts as VectorizedPopulationManager."""
+        for seed in range(5):
+            G = nx.barabasi_albert_graph(120, 2, seed=seed)
+            kwargs = {"init_S": .96, "init_I": .02, "init_E": .02, "init_random": True, "seed": seed}
+            vectorized = VectorizedPopulationManager(G, **kwargs)
+            event_driven = EventDrivenPopulationManager(G, **kwargs)
+            for _ in range(50):
+                vectorized.step_all_agents()
+                event_driven.step_all_agents()
+
+            assert event_driven.get_history_as_counts() == vectorized.get_history_as_counts()
+            assert all(
+                np.array_equal(event_driven.get_history()[i], vectorized.get_history()[i]) for i in range(50)
+            )
+
+    def test_run_stops_once_absorbed(self) -> None:
+        """Test that run stops simulating when nothing is exposed or infected, but fills the history."""
+        manager = EventDrivenPopulationManager(nx.cycle_graph(30), seed=0)
+
+        simulated = manager.run(500)
+
+        assert manager.is_absorbed()
+        assert simulated < 500
+        assert len(manager.get_history()) == 500
+        counts = np.array(manager.get_history_as_counts())
+        assert counts[1, simulated:].sum() == 0 and counts[2, simulated:].sum() == 0
+        assert np.all(counts[:, simulated:] == counts[:, [-1]])
+
+    def test_run_matches_stepping(self) -> None:
+        """Test that run gives the same history as calling step_all_agents every step."""
+        G = nx.cycle_graph(30)
+        stepped = EventDrivenPopulationManager(G, seed=3)
+        for _ in range(200):
+            stepped.step_all_agents()
+        ran = EventDrivenPopulationManager(G, seed=3)
+        ran.run(200)
+
+        assert ran.get_history_as_counts() == stepped.get_history_as_counts()
+
+    def test_history_has_no_snapshots(self) -> None:
+        """Test that the history logs one entry per transition rather than one row per agent and day."""
+        manager = EventDrivenPopulationManager(nx.cycle_graph(1000), init_S=.99, init_I=.01, init_E=0, seed=1)
+        manager.run(300)
+
+        history = manager.get_history()
+        assert isinstance(history, TransitionLogHistory)
+        # every agent changes state at most three times
+        assert history.log_size <= 3 * 1000
+
+
+class TestTransitionLogHistory:
+    """Test suite for TransitionLogHistory."""
+
+    def test_same_as_state_history(self) -> None:
+        """Test that counts and snapshots, read in any order, match a StateHistory fed the same transitions."""
+        rng = np.random.default_rng(0)
+        initial = rng.integers(0, 3, size=50)
+        snapshots = StateHistory(initial, initial_capacity=2)
+        log = TransitionLogHistory(initial, initial_capacity=2)
+        for _ in range(40):
+            snapshots.record()
+            log.record()
+            moving = rng.choice(50, size=5, replace=False)
+            moving = moving[snapshots.current[moving] < R_CODE]
+            new_codes = snapshots.current[moving] + 1
+            snapshots.apply_transitions(moving, new_codes)
+            log.apply_transitions(moving, new_codes)
+        snapshots.record(repeat=3)
+        log.record(repeat=3)
+
+        assert len(log) == len(snapshots) == 43
+        assert np.array_equal(log.counts(), snapshots.counts())
+        for step in [0, 10, 42, 5, -1, 20, -43, 7]:
+            assert np.array_equal(log[step], snapshots[step])
+        assert log.color_map(12) == snapshots.color_map(12)
+
+    def test_snapshots_are_copies(self) -> None:
+        """Test that changing a returned snapshot does not change the history."""
+        log = TransitionLogHistory([S_CODE, I_CODE])
+        log.record()
+        log.apply_transitions([0], [E_CODE])
+        log.record()
+
+        log[1][:] = R_CODE
+
+        assert log[1].tolist() == [E_CODE, I_CODE]
+        assert log[0].tolist() == [S_CODE, I_CODE]
+
+
+def closed_form_level(days: int, p1c: float = 0.038, B: float = -0.0050367) -> float:
+    odds = p1c / (1 - p1c)
+    decay = math.exp(B * (days ** 3 - 1))
+    return odds / (1 + odds - decay)
+
+
+class FixedDraw:
+    """Stand-in for np.random.Generator whose random() always returns value."""
+
+    def __init__(self, value: float) -> None:
+        self.value = value
+
+    def random(self) -> float:
+        return self.value
+
+
+class TestInfectionProbability:
+    """Test the infectiousness tables and infection probability against their closed form."""
+
+    def test_infectiousness_table(self) -> None:
+        """Test that entry d of the table is odds / (1 + odds - exp(B (d^3 - 1)))."""
+        table = infectiousness_table(20)
+
+        assert table.shape[0] >= 20
+        assert not table.flags.writeable
+        for days in range(20):
+            assert table[days] == pytest.approx(closed_form_level(days), rel=1e-12)
+
+    def test_table_for_other_parameters(self) -> None:
+        """Test that each (p1c, B) gets its own table and a longer request grows it."""
+        short = infectiousness_table(5, p1c=0.1, B=-0.01)
+        long = infectiousness_table(100, p1c=0.1, B=-0.01)
+
+        assert long.shape[0] >= 100
+        assert np.array_equal(long[:short.shape[0]], short)
+        assert long[99] == pytest.approx(closed_form_level(99, 0.1, -0.01), rel=1e-12)
+
+    def test_log_escape_table(self) -> None:
+        """Test that log_escape_table is log(1 - p), with -inf where the level is at least 1."""
+        table = log_escape_table(15)
+
+        # exp(-B) > 1 on day 0, so that level is above 1
+        assert table[0] == -math.inf
+        for days in range(1, 15):
+            assert table[days] == pytest.approx(math.log(1 - closed_form_level(days)), rel=1e-12)
+        assert log_escape_list(15)[:15] == table[:15].tolist()
+
+    def test_infection_probability(self) -> None:
+        """Test that infection_probability is 1 - prod(1 - p_j) over the infected neighbors."""
+        days = [1, 3, 3, 8]
+
+        expected = 1 - math.prod(1 - closed_form_level(d) for d in days)
+
+        assert infection_probability(days) == pytest.approx(expected, rel=1e-12)
+        assert infection_probability([0, 5]) == 1.0
+
+    def test_gets_disease_uses_infection_probability(self) -> None:
+        """Test that an agent gets the disease exactly when its draw is below infection_probability."""
+        neighbors = [Agent(initial_state=INFECTED, rng=np.random.default_rng(0)) for _ in range(3)]
+        for days, neighbor in zip([2, 4, 9], neighbors):
+            neighbor.days_spent_infectious = days
+        neighbors.append(Agent(rng=np.random.default_rng(0)))
+        probability = infection_probability([2, 4, 9])
+
+        below = Agent(rng=np.random.default_rng(0))
+        below.rng = FixedDraw(probability * (1 - 1e-9))
+        above = Agent(rng=np.random.default_rng(0))
+        above.rng = FixedDraw(probability * (1 + 1e-9))
+
+        assert below.gets_disease(neighbors)
+        assert not above.gets_disease(neighbors)
+        assert not below.gets_disease(neighbors[3:])
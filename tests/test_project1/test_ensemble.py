@@ -0,0 +1,50 @@
+"""Tests for the SEIR ensembles in project1/ensemble.py."""
+
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+# Add project1/ to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "project1"))
+
+from agents import PopulationManager
+from ensemble import run_ensemble
+
+
+class TestRunEnsemble:
+    """Test suite for run_ensemble."""
+
+    def test_worker_count_does_not_change_results(self) -> None:
+        """Test that max_workers=1 and max_workers=2 give identical counts for the same seed."""
+        G = nx.barabasi_albert_graph(60, 2, seed=1)
+
+        serial = run_ensemble(G, 6, steps_per_sim=30, seed=7, max_workers=1, init_random=True)
+        parallel = run_ensemble(G, 6, steps_per_sim=30, seed=7, max_workers=2, init_random=True)
+
+        assert np.array_equal(serial.counts, parallel.counts)
+
+    def test_counts_shape_and_totals(self) -> None:
+        """Test that counts has shape (runs, 4, steps) and every day sums to the population size."""
+        result = run_ensemble(nx.cycle_graph(25), 4, steps_per_sim=12, seed=0, max_workers=1)
+
+        assert result.counts.shape == (4, 4, 12)
+        assert np.all(result.counts.sum(axis=1) == 25)
+
+    def test_runs_are_independent(self) -> None:
+        """Test that the runs of an ensemble get different seeds and so different trajectories."""
+        result = run_ensemble(nx.cycle_graph(40), 5, steps_per_sim=30, seed=3, max_workers=1, init_random=True)
+
+        assert len({run.tobytes() for run in result.counts}) == 5
+
+    def test_manager_class(self) -> None:
+        """Test that a run of the ensemble is the same as running manager_class with its seed."""
+        G = nx.cycle_graph(20)
+
+        result = run_ensemble(G, 2, steps_per_sim=10, seed=5, max_workers=1, manager_class=PopulationManager)
+
+        manager = PopulationManager(G, seed=result.seeds[1])
+        for _ in range(10):
+            manager.step_all_agents()
+        assert result.counts[1].tolist() == manager.get_history_as_counts()
@@ -0,0 +1,140 @@
+"""Tests for the Matrix Market and edge-list readers in project1/read_dublin_graph.py."""
+
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# Add project1/ to Python path for imports
+PROJECT_DIR = Path(__file__).parent.parent.parent / "project1"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from read_dublin_graph import read_edge_list, read_matrix_market
+
+
+def write(tmp_path: Path, name: str, text: str) -> Path:
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+class TestReadMatrixMarket:
+    """Test suite for read_matrix_market."""
+
+    def test_dublin_graph(self) -> None:
+        """Test that the Dublin contact graph loads with the size its header announces."""
+        G = read_matrix_market(PROJECT_DIR / "ia-infect-dublin.mtx")
+
+        assert isinstance(G, nx.Graph) and not G.is_directed()
+        assert G.number_of_nodes() == 410
+        assert G.number_of_edges() == 2765
+        assert set(G.nodes()) == set(range(1, 411))
+
+    def test_symmetric_real_file_weights(self, tmp_path: Path) -> None:
+        """Test that a symmetric real file gives the same weighted edges as written."""
+        source = write(tmp_path, "g.mtx",
+                       "%%MatrixMarket matrix coordinate real symmetric\n% comment\n4 4 3\n2 1 0.5\n3 2 2\n4 4 1.5\n")
+
+        G = read_matrix_market(source)
+
+        assert sorted(G.edges(data="weight")) == [(1, 2, 0.5), (2, 3, 2.0), (4, 4, 1.5)]
+
+    def test_general_file_is_directed(self, tmp_path: Path) -> None:
+        """Test that general storage gives a DiGraph with only the listed directions."""
+        source = write(tmp_path, "g.mtx", "%%MatrixMarket matrix coordinate pattern general\n3 3 2\n1 2\n3 2\n")
+
+        G = read_matrix_market(source)
+
+        assert G.is_directed()
+        assert sorted(G.edges()) == [(1, 2), (3, 2)]
+        assert all("weight" not in data for _, _, data in G.edges(data=True))
+
+    def test_as_csr(self, tmp_path: Path) -> None:
+        """Test that as_csr returns the symmetric adjacency matrix and the 1-based node ids."""
+        source = write(tmp_path, "g.mtx", "%%MatrixMarket matrix coordinate pattern symmetric\n3 3 3\n2 1\n3 2\n2 1\n")
+
+        matrix, node_ids = read_matrix_market(source, as_csr=True)
+
+        assert np.array_equal(node_ids, [1, 2, 3])
+        # the repeated entry is still a single edge
+        assert np.array_equal(matrix.toarray(), [[0, 1, 0], [1, 0, 1], [0, 1, 0]])
+
+    @pytest.mark.parametrize(
+        "text, message",
+        [
+            ("3 3 1\n2 1\n", "missing MatrixMarket header"),
+            ("%%MatrixMarket matrix array real general\n3 3\n", "only coordinate files"),
+            ("%%MatrixMarket matrix coordinate complex general\n3 3 1\n2 1 1 0\n", "unsupported field"),
+            ("%%MatrixMarket matrix coordinate real hermitian\n3 3 1\n2 1 1\n", "unsupported symmetry"),
+            ("%%MatrixMarket matrix coordinate pattern general\n3 3\n2 1\n", "illegal size line"),
+            ("%%MatrixMarket matrix coordinate pattern general\n3 4 1\n2 1\n", "must be square"),
+            ("%%MatrixMarket matrix coordinate pattern general\n3 3 2\n2 1\n", "announces 2 entries, found 1"),
+            ("%%MatrixMarket matrix coordinate pattern general\n3 3 1\n4 1\n", "outside 1..3"),
+        ],
+    )
+    def test_invalid_files_raise(self, tmp_path: Path, text: str, message: str) -> None:
+        """Test that malformed headers, sizes and indices raise ValueError naming the problem."""
+        source = write(tmp_path, "bad.mtx", text)
+
+        with pytest.raises(ValueError, match=message):
+            read_matrix_market(source)
+
+    def test_malformed_entry_names_file_and_line(self, tmp_path: Path) -> None:
+        """Test that a bad token is reported with the file name and its line number."""
+        source = write(tmp_path, "bad.mtx",
+                       "%%MatrixMarket matrix coordinate pattern general\n% note\n3 3 2\n2 1\n3 x\n")
+
+        with pytest.raises(ValueError) as exc_info:
+            read_matrix_market(source)
+
+        assert str(exc_info.value) == f"{source}, line 5: 'x' is not a valid int64"
+
+
+class TestReadEdgeList:
+    """Test suite for read_edge_list."""
+
+    def test_unweighted_undirected(self, tmp_path: Path) -> None:
+        """Test that a plain edge list gives an undirected graph without weights."""
+        source = write(tmp_path, "g.txt", "# edges\n10 20\n20 30\n30 10\n")
+
+        G = read_edge_list(source)
+
+        assert not G.is_directed()
+        assert {frozenset(e) for e in G.edges()} == {frozenset((10, 20)), frozenset((20, 30)), frozenset((10, 30))}
+        assert all("weight" not in data for _, _, data in G.edges(data=True))
+
+    def test_weighted_directed(self, tmp_path: Path) -> None:
+        """Test that weighted=True and directed=True keep the weights and the directions."""
+        source = write(tmp_path, "g.txt", "1 2 0.25\n2 1 4\n% skipped\n2 3 1.5\n")
+
+        G = read_edge_list(source, weighted=True, directed=True, comments="%")
+
+        assert G.is_directed()
+        assert sorted(G.edges(data="weight")) == [(1, 2, 0.25), (2, 1, 4.0), (2, 3, 1.5)]
+
+    def test_as_csr(self, tmp_path: Path) -> None:
+        """Test that as_csr indexes the rows by the sorted node ids."""
+        source = write(tmp_path, "g.txt", "7 3\n3 5\n")
+
+        matrix, node_ids = read_edge_list(source, as_csr=True)
+
+        assert np.array_equal(node_ids, [3, 5, 7])
+        assert np.array_equal(matrix.toarray(), [[0, 1, 1], [1, 0, 0], [1, 0, 0]])
+
+    def test_wrong_column_count_names_file_and_line(self, tmp_path: Path) -> None:
+        """Test that a short line is reported with its line number, counting comment lines."""
+        source = write(tmp_path, "g.txt", "# header\n1 2 1.0\n2 3\n")
+
+        with pytest.raises(ValueError) as exc_info:
+            read_edge_list(source, weighted=True)
+
+        assert str(exc_info.value) == f"{source}, line 3: expected 3 values, got 2"
+
+    def test_float_id_names_file_and_line(self, tmp_path: Path) -> None:
+        """Test that a non-integer vertex id is reported with the file and line."""
+        source = write(tmp_path, "g.txt", "1 2\n2 4.5\n")
+
+        with pytest.raises(ValueError, match=r"g\.txt, line 2: '4\.5' is not a valid int64"):
+            read_edge_list(source)
@@ -0,0 +1,116 @@
+"""Tests for the cached parameter sweeps in project1/sweep.py."""
+
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# Add project1/ to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "project1"))
+
+import sweep
+from sweep import graph_fingerprint, parameter_grid, run_sweep
+
+
+@pytest.fixture
+def counted_cells(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    """Record the manager parameters of every cell that is actually simulated."""
+    calls: list[dict] = []
+    run_cell = sweep._run_cell
+
+    def counting_run_cell(graph, runs, steps_per_sim, seed, manager_kwargs):
+        calls.append(manager_kwargs)
+        return run_cell(graph, runs, steps_per_sim, seed, manager_kwargs)
+
+    monkeypatch.setattr(sweep, "_run_cell", counting_run_cell)
+    return calls
+
+
+class TestRunSweep:
+    """Test suite for run_sweep and its npz cache."""
+
+    GRAPHS = {"cycle": nx.cycle_graph(30)}
+
+    def test_second_sweep_hits_cache(self, tmp_path: Path, counted_cells: list[dict]) -> None:
+        """Test that repeating a sweep loads every cell from disk without simulating."""
+        grid = parameter_grid(graph=["cycle"], init_random=[False, True])
+
+        first = run_sweep(self.GRAPHS, grid, runs=3, steps_per_sim=10, cache_dir=tmp_path, max_workers=1)
+        simulated = len(counted_cells)
+        second = run_sweep(self.GRAPHS, grid, runs=3, steps_per_sim=10, cache_dir=tmp_path, max_workers=1)
+
+        assert simulated == 2
+        assert len(counted_cells) == 2
+        assert len(list(tmp_path.glob("*.npz"))) == 2
+        assert all(np.array_equal(a.counts, b.counts) for (_, a), (_, b) in zip(first, second))
+
+    def test_changed_parameter_misses_cache(self, tmp_path: Path, counted_cells: list[dict]) -> None:
+        """Test that changing one parameter simulates only the new cell."""
+        grid = [{"graph": "cycle", "p1c": 0.038}]
+        run_sweep(self.GRAPHS, grid, runs=3, steps_per_sim=10, cache_dir=tmp_path, max_workers=1)
+
+        changed = [{"graph": "cycle", "p1c": 0.038}, {"graph": "cycle", "p1c": 0.05}]
+        run_sweep(self.GRAPHS, changed, runs=3, steps_per_sim=10, cache_dir=tmp_path, max_workers=1)
+
+        assert counted_cells == [{"p1c": 0.038}, {"p1c": 0.05}]
+
+    @pytest.mark.parametrize("change", [{"seed": 1}, {"runs": 4}, {"steps_per_sim": 11}])
+    def test_changed_settings_miss_cache(self, tmp_path: Path, counted_cells: list[dict], change: dict) -> None:
+        """Test that a different seed, run count or run length is not served from the cache."""
+        grid = [{"graph": "cycle"}]
+        settings = {"runs": 3, "steps_per_sim": 10, "seed": 0}
+        run_sweep(self.GRAPHS, grid, cache_dir=tmp_path, max_workers=1, **settings)
+
+        run_sweep(self.GRAPHS, grid, cache_dir=tmp_path, max_workers=1, **(settings | change))
+
+        assert len(counted_cells) == 2
+
+    def test_unseeded_sweep_is_not_cached(self, tmp_path: Path, counted_cells: list[dict]) -> None:
+        """Test that seed=None simulates every time, writes no cache entry and gives fresh runs."""
+        grid = [{"graph": "cycle", "init_random": True}]
+
+        first = run_sweep(self.GRAPHS, grid, runs=3, steps_per_sim=20, seed=None, cache_dir=tmp_path, max_workers=1)
+        second = run_sweep(self.GRAPHS, grid, runs=3, steps_per_sim=20, seed=None, cache_dir=tmp_path, max_workers=1)
+
+        assert len(counted_cells) == 2
+        assert list(tmp_path.glob("*.npz")) == []
+        assert not np.array_equal(first[0][1].counts, second[0][1].counts)
+
+    def test_unseeded_cells_share_a_seed(self, tmp_path: Path) -> None:
+        """Test that the cells of an unseeded sweep still use one seed, so they differ only by parameters."""
+        grid = [{"graph": "cycle", "init_random": True}, {"graph": "cycle", "init_random": True, "p1c": 0.038}]
+
+        results = run_sweep(self.GRAPHS, grid, runs=3, steps_per_sim=20, seed=None, cache_dir=tmp_path, max_workers=1)
+
+        assert np.array_equal(results[0][1].counts, results[1][1].counts)
+
+    def test_duplicate_cells_simulated_once(self, tmp_path: Path, counted_cells: list[dict]) -> None:
+        """Test that identical cells in one grid share a single simulation."""
+        grid = [{"graph": "cycle", "init_random": True}] * 3
+
+        results = run_sweep(self.GRAPHS, grid, runs=2, steps_per_sim=10, cache_dir=tmp_path, max_workers=1)
+
+        assert len(counted_cells) == 1
+        assert len(results) == 3
+
+
+class TestGraphFingerprint:
+    """Test suite for graph_fingerprint."""
+
+    def test_same_structure_same_fingerprint(self) -> None:
+        """Test that the fingerprint ignores edge insertion order and attributes."""
+        G = nx.Graph([(0, 1), (1, 2)])
+        H = nx.Graph()
+        H.add_edge(2, 1, weight=5)
+        H.add_edge(1, 0)
+
+        assert graph_fingerprint(G) == graph_fingerprint(H)
+
+    def test_different_structure_different_fingerprint(self) -> None:
+        """Test that adding an edge or making the graph directed changes the fingerprint."""
+        G = nx.path_graph(4)
+
+        assert graph_fingerprint(G) != graph_fingerprint(nx.cycle_graph(4))
+        assert graph_fingerprint(G) != graph_fingerprint(G.to_directed())